@@ -0,0 +1,11 @@
+"""
+File Location: benchmarks/__init__.py
+Author: Lizza Celestia
+Version: ALizz_AI_V1_0
+Create Date: 2026-10-18
+Modified Date: 2026-10-18
+Description:
+    Benchmarks of the EventBus, the PluginManager and the Core, run with:
+        python -m benchmarks.run --output bench.json --baseline previous.json --threshold 0.15
+    Plugin benchmarks use synthetic plugins generated into a temporary plugin folder.
+"""
@@ -0,0 +1,98 @@
+"""
+File Location: benchmarks/bench_bridge.py
+Author: Lizza Celestia
+Version: ALizz_AI_V1_0
+Create Date: 2026-10-18
+Modified Date: 2026-10-18
+Description:
+    BusBridge benchmarks between two local processes: an echo node (child process) imports BENCH_ECHO and
+    publishes every event back as BENCH_ECHO_REPLY. Measures round-trip throughput and latency over
+    TCP loopback and Unix sockets.
+"""
+import multiprocessing
+import os
+import socket
+import tempfile
+import threading
+import time
+from core.event_bus import EventBus
+from core.bus_bridge import BusBridge
+from benchmarks.bench_bus import _percentiles
+
+def bench_roundtrip(address: str, events: int = 5000) -> dict:
+    """
+    Publish `events` BENCH_ECHO events to an echo node listening on `address` and wait for the replies.
+    :return: {"throughput": round trips/s, "p50": seconds, "p99": seconds}
+    """
+    ready = multiprocessing.Event()
+    stop = multiprocessing.Event()
+    echo = multiprocessing.Process(target=_echo_node, args=(address, ready, stop), name="bench_echo", daemon=True)
+    echo.start()
+    if not ready.wait(10):
+        echo.kill()
+        raise TimeoutError(f"Echo node did not listen on '{address}'")
+
+    bus = EventBus()
+    bus.start()
+    latencies = []
+    done = threading.Event()
+
+    def on_reply(sent):
+        latencies.append(time.perf_counter() - sent)
+        if len(latencies) == events:
+            done.set()
+
+    bus.subscribe("BENCH_ECHO_REPLY", on_reply)
+    bridge = BusBridge(bus, "bench", peers=[address], export=["BENCH_ECHO"], import_=["BENCH_ECHO_REPLY"])
+    bridge.start()
+    _wait_linked(bridge)
+    start = time.perf_counter()
+    for _ in range(events):
+        bus.publish("BENCH_ECHO", time.perf_counter())
+    done.wait(60)
+    elapsed = time.perf_counter() - start
+    bridge.stop()
+    bus.publish("TERMINATE", None)
+    stop.set()
+    echo.join(5)
+    return {"throughput": len(latencies) / elapsed, **_percentiles(latencies)}
+
+def run(quick: bool = False) -> dict:
+    """All bridge benchmarks, as {name: (value, unit, higher_is_better)}."""
+    events = 2000 if quick else 10000
+    addresses = {"tcp": f"tcp://127.0.0.1:{_free_port()}"}
+    if hasattr(socket, "AF_UNIX"):
+        addresses["unix"] = f"unix://{os.path.join(tempfile.gettempdir(), f'alizz_bench_{os.getpid()}.sock')}"
+    results = {}
+    for transport, address in addresses.items():
+        result = bench_roundtrip(address, events)
+        results[f"{transport}.throughput"] = (result["throughput"], "events/s", True)
+        results[f"{transport}.burst_latency_p99"] = (result["p99"], "s", False)
+    return results
+
+#####################################################
+#                  Additional Functions
+#####################################################
+def _echo_node(address: str, ready, stop):
+    bus = EventBus()
+    bus.start()
+    bus.subscribe("BENCH_ECHO", lambda sent: bus.publish("BENCH_ECHO_REPLY", sent))
+    bridge = BusBridge(bus, "bench_echo", listen=address, export=["BENCH_ECHO_REPLY"], import_=["BENCH_ECHO"])
+    bridge.start()
+    ready.set()
+    stop.wait()
+    bridge.stop()
+    bus.publish("TERMINATE", None)
+
+def _wait_linked(bridge, timeout: float = 10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if all(link["connected"] for link in bridge.stats()["links"]):
+            return
+        time.sleep(0.01)
+    raise TimeoutError(f"Bridge not linked after {timeout}s")
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
@@ -0,0 +1,148 @@
+"""
+File Location: benchmarks/bench_bus.py
+Author: Lizza Celestia
+Version: ALizz_AI_V1_0
+Create Date: 2026-10-18
+Modified Date: 2026-10-18
+Description:
+    EventBus benchmarks: publish -> deliver throughput for sync and async handlers, latency on an idle bus
+    and under a burst (queueing included), and fan-out of one event type to many subscribers.
+"""
+import asyncio
+import threading
+import time
+from core.event_bus import EventBus
+
+class _LoopOwner:
+    """Stands in for a plugin: async handlers run on its loop, in its own thread."""
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="Thread-bench_loop", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(2)
+        self.loop.close()
+
+def bench_delivery(events: int = 20000, handler: str = "sync", workers: int = 1, native_async: bool = False) -> dict:
+    """
+    Publish `events` events to one subscriber that records publish -> handler latency.
+    :param handler: "sync" or "async".
+    :return: {"throughput": events/s, "p50": seconds, "p99": seconds}
+    """
+    bus = EventBus(workers=workers, native_async=native_async)
+    bus.start()
+    owner = _LoopOwner() if handler == "async" else None
+    latencies = []
+    done = threading.Event()
+
+    def on_event(sent):
+        latencies.append(time.perf_counter() - sent)
+        if len(latencies) == events:
+            done.set()
+
+    async def on_event_async(sent):
+        on_event(sent)
+
+    bus.subscribe("BENCH_EVENT", on_event if owner is None else on_event_async, loop=owner.loop if owner else None)
+    start = time.perf_counter()
+    for _ in range(events):
+        bus.publish("BENCH_EVENT", time.perf_counter())
+    done.wait(60)
+    elapsed = time.perf_counter() - start
+    bus.publish("TERMINATE", None)
+    if owner is not None:
+        owner.close()
+    return {"throughput": len(latencies) / elapsed, **_percentiles(latencies)}
+
+def bench_latency(events: int = 2000, handler: str = "sync") -> dict:
+    """
+    Publish -> handler latency of an idle bus: each event is published once the previous one was handled.
+    :return: {"p50": seconds, "p99": seconds}
+    """
+    bus = EventBus()
+    bus.start()
+    owner = _LoopOwner() if handler == "async" else None
+    latencies = []
+    handled = threading.Event()
+
+    def on_event(sent):
+        latencies.append(time.perf_counter() - sent)
+        handled.set()
+
+    async def on_event_async(sent):
+        on_event(sent)
+
+    bus.subscribe("BENCH_EVENT", on_event if owner is None else on_event_async, loop=owner.loop if owner else None)
+    for _ in range(events):
+        handled.clear()
+        bus.publish("BENCH_EVENT", time.perf_counter())
+        if not handled.wait(5):
+            break
+    bus.publish("TERMINATE", None)
+    if owner is not None:
+        owner.close()
+    return _percentiles(latencies)
+
+def bench_fanout(subscribers: int = 50, events: int = 2000, workers: int = 1) -> dict:
+    """
+    One event type with `subscribers` sync handlers.
+    :return: {"deliveries": handler calls/s, "p50": seconds, "p99": seconds} (publish -> last handler)
+    """
+    bus = EventBus(workers=workers)
+    bus.start()
+    expected = subscribers * events
+    calls = [0]
+    latencies = []
+    done = threading.Event()
+    lock = threading.Lock()
+
+    def make_handler(last: bool):
+        def on_event(sent):
+            with lock:
+                calls[0] += 1
+                if last:
+                    latencies.append(time.perf_counter() - sent)
+                if calls[0] == expected:
+                    done.set()
+        return on_event
+
+    for index in range(subscribers):
+        bus.subscribe("BENCH_FANOUT", make_handler(index == subscribers - 1))
+    start = time.perf_counter()
+    for _ in range(events):
+        bus.publish("BENCH_FANOUT", time.perf_counter())
+    done.wait(60)
+    elapsed = time.perf_counter() - start
+    bus.publish("TERMINATE", None)
+    return {"deliveries": calls[0] / elapsed, **_percentiles(latencies)}
+
+def run(quick: bool = False) -> dict:
+    """All bus benchmarks, as {name: (value, unit, higher_is_better)}."""
+    events = 5000 if quick else 20000
+    results = {}
+    for handler in ("sync", "async"):
+        result = bench_delivery(events, handler)
+        results[f"{handler}.throughput"] = (result["throughput"], "events/s", True)
+        results[f"{handler}.burst_latency_p99"] = (result["p99"], "s", False)
+        result = bench_latency(events // 10, handler)
+        results[f"{handler}.latency_p50"] = (result["p50"], "s", False)
+        results[f"{handler}.latency_p99"] = (result["p99"], "s", False)
+    result = bench_delivery(events, "async", native_async=True)
+    results["native_async.throughput"] = (result["throughput"], "events/s", True)
+    results["native_async.burst_latency_p99"] = (result["p99"], "s", False)
+    for subscribers in (10, 50):
+        result = bench_fanout(subscribers, events // subscribers * 5)
+        results[f"fanout_{subscribers}.deliveries"] = (result["deliveries"], "calls/s", True)
+        results[f"fanout_{subscribers}.burst_latency_p99"] = (result["p99"], "s", False)
+    return results
+
+#####################################################
+#                  Additional Functions
+#####################################################
+def _percentiles(values) -> dict:
+    values = sorted(values)
+    if not values:
+        return {"p50": 0.0, "p99": 0.0}
+    return {"p50": values[len(values) // 2], "p99": values[min(len(values) - 1, int(len(values) * 0.99))]}
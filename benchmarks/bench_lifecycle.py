@@ -0,0 +1,65 @@
+"""
+File Location: benchmarks/bench_lifecycle.py
+Author: Lizza Celestia
+Version: ALizz_AI_V1_0
+Create Date: 2026-10-18
+Modified Date: 2026-10-18
+Description:
+    Plugin lifecycle benchmarks on synthetic plugins: discover_plugins boot time for N plugins,
+    reload_plugin and Core.shutdown wall time, with a thread per plugin and on shared loops (lightweight = True).
+"""
+import time
+from core.core import Core
+from benchmarks.synthetic_plugins import SyntheticPlugins
+
+def bench_lifecycle(plugins: int = 20, reloads: int = 5, timeout: float = 30, lightweight: bool = False) -> dict:
+    """
+    Boot `plugins` synthetic plugins, reload one of them `reloads` times, then shut the core down.
+    Boot and reload are timed until the plugins report running.
+    :param lightweight: Run the plugins as tasks on the shared loops instead of a thread each.
+    :return: {"boot": s, "reload": s (mean), "shutdown": s}
+    """
+    with SyntheticPlugins(plugins, options="lightweight = True" if lightweight else "") as synthetic:
+        core = Core(plugin_directory=str(synthetic.directory), priority_plugins=[])
+        core.event_bus.start()
+
+        start = time.perf_counter()
+        core.plugin_manager.discover_plugins()
+        _wait_running(core, synthetic.names, timeout)
+        boot = time.perf_counter() - start
+
+        reload_times = []
+        for _ in range(reloads):
+            start = time.perf_counter()
+            core.plugin_manager.reload_plugin(synthetic.names[0])
+            _wait_running(core, synthetic.names[:1], timeout)
+            reload_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        core.shutdown(timeout)
+        shutdown = time.perf_counter() - start
+    return {"boot": boot, "reload": sum(reload_times) / len(reload_times), "shutdown": shutdown}
+
+def run(quick: bool = False) -> dict:
+    """All lifecycle benchmarks, as {name: (value, unit, higher_is_better)}."""
+    results = {}
+    for plugins in ((5, 20) if quick else (5, 20, 50)):
+        for lightweight in (False, True):
+            result = bench_lifecycle(plugins, reloads=3 if quick else 5, lightweight=lightweight)
+            name = f"plugins_{plugins}_shared" if lightweight else f"plugins_{plugins}"
+            results[f"{name}.boot"] = (result["boot"], "s", False)
+            results[f"{name}.reload"] = (result["reload"], "s", False)
+            results[f"{name}.shutdown"] = (result["shutdown"], "s", False)
+    return results
+
+#####################################################
+#                  Additional Functions
+#####################################################
+def _wait_running(core, names, timeout: float):
+    deadline = time.monotonic() + timeout
+    loaded = core.plugin_manager.loaded_plugins
+    while time.monotonic() < deadline:
+        if all(name in loaded and loaded[name].status for name in names):
+            return
+        time.sleep(0.001)
+    raise TimeoutError(f"Plugins not running after {timeout}s: {[name for name in names if name not in loaded]}")
@@ -0,0 +1,85 @@
+"""
+File Location: benchmarks/run.py
+Author: Lizza Celestia
+Version: ALizz_AI_V1_0
+Create Date: 2026-10-18
+Modified Date: 2026-10-18
+Description:
+    Runs the benchmarks, writes the results to JSON and compares them with a previous run:
+        python -m benchmarks.run --output bench.json
+        python -m benchmarks.run --baseline bench.json --threshold 0.15 --output bench_new.json
+    Exits with 1 when a result is worse than the baseline by more than the threshold (0.15 = 15%).
+"""
+import argparse
+import json
+import logging
+import platform
+import sys
+import time
+from benchmarks import bench_bus, bench_lifecycle, bench_bridge
+
+SUITES = {"bus": bench_bus.run, "lifecycle": bench_lifecycle.run, "bridge": bench_bridge.run}
+
+def run_suites(names, quick: bool = False) -> dict:
+    """:return: {benchmark: {"value": x, "unit": str, "higher_is_better": bool}}"""
+    results = {}
+    for name in names:
+        for benchmark, (value, unit, higher_is_better) in SUITES[name](quick).items():
+            results[f"{name}.{benchmark}"] = {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+            print(f"  {name + '.' + benchmark:<40} {_format(value, unit)}")
+    return results
+
+def compare(results: dict, baseline: dict, threshold: float):
+    """:return: [(benchmark, baseline value, new value, relative change)] of the results worse than threshold."""
+    regressions = []
+    for benchmark, result in results.items():
+        previous = baseline.get(benchmark)
+        if previous is None or not previous["value"]:
+            continue
+        change = (result["value"] - previous["value"]) / previous["value"]
+        worse = -change if result["higher_is_better"] else change
+        if worse > threshold:
+            regressions.append((benchmark, previous["value"], result["value"], change))
+    return regressions
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="ALizz core benchmarks")
+    parser.add_argument("--suite", choices=sorted(SUITES), action="append", help="Run only this suite (repeatable).")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", help="JSON results of a previous run to compare with.")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed relative slowdown (default 0.15).")
+    parser.add_argument("--quick", action="store_true", help="Fewer events and plugins, for a smoke run.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.ERROR)
+    print("Running benchmarks...")
+    results = run_suites(args.suite or sorted(SUITES), args.quick)
+    report = {"created": time.strftime("%Y-%m-%d %H:%M:%S"), "python": platform.python_version(),
+              "platform": platform.platform(), "quick": args.quick, "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(report, output_file, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for benchmark, previous, value, change in regressions:
+            unit = results[benchmark]["unit"]
+            print(f"REGRESSION {benchmark}: {_format(previous, unit)} -> {_format(value, unit)} ({change:+.1%})")
+        if regressions:
+            return 1
+        print(f"No regression beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+#####################################################
+#                  Additional Functions
+#####################################################
+def _format(value: float, unit: str) -> str:
+    if unit == "s":
+        return f"{value * 1000:10.3f} ms"
+    return f"{value:10.0f} {unit}"
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+File Location: benchmarks/synthetic_plugins.py
+Author: Lizza Celestia
+Version: ALizz_AI_V1_0
+Create Date: 2026-10-18
+Modified Date: 2026-10-18
+Description:
+    Generates minimal plugins (same shape as plugins/sample) into a temporary plugin folder.
+    The folder name is a unique package name, so the PluginManager imports them next to the real plugins.
+"""
+from pathlib import Path
+import shutil
+import tempfile
+
+PLUGIN_TEMPLATE = '''"""
+Synthetic benchmark plugin, generated by benchmarks/synthetic_plugins.py
+"""
+from core.base_plugin import BasePlugin
+import asyncio
+
+publishing_list = {{"PLUGIN_STATUS_{upper}": "bool: {{bool}}"}}
+{options}
+
+class {class_name}(BasePlugin):
+    def __init__(self, core):
+        self.core = core
+        self.status = False
+        self.loop = None
+        self.stop_event = asyncio.Event()
+        self.subscriptions_list = {{
+                                    "PLUGIN_STOP_{name}"    : "handle_stop_event",
+                                    "BENCH_PING"            : "handle_ping",
+                                    }}
+        for event, handler in self.subscriptions_list.items():
+            self.core.event_bus.subscribe(event, getattr(self, handler))
+
+    def init_event_loop(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self.run())
+        finally:
+            self.status = False
+            if not self.loop.is_closed():
+                self.loop.close()
+
+    async def run(self):
+        self.status = True
+        self.core.event_bus.publish("PLUGIN_STATUS_{upper}", {{"bool": self.status}})
+        await self.stop_event.wait()
+
+    async def handle_stop_event(self, data):
+        self.stop_event.set()
+
+    async def handle_ping(self, data):
+        return "{name}"
+'''
+
+class SyntheticPlugins:
+    """
+    A temporary plugin folder holding `count` plugins named <prefix>0, <prefix>1, ...
+    Use as a context manager, the folder is deleted on exit.
+    """
+    def __init__(self, count: int, prefix: str = "bench", options: str = ""):
+        """
+        :param options: Module level plugin options written into every plugin, e.g. "depends_on = []".
+        """
+        self.count = count
+        self.prefix = prefix
+        self.options = options
+        self.directory = None
+        self.names = []
+
+    def __enter__(self):
+        self.directory = Path(tempfile.mkdtemp(prefix="alizz_bench_"))
+        for index in range(self.count):
+            self.add(f"{self.prefix}{index}")
+        return self
+
+    def __exit__(self, *exc_info):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def add(self, name: str):
+        folder = self.directory / name
+        folder.mkdir()
+        (folder / "__init__.py").write_text("", encoding="utf-8")
+        source = PLUGIN_TEMPLATE.format(name=name, upper=name.upper(), class_name=f"{name.capitalize()}Plugin",
+                                        options=self.options)
+        (folder / f"{name}_plugin.py").write_text(source, encoding="utf-8")
+        self.names.append(name)
@@ -0,0 +1,107 @@
+"""
+File Location: core/boot_graph.py
+Author: Lizza Celestia
+Version: ALizz_AI_V1_0
+Create Date: 2026-10-18
+Modified Date: 2026-10-18
+Description:
+    Boot order of the plugins as a dependency graph, so independent plugins can load in parallel.
+    A plugin depends on:
+        - the plugins it declares in its module:  depends_on = ["audio", "llm"]
+        - the plugins publishing an event it subscribes to (publishing_list / subscriptions_list),
+          unless that edge would close a cycle (declared edges win, inferred ones are dropped)
+        - the priority ("ctrl_") plugins, which boot before everything else
+"""
+import logging
+logger = logging.getLogger(__name__)
+plugin_name = "PluginManager"
+
+def build_boot_graph(manifests: dict, priority_plugins=(), loaded=()) -> dict:
+    """
+    :param manifests: {plugin_name: manifest} as returned by read_manifest().
+    :param priority_plugins: Plugins every other plugin waits for.
+    :param loaded: Plugins already running, dependencies on them are satisfied.
+    :return: {plugin_name: set of plugin names it waits for}, only plugins in manifests.
+    """
+    graph = {name: set() for name in manifests}
+
+    for name, manifest in sorted(manifests.items()):
+        declared = manifest.get("depends_on") or ()
+        if isinstance(declared, str):
+            declared = (declared,)
+        for dependency in declared:
+            if dependency == name or dependency in loaded:
+                continue
+            if dependency not in graph:
+                logger.warning(f"[{plugin_name}] '{name}' depends on '{dependency}', which is not an active plugin.")
+                continue
+            if _reaches(graph, dependency, name):
+                logger.error(f"[{plugin_name}] Dependency cycle: '{name}' -> '{dependency}' ignored.")
+                continue
+            graph[name].add(dependency)
+
+    priority = [name for name in priority_plugins if name in graph]
+    for name in graph:
+        if name not in priority:
+            for dependency in priority:
+                if not _reaches(graph, dependency, name):
+                    graph[name].add(dependency)
+
+    publishers = {}
+    for name, manifest in sorted(manifests.items()):
+        for event_type in manifest.get("publishing_list") or ():
+            publishers.setdefault(event_type, []).append(name)
+    for name, manifest in sorted(manifests.items()):
+        for event_type in manifest.get("subscriptions_list") or ():
+            for publisher in publishers.get(event_type, ()):
+                if publisher == name or publisher in graph[name]:
+                    continue
+                if _reaches(graph, publisher, name):
+                    logger.debug(f"[{plugin_name}] Inferred '{name}' -> '{publisher}' ({event_type}) would be a cycle, ignored.")
+                    continue
+                graph[name].add(publisher)
+                logger.debug(f"[{plugin_name}] '{name}' waits for '{publisher}' (subscribes to {event_type}).")
+    return graph
+
+def critical_path(graph: dict, timings: dict):
+    """
+    The chain of plugins that decided when boot finished.
+    :param timings: {plugin_name: (start, end)} in seconds since boot started.
+    :return: List of plugin names, first booted first.
+    """
+    if not timings:
+        return []
+    path = [max(timings, key=lambda name: timings[name][1])]
+    while True:
+        dependencies = [dependency for dependency in graph.get(path[-1], ()) if dependency in timings]
+        if not dependencies:
+            break
+        path.append(max(dependencies, key=lambda name: timings[name][1]))  # the one it waited for last
+    path.reverse()
+    return path
+
+def format_boot_report(graph: dict, timings: dict, total: float) -> str:
+    """Per plugin start/duration table, critical path marked with '*'."""
+    path = critical_path(graph, timings)
+    lines = [f"[{plugin_name}] Boot finished in {total:.3f}s, critical path: {' -> '.join(path) or '-'}"]
+    for name, (start, end) in sorted(timings.items(), key=lambda item: item[1][0]):
+        marker = "*" if name in path else " "
+        waits = ", ".join(sorted(graph.get(name, ()))) or "-"
+        lines.append(f"  {marker} {name:<24} start {start:7.3f}s  took {end - start:7.3f}s  after: {waits}")
+    return "\n".join(lines)
+
+#####################################################
+#                  Additional Functions
+#####################################################
+def _reaches(graph: dict, start: str, target: str) -> bool:
+    """True if target is start or one of its (transitive) dependencies."""
+    seen = set()
+    stack = [start]
+    while stack:
+        name = stack.pop()
+        if name == target:
+            return True
+        if name not in seen:
+            seen.add(name)
+            stack.extend(graph.get(name, ()))
+    return False
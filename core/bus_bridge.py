@@ -0,0 +1,599 @@
+"""
+File Location: core/bus_bridge.py
+Author: Lizza Celestia
+Version: ALizz_AI_V1_0
+Create Date: 2026-10-18
+Modified Date: 2026-10-18
+Description:
+    Links the EventBus of several processes or machines, so heavy plugins (LLM, STT, TTS) can run on another node:
+        audio node:  BusBridge(bus, "audio", peers=["tcp://models.lan:7400"], export=["RUN_LLM"], import_=["TTS_*"],
+                               secret=key)
+        models node: BusBridge(bus, "models", listen="tcp://0.0.0.0:7400", export=["TTS_*"], import_=["RUN_LLM"],
+                               secret=key)
+    - Rules: `export` are the event types sent to the other nodes, `import_` the ones accepted from them.
+      Event types or glob patterns, "!PATTERN" excludes. Nothing is exported unless asked for.
+    - Links are duplex: the node listing a peer dials it, the dialed node answers over the same connections.
+      Each peer gets `connections` persistent connections, an event type always goes through the same one
+      (events of one type stay in order). Lost connections are redialed with backoff, events wait in a
+      bounded buffer meanwhile (the oldest are dropped beyond max_pending). Delivery is at most once:
+      a batch written just before a connection breaks can be lost.
+    - Frames: FRAME header (payload length, kind) + payload. A BATCH payload is the pickled list of records
+      (event type, data, origin node, source plugin, seq and timestamp ns on the origin, hops) of up to
+      batch_size events, sent with one write. With a shared `secret` every payload starts with its
+      HMAC-SHA256, checked before unpickling. Unpickling a frame can run code, so a secret is required
+      as soon as the bridge listens on or dials a non-loopback TCP address (an empty host listens on all of them).
+      Without one, only loopback TCP and Unix sockets are accepted.
+    - Loop prevention: a record lists the nodes it went through. An imported event is published with a
+      RemoteSource ("<origin>/<plugin>") keeping that list, it is never sent back to those nodes, and a record
+      reaching a node it already visited (or over max_hops) is dropped. When nodes are linked by several paths,
+      the copies of an event arriving over the other paths are dropped too (origin, seq and timestamp seen).
+    Addresses: "tcp://host:port" or "unix:///path/to/socket".
+"""
+from collections import deque
+import hashlib
+import hmac
+import ipaddress
+import itertools
+import json
+import os
+import pickle
+import socket
+import struct
+import threading
+import zlib
+from core.topic_index import TopicIndex, is_pattern
+import logging
+logger = logging.getLogger(__name__)
+plugin_name = "Bus_bridge"
+
+FRAME = struct.Struct("<IB")    # payload length, kind
+HELLO, BATCH = 1, 2             # HELLO: JSON {"node", "protocol"}, BATCH: pickled records
+PROTOCOL = 1
+DIGEST_SIZE = hashlib.sha256().digest_size
+MAX_FRAME = 64 * 1024 * 1024
+SEEN_WINDOW = 65536             # imported events remembered to drop the copies coming over other paths
+
+_link_ids = itertools.count(1)
+
+class BridgeError(Exception):
+    """The other end speaks another protocol, failed authentication or sent a malformed frame."""
+
+class RemoteSource(str):
+    """
+    Event.source of an imported event: "<origin node>/<plugin>".
+    Also keeps the nodes the event went through, its seq and publish time (ns) on the origin node.
+    """
+    def __new__(cls, origin: str, plugin: str, hops: tuple, seq: int, timestamp: int):
+        source = super().__new__(cls, f"{origin}/{plugin}")
+        source.origin = origin
+        source.plugin = plugin
+        source.hops = hops
+        source.seq = seq
+        source.timestamp = timestamp
+        return source
+
+class TopicRules:
+    """Export / import rules: event types or glob patterns, a "!" in front excludes."""
+    def __init__(self, rules):
+        rules = [rules] if isinstance(rules, str) else list(rules or ())
+        self.allow = [rule for rule in rules if not rule.startswith("!")]
+        self.deny = [rule[1:] for rule in rules if rule.startswith("!")]
+        self._deny_names, self._deny_patterns = _split(self.deny)
+        self._allow_index = TopicIndex()
+        for rule in self.allow:
+            if is_pattern(rule):
+                self._allow_index.add(rule)
+        self._cache = {}    # event type -> first allow rule matching it, or None
+
+    def match(self, event_type: str):
+        """Return the first allow rule matching the event type, None if no rule allows it (or one excludes it)."""
+        try:
+            return self._cache[event_type]
+        except KeyError:
+            pass
+        rule = None
+        if not (event_type in self._deny_names or self._deny_patterns.match(event_type)):
+            patterns = self._allow_index.match(event_type) if self._allow_index else ()
+            for candidate in self.allow:
+                if candidate == event_type or candidate in patterns:
+                    rule = candidate
+                    break
+        if len(self._cache) > 4096:  # don't grow forever on generated event types
+            self._cache.clear()
+        self._cache[event_type] = rule
+        return rule
+
+    def __bool__(self):
+        return bool(self.allow)
+
+class BusBridge:
+    """Exports events of a bus to other nodes and publishes the events they export to it."""
+    def __init__(self, event_bus, node_id: str = None, listen: str = None, peers=(), export=(), import_=("*",),
+                 connections: int = 1, batch_size: int = 256, flush_interval: float = 0, max_pending: int = 10000,
+                 max_hops: int = 8, secret=None, connect_timeout: float = 5, reconnect_delay: float = 0.5,
+                 reconnect_max: float = 10):
+        """
+        :param node_id: Name of this node, unique among the linked nodes (default "<hostname>-<pid>").
+        :param listen: Address the other nodes dial, None to only dial out.
+        :param peers: Addresses of the nodes to dial.
+        :param export: Event types sent to the linked nodes.
+        :param import_: Event types accepted from the linked nodes.
+        :param connections: Connections per dialed peer, event types are spread over them by hash.
+        :param batch_size: Events sent in one frame at most.
+        :param flush_interval: Seconds a connection may wait for a batch to fill up (0 = send what is pending).
+        :param max_pending: Events buffered per connection while it is slow or down.
+        :param max_hops: Nodes an event may go through.
+        :param secret: Shared key (str or bytes): frames are signed and checked with HMAC-SHA256.
+                       Required to listen on or dial a non-loopback TCP address.
+        :param reconnect_delay: First delay before redialing a lost peer, doubled up to reconnect_max.
+        """
+        self.event_bus = event_bus
+        self.node_id = node_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.listen = listen
+        self.peers = [peers] if isinstance(peers, str) else list(peers)
+        self.export = TopicRules(export)
+        self.import_ = TopicRules(import_)
+        self.connections = max(1, connections)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_hops = max_hops
+        self.secret = secret.encode("utf-8") if isinstance(secret, str) else secret
+        if not self.secret:
+            for address in ([listen] if listen else []) + self.peers:
+                if not _is_loopback(address):
+                    raise ValueError(f"Bridging '{address}' needs a secret: frames are unpickled, "
+                                     f"an unauthenticated peer could run code on this node.")
+        self.connect_timeout = connect_timeout
+        self.reconnect_delay = reconnect_delay
+        self.reconnect_max = reconnect_max
+        self.exported = 0
+        self.imported = 0
+        self.loops = 0          # records dropped because they came back to a node they went through
+        self.duplicates = 0     # records dropped because the event already arrived over another path
+        self.filtered = 0       # records received but not allowed by the import rules
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._links = []        # every link, for stop() and stats()
+        self._dialed = {}       # peer address -> [_Link], kept and redialed while the bridge runs
+        self._accepted = {}     # node id -> [_Link] opened by that node
+        self._routes = ()       # link groups the exports go to, rebuilt when a link comes up or goes down
+        self._exporters = {}    # export rule -> batch subscriber on the bus
+        self._seen = set()      # (origin, seq, timestamp) of the latest SEEN_WINDOW imported events
+        self._seen_order = deque()
+        self._server = None
+        self._accept_thread = None
+
+    def start(self):
+        """Listen, dial the peers and subscribe to the exported event types."""
+        self._stop.clear()
+        if self.listen:
+            self._server = _listen(self.listen)
+            self._accept_thread = threading.Thread(target=self._accept_loop, name="Thread-bridge_listen", daemon=True)
+            self._accept_thread.start()
+        with self._lock:
+            for address in self.peers:
+                links = self._dialed[address] = [_Link(self, address=address) for _ in range(self.connections)]
+                self._links.extend(links)
+            self._update_routes()
+        for links in self._dialed.values():
+            for link in links:
+                link.start()
+        for rule in self.export.allow:
+            self._exporters[rule] = exporter = self._exporter(rule)
+            self.event_bus.subscribe(rule, exporter, batch_size=self.batch_size, pass_event_type=True, pass_event=True)
+        logger.info(f"[{plugin_name}] Node '{self.node_id}' bridging (listen: {self.listen}, peers: {self.peers}, "
+                    f"export: {self.export.allow + ['!' + rule for rule in self.export.deny]}, "
+                    f"import: {self.import_.allow + ['!' + rule for rule in self.import_.deny]}).")
+
+    def stop(self, timeout: float = 2):
+        """Stop exporting, send what is pending and close every link."""
+        for rule, exporter in self._exporters.items():
+            self.event_bus.unsubscribe(rule, exporter)
+        self._exporters.clear()
+        self._stop.set()
+        if self._server is not None:
+            self._server.close()
+            if self._server.family == getattr(socket, "AF_UNIX", None):
+                _unlink(self.listen)
+            self._server = None
+        with self._lock:
+            links = list(self._links)
+        for link in links:
+            link.close()
+        for link in links:
+            link.join(timeout)
+        if self._accept_thread is not None:
+            self._accept_thread.join(timeout)
+            self._accept_thread = None
+        with self._lock:
+            self._links.clear()
+            self._dialed.clear()
+            self._accepted.clear()
+            self._routes = ()
+        logger.info(f"[{plugin_name}] Node '{self.node_id}' stopped bridging.")
+
+    def stats(self) -> dict:
+        with self._lock:
+            links = list(self._links)
+        return {"node": self.node_id, "listen": self.listen, "exported": self.exported, "imported": self.imported,
+                "loops": self.loops, "duplicates": self.duplicates, "filtered": self.filtered,
+                "links": [{"peer": link.address or "incoming", "node": link.node, "connected": link.connected,
+                           "pending": len(link.pending), "sent": link.sent, "received": link.received,
+                           "dropped": link.dropped, "reconnects": link.reconnects} for link in links]}
+
+#####################################################
+#                  Additional Functions
+#####################################################
+    def _exporter(self, rule: str):
+        """Batch subscriber of one export rule, turns the events into records for the linked nodes."""
+        def export(event_type, events):
+            if self.export.match(event_type) != rule:
+                return  # excluded, or exported by an earlier rule matching it too
+            node = self.node_id
+            records = []
+            relayed = False
+            for event in events:
+                source = event.source
+                if type(source) is RemoteSource:
+                    hops = source.hops + (node,)
+                    if len(hops) > self.max_hops:
+                        self.loops += 1
+                        continue
+                    records.append((event_type, event.data, source.origin, source.plugin, source.seq, source.timestamp,
+                                    hops))
+                    relayed = True
+                else:
+                    records.append((event_type, event.data, node, source, event.seq, event.timestamp, (node,)))
+            if not records:
+                return
+            shard = zlib.crc32(event_type.encode("utf-8"))
+            for links in self._routes:
+                link = links[shard % len(links)]
+                if relayed and link.node is not None:
+                    link.push([record for record in records if link.node not in record[6]])
+                else:
+                    link.push(records)
+            self.exported += len(records)
+        export.__qualname__ = f"BusBridge.export[{rule}]"
+        return export
+
+    def _import(self, link, records):
+        """Publish the records received from a link on the local bus."""
+        node = self.node_id
+        publish = self.event_bus.publish
+        seen, seen_order = self._seen, self._seen_order
+        for event_type, data, origin, plugin, seq, timestamp, hops in records:
+            if node in hops or len(hops) > self.max_hops:
+                self.loops += 1
+                continue
+            if self.import_.match(event_type) is None:
+                self.filtered += 1
+                continue
+            key = (origin, seq, timestamp)
+            with self._lock:
+                if key in seen:
+                    self.duplicates += 1
+                    continue
+                seen.add(key)
+                seen_order.append(key)
+                if len(seen_order) > SEEN_WINDOW:
+                    seen.discard(seen_order.popleft())
+            publish(event_type, data, source=RemoteSource(origin, plugin, hops, seq, timestamp))
+            self.imported += 1
+        link.received += len(records)
+
+    def _accept_loop(self):
+        server = self._server
+        while not self._stop.is_set():
+            try:
+                sock, _ = server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break  # closed by stop()
+            _tune(sock)
+            link = _Link(self, sock=sock)
+            with self._lock:
+                self._links.append(link)
+            link.start()
+
+    def _attach(self, link):
+        with self._lock:
+            if link.address is None:
+                self._accepted.setdefault(link.node, []).append(link)
+            self._update_routes()
+        logger.info(f"[{plugin_name}] Linked to node '{link.node}' ({link.address or 'incoming'}).")
+
+    def _detach(self, link):
+        with self._lock:
+            if link.address is None:
+                links = self._accepted.get(link.node, [])
+                if link in links:
+                    links.remove(link)
+                if not links:
+                    self._accepted.pop(link.node, None)
+                if link in self._links:
+                    self._links.remove(link)
+            self._update_routes()
+
+    def _update_routes(self):
+        """Rebuild the link groups of the exports (called with the lock held)."""
+        dialed_nodes = {link.node for links in self._dialed.values() for link in links}
+        routes = [links for links in self._dialed.values()]  # buffer while down, so always routed
+        for node, links in self._accepted.items():
+            if node in dialed_nodes:
+                continue  # both nodes dial each other: each one sends over the links it dialed
+            routes.append(list(links))
+        self._routes = tuple(routes)
+
+    def _handshake(self, sock):
+        """Exchange HELLO frames, return the other node's id and a buffered reader of the connection."""
+        sock.settimeout(self.connect_timeout)
+        self._send(sock, HELLO, json.dumps({"node": self.node_id, "protocol": PROTOCOL}).encode("utf-8"))
+        reader = sock.makefile("rb")
+        kind, payload = self._receive(reader)
+        if kind != HELLO:
+            raise BridgeError(f"Expected HELLO, got frame kind {kind}")
+        hello = json.loads(bytes(payload))
+        if hello.get("protocol") != PROTOCOL:
+            raise BridgeError(f"Protocol {hello.get('protocol')} not supported (this node speaks {PROTOCOL})")
+        if hello.get("node") == self.node_id:
+            raise BridgeError(f"Connected to itself (node '{self.node_id}')")
+        sock.settimeout(None)
+        return hello["node"], reader
+
+    def _send(self, sock, kind: int, payload: bytes):
+        if self.secret is not None:
+            payload = hmac.new(self.secret, payload, hashlib.sha256).digest() + payload
+        sock.sendall(FRAME.pack(len(payload), kind) + payload)
+
+    def _receive(self, reader):
+        """Read one frame, return (kind, payload). Raises EOFError when the connection closed."""
+        header = reader.read(FRAME.size)
+        if len(header) < FRAME.size:
+            raise EOFError("connection closed")
+        length, kind = FRAME.unpack(header)
+        if length > MAX_FRAME:
+            raise BridgeError(f"Frame of {length} bytes is over the {MAX_FRAME} bytes limit")
+        payload = reader.read(length)
+        if len(payload) < length:
+            raise EOFError("connection closed in the middle of a frame")
+        if self.secret is not None:
+            payload = memoryview(payload)
+            digest, payload = payload[:DIGEST_SIZE], payload[DIGEST_SIZE:]
+            if not hmac.compare_digest(digest, hmac.new(self.secret, payload, hashlib.sha256).digest()):
+                raise BridgeError("Frame signature mismatch (wrong or missing secret)")
+        return kind, payload
+
+    def _encode(self, link, records) -> bytes:
+        try:
+            return pickle.dumps(records, pickle.HIGHEST_PROTOCOL)
+        except Exception:  # drop what can't be pickled, send the rest
+            kept = []
+            for record in records:
+                try:
+                    pickle.dumps(record[1], pickle.HIGHEST_PROTOCOL)
+                    kept.append(record)
+                except Exception as e:
+                    link.dropped += 1
+                    logger.error(f"[{plugin_name}] Can't send '{record[0]}' to '{link.node}', data not picklable: {e}")
+            return pickle.dumps(kept, pickle.HIGHEST_PROTOCOL)
+
+class _Link:
+    """
+    One connection with another node. Dialed links redial when the connection is lost, accepted ones end with it.
+    Its thread owns the connection and writes the batches, a reader thread publishes what arrives.
+    """
+    def __init__(self, bridge: BusBridge, address: str = None, sock=None):
+        self.bridge = bridge
+        self.address = address      # dialed links only
+        self.node = None            # the other node's id, known after the handshake
+        self.sock = sock
+        self.connected = False
+        self.pending = deque()
+        self.sent = 0
+        self.received = 0
+        self.dropped = 0
+        self.reconnects = 0
+        self._ready = threading.Condition()
+        self._broken = False        # the reader lost the connection, or close() was called
+        self._thread = None
+
+    def start(self):
+        kind = "out" if self.address else "in"
+        self._thread = threading.Thread(target=self._run, name=f"Thread-bridge_{kind}_{next(_link_ids)}", daemon=True)
+        self._thread.start()
+
+    def push(self, records):
+        with self._ready:
+            pending = self.pending
+            pending.extend(records)
+            overflow = len(pending) - self.bridge.max_pending
+            if overflow > 0:
+                for _ in range(overflow):
+                    pending.popleft()
+                self.dropped += overflow
+            self._ready.notify()
+
+    def close(self):
+        with self._ready:
+            self._broken = True
+            self._ready.notify_all()
+
+    def join(self, timeout: float = None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+        sock = self.sock
+        if sock is not None:  # still blocked in a send
+            _shutdown(sock)
+
+    def _run(self):
+        bridge = self.bridge
+        delay = bridge.reconnect_delay
+        failures = 0
+        while not bridge._stop.is_set():
+            sock = self.sock
+            try:
+                if sock is None:
+                    sock = self.sock = _connect(self.address, bridge.connect_timeout)
+                self.node, reader = bridge._handshake(sock)
+            except (OSError, EOFError, BridgeError, ValueError) as e:
+                self._disconnect()
+                if self.address is None:
+                    logger.warning(f"[{plugin_name}] Refused an incoming link: {e}")
+                    bridge._detach(self)
+                    return
+                failures += 1
+                log = logger.warning if failures == 1 else logger.debug
+                log(f"[{plugin_name}] Can't link to '{self.address}' ({e}), retrying in {delay:.1f}s...")
+                bridge._stop.wait(delay)
+                delay = min(delay * 2, bridge.reconnect_max)
+                continue
+            delay = bridge.reconnect_delay
+            failures = 0
+            self.connected = True
+            bridge._attach(self)
+            reader_thread = threading.Thread(target=self._read_loop, args=(reader,),
+                                             name=f"{threading.current_thread().name}_read", daemon=True)
+            reader_thread.start()
+            try:
+                self._send_loop(sock)
+                if not bridge._stop.is_set():
+                    logger.info(f"[{plugin_name}] Node '{self.node}' closed the link.")
+            except OSError as e:
+                if not bridge._stop.is_set():
+                    logger.warning(f"[{plugin_name}] Link to node '{self.node}' lost: {e}")
+            finally:
+                self.connected = False
+                self._disconnect()
+                reader_thread.join(1)
+                reader.close()
+                bridge._detach(self)
+            if self.address is None:
+                return
+            self.reconnects += 1
+
+    def _send_loop(self, sock):
+        bridge = self.bridge
+        with self._ready:
+            self._broken = False
+        while True:
+            with self._ready:
+                while not self.pending and not self._broken:
+                    self._ready.wait()
+                if self._broken and not bridge._stop.is_set():
+                    return  # the reader saw the connection end, pending events wait for the next one
+                if bridge.flush_interval and len(self.pending) < bridge.batch_size and not self._broken:
+                    self._ready.wait(bridge.flush_interval)  # let the batch fill up
+                count = min(len(self.pending), bridge.batch_size)
+                records = [self.pending.popleft() for _ in range(count)]
+            if records:
+                try:
+                    bridge._send(sock, BATCH, bridge._encode(self, records))
+                except OSError:
+                    with self._ready:
+                        self.pending.extendleft(reversed(records))  # sent again after reconnecting
+                    raise
+                self.sent += len(records)
+            elif self._broken:
+                return  # stopping, everything pending was sent
+
+    def _read_loop(self, reader):
+        bridge = self.bridge
+        try:
+            while True:
+                kind, payload = bridge._receive(reader)  # signature checked there, before anything is unpickled
+                if kind == BATCH:
+                    bridge._import(self, pickle.loads(payload))
+        except (OSError, EOFError, ValueError) as e:
+            if not bridge._stop.is_set() and not isinstance(e, EOFError):
+                logger.warning(f"[{plugin_name}] Stopped reading from node '{self.node}': {e}")
+        except Exception as e:  # BridgeError, unpickling errors
+            logger.error(f"[{plugin_name}] Dropping the link to node '{self.node}': {e}")
+        finally:
+            self.close()  # the sender sees it and reconnects (or ends the accepted link)
+
+    def _disconnect(self):
+        sock, self.sock = self.sock, None
+        if sock is not None:
+            _shutdown(sock)
+            sock.close()
+
+def _split(rules):
+    names, patterns = set(), TopicIndex()
+    for rule in rules:
+        if is_pattern(rule):
+            patterns.add(rule)
+        else:
+            names.add(rule)
+    return names, patterns
+
+def _parse(address: str):
+    """Return (family, socket address) of "tcp://host:port" or "unix:///path"."""
+    if address.startswith("unix://"):
+        if not hasattr(socket, "AF_UNIX"):
+            raise ValueError(f"Unix sockets are not available on this platform: '{address}'")
+        return socket.AF_UNIX, address[len("unix://"):]
+    if address.startswith("tcp://"):
+        address = address[len("tcp://"):]
+    host, _, port = address.rpartition(":")
+    if not port.isdigit():
+        raise ValueError(f"Expected 'tcp://host:port' or 'unix:///path', got '{address}'")
+    return socket.AF_INET, (host.strip("[]") or "0.0.0.0", int(port))
+
+def _is_loopback(address: str) -> bool:
+    """True for a Unix socket or a TCP address only reachable from this machine."""
+    family, location = _parse(address)
+    if family != socket.AF_INET:
+        return True
+    if location[0] == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(location[0]).is_loopback
+    except ValueError:  # a host name, may resolve to anything
+        return False
+
+def _listen(address: str):
+    family, location = _parse(address)
+    if family == socket.AF_INET:
+        server = socket.create_server(location, family=socket.AF_INET6 if ":" in location[0] else socket.AF_INET)
+    else:
+        _unlink(address)  # left over by a node that crashed
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(location)
+        server.listen()
+    server.settimeout(0.5)  # the accept loop checks for stop() in between
+    return server
+
+def _connect(address: str, timeout: float):
+    family, location = _parse(address)
+    if family == socket.AF_INET:
+        sock = socket.create_connection(location, timeout)
+    else:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(location)
+        except OSError:
+            sock.close()
+            raise
+    _tune(sock)
+    return sock
+
+def _tune(sock):
+    if sock.family != getattr(socket, "AF_UNIX", None):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # frames are batched already
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+def _shutdown(sock):
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+def _unlink(address: str):
+    try:
+        os.unlink(_parse(address)[1])
+    except OSError:
+        pass
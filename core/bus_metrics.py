@@ -0,0 +1,270 @@
+"""
+File Location: core/bus_metrics.py
+Author: Lizza Celestia
+Version: ALizz_AI_V1_0
+Create Date: 2026-10-18
+Modified Date: 2026-10-18
+Description:
+    EventBus instrumentation, switched on and off at runtime with bus.enable_metrics() / bus.disable_metrics().
+    While off the bus only checks `self.metrics is None`, nothing is counted or timed.
+    Collects per event type: publishes, deliveries, time spent queued (histogram),
+    per worker: current and peak queue depth, per handler: execution time (histogram).
+    MetricsExporter writes them in Prometheus text format to a file and/or serves them over HTTP.
+"""
+from bisect import bisect_left
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import os
+import threading
+import time
+import logging
+logger = logging.getLogger(__name__)
+plugin_name = "Event_bus"
+
+# Histogram buckets in seconds, the last one is +Inf
+BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+class Histogram:
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of the observations."""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return BUCKETS[bucket] if bucket < len(BUCKETS) else self.max
+        return self.max
+
+    def summary(self) -> dict:
+        return {"count": self.count, "avg": self.total / self.count if self.count else 0.0,
+                "p50": self.percentile(0.5), "p99": self.percentile(0.99), "max": self.max}
+
+class BusMetrics:
+    """Counters of one EventBus, all updates under one short lock."""
+    def __init__(self, workers: int):
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.published = defaultdict(int)       # event type -> publish calls (events)
+        self.delivered = defaultdict(int)       # event type -> handler calls
+        self.queued = defaultdict(Histogram)    # event type -> time between publish and dispatch
+        self.handlers = defaultdict(Histogram)  # handler name -> execution time
+        self.peak_depth = [0] * workers
+        self._last_rates = (self.started, {})   # for rates between two stats() calls
+
+#####################################################
+#                  Hooks called by the bus
+#####################################################
+    def on_publish(self, event_type: str, count: int, worker: int, depth: int):
+        with self._lock:
+            self.published[event_type] += count
+            if depth > self.peak_depth[worker]:
+                self.peak_depth[worker] = depth
+
+    def on_deliver(self, event_type: str):
+        with self._lock:
+            self.delivered[event_type] += 1
+
+    def on_handler(self, event_type: str, handler: str, seconds: float):
+        with self._lock:
+            self.delivered[event_type] += 1
+            self.handlers[handler].observe(seconds)
+
+    def on_handler_time(self, handler: str, seconds: float):
+        with self._lock:
+            self.handlers[handler].observe(seconds)
+
+    def on_dequeue(self, event_type: str, seconds: float):
+        """Called by EventQueue (with its lock held) for each event leaving the queue."""
+        with self._lock:
+            self.queued[event_type].observe(seconds)
+
+    async def timed(self, coro, handler: str):
+        """Wrap an async handler's coroutine to measure its execution time."""
+        start = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            self.on_handler_time(handler, time.perf_counter() - start)
+
+#####################################################
+#                  Reading
+#####################################################
+    def snapshot(self, event_bus) -> dict:
+        """
+        Everything as plain data. Rates are events per second since the previous snapshot.
+        :param event_bus: The bus, for its current queue depths and drop counters.
+        """
+        now = time.monotonic()
+        with self._lock:
+            published = dict(self.published)
+            delivered = dict(self.delivered)
+            queued = {event_type: histogram.summary() for event_type, histogram in self.queued.items()}
+            handlers = {handler: histogram.summary() for handler, histogram in self.handlers.items()}
+            peak_depth = list(self.peak_depth)
+            last_time, last_published = self._last_rates
+            self._last_rates = (now, published)
+        elapsed = max(now - last_time, 1e-9)
+        topics = {}
+        for event_type in sorted(set(published) | set(delivered) | set(queued)):
+            topics[event_type] = {
+                "published": published.get(event_type, 0),
+                "delivered": delivered.get(event_type, 0),
+                "rate": (published.get(event_type, 0) - last_published.get(event_type, 0)) / elapsed,
+                "queued": queued.get(event_type),
+            }
+        offload_pools = event_bus.offload_pools
+        return {"uptime": now - self.started, "topics": topics, "handlers": handlers,
+                "queue_depth": event_bus.queue_depths(), "peak_queue_depth": peak_depth,
+                "dropped": event_bus.drop_counts(), "offload": offload_pools.stats() if offload_pools is not None else {}}
+
+    def prometheus(self, event_bus) -> str:
+        """The counters in Prometheus text exposition format."""
+        with self._lock:
+            published = dict(self.published)
+            delivered = dict(self.delivered)
+            queued = {event_type: _copy(histogram) for event_type, histogram in self.queued.items()}
+            handlers = {handler: _copy(histogram) for handler, histogram in self.handlers.items()}
+            peak_depth = list(self.peak_depth)
+        lines = []
+        _counter(lines, "alizz_bus_published_total", "Events published per event type.", "topic", published)
+        _counter(lines, "alizz_bus_delivered_total", "Handler calls per event type.", "topic", delivered)
+        lines += ["# HELP alizz_bus_dropped_total Events dropped, rejected or coalesced away.",
+                  "# TYPE alizz_bus_dropped_total counter"]
+        for event_type, outcomes in sorted(event_bus.drop_counts().items()):
+            for outcome, count in sorted(outcomes.items()):
+                lines.append(f'alizz_bus_dropped_total{{topic="{_escape(event_type)}",outcome="{outcome}"}} {count}')
+        lines += ["# HELP alizz_bus_queue_depth Pending events per dispatch worker.", "# TYPE alizz_bus_queue_depth gauge"]
+        lines += [f'alizz_bus_queue_depth{{worker="{worker}"}} {depth}' for worker, depth in enumerate(event_bus.queue_depths())]
+        lines += ["# HELP alizz_bus_queue_depth_peak Highest pending events per dispatch worker.",
+                  "# TYPE alizz_bus_queue_depth_peak gauge"]
+        lines += [f'alizz_bus_queue_depth_peak{{worker="{worker}"}} {depth}' for worker, depth in enumerate(peak_depth)]
+        _histograms(lines, "alizz_bus_queued_seconds", "Time events spent queued.", "topic", queued)
+        _histograms(lines, "alizz_bus_handler_seconds", "Handler execution time.", "handler", handlers)
+        offload_pools = event_bus.offload_pools
+        if offload_pools is not None:
+            pools = offload_pools.stats()
+            for name, text in (("queued", "Offloaded handler calls waiting for a worker."),
+                               ("running", "Offloaded handler calls running."),
+                               ("utilization", "Busy share of the pool's workers since it started.")):
+                lines += [f"# HELP alizz_offload_{name} {text}", f"# TYPE alizz_offload_{name} gauge"]
+                lines += [f'alizz_offload_{name}{{pool="{mode}"}} {stats[name]}' for mode, stats in pools.items()]
+        return "\n".join(lines) + "\n"
+
+class MetricsExporter:
+    """Exports a bus's metrics in Prometheus format: written to a file every `interval` and/or served on HTTP."""
+    def __init__(self, event_bus, path: str = None, port: int = None, interval: float = 10, host: str = "127.0.0.1"):
+        """
+        :param path: File rewritten (atomically) every interval, e.g. for node_exporter's textfile collector.
+        :param port: Serve http://host:port/metrics, scraped on demand.
+        """
+        self.event_bus = event_bus
+        self.path = path
+        self.port = port
+        self.host = host
+        self.interval = interval
+        self._stop = threading.Event()
+        self._threads = []
+        self._server = None
+
+    def start(self):
+        self._stop.clear()
+        if self.path:
+            thread = threading.Thread(target=self._write_loop, name="Thread-metrics_export", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        if self.port is not None:
+            exporter = self
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split("?")[0] not in ("/metrics", "/"):
+                        self.send_error(404)
+                        return
+                    body = exporter.render().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    logger.debug(f"[{plugin_name}] metrics http: {format % args}")
+
+            self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+            self.port = self._server.server_address[1]  # port 0 picks a free one
+            thread = threading.Thread(target=self._server.serve_forever, name="Thread-metrics_http", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+            logger.info(f"[{plugin_name}] Serving metrics on http://{self.host}:{self.port}/metrics")
+
+    def stop(self):
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        for thread in self._threads:
+            thread.join(2)
+        self._threads.clear()
+
+    def render(self) -> str:
+        metrics = self.event_bus.metrics
+        if metrics is None:
+            return "# metrics are disabled\n"
+        return metrics.prometheus(self.event_bus)
+
+    def _write_loop(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def write(self):
+        temporary = f"{self.path}.tmp"
+        try:
+            with open(temporary, "w", encoding="utf-8") as metrics_file:
+                metrics_file.write(self.render())
+            os.replace(temporary, self.path)
+        except OSError as e:
+            logger.warning(f"[{plugin_name}] Could not write metrics to '{self.path}': {e}")
+
+#####################################################
+#                  Additional Functions
+#####################################################
+def _copy(histogram):
+    copy = Histogram()
+    copy.counts = list(histogram.counts)
+    copy.count, copy.total, copy.max = histogram.count, histogram.total, histogram.max
+    return copy
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _counter(lines, name, help_text, label, values):
+    lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+    lines += [f'{name}{{{label}="{_escape(key)}"}} {value}' for key, value in sorted(values.items())]
+
+def _histograms(lines, name, help_text, label, histograms):
+    lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for key, histogram in sorted(histograms.items()):
+        key = _escape(key)
+        cumulative = 0
+        for bucket, count in enumerate(histogram.counts):
+            cumulative += count
+            bound = f"{BUCKETS[bucket]}" if bucket < len(BUCKETS) else "+Inf"
+            lines.append(f'{name}_bucket{{{label}="{key}",le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_sum{{{label}="{key}"}} {histogram.total}')
+        lines.append(f'{name}_count{{{label}="{key}"}} {histogram.count}')
@@ -3,57 +3,149 @@ File Location: core/core.py
 Author: Lizza Celestia
 Version: ALizz_AI_V1_0
 Create Date: 2025-02-12
-Modified Date: 2025-03-02
+Modified Date: 2026-10-18
 Description:
 """
 # core/core.py
 
 from core.plugin_manager import PluginManager
-from core.event_bus import EventBus
+from core.event_bus import EventBus, PRIORITY_HIGH
+from core.stream_channel import StreamChannel
+from core.plugin_watcher import PluginWatcher
+from core.bus_metrics import MetricsExporter
+from core.watchdog import Watchdog
+from core.event_journal import EventJournal
+from core.bus_bridge import BusBridge
+from core.offload import OffloadPools
 # import sys
-import threading
 import logging
 logger = logging.getLogger(__name__)
 
+# Control events served ahead of queued data events (PLUGIN_STOP_<name>/STOP_<name> are added per plugin)
+CONTROL_EVENTS = ("TERMINATE", "STOP_TTS", "MUTE_TTS", "DEAFEN_STT")
+
 class Core:
     """
     The core manages the system’s overall lifecycle and
     makes the event bus and plugin manager available to all plugins.
     """
-    def __init__(self, plugin_directory: str, priority_plugins):
-        self.event_bus = EventBus()
+    def __init__(self, plugin_directory: str, priority_plugins, event_bus_workers: int = 4,
+                 event_bus_native_async: bool = False, plugin_boot_workers: int = 4, watch_plugins: bool = False,
+                 metrics: bool = False, metrics_file: str = None, metrics_port: int = None,
+                 watchdog: bool = False, watchdog_isolate: bool = False, journal_dir: str = None, bridge: dict = None,
+                 shared_loops: int = 1, offload_io_workers: int = None, offload_cpu_workers: int = None):
+        """
+        :param metrics: Instrument the event bus from the start (bus.enable_metrics() also works at runtime).
+        :param metrics_file: Write the metrics in Prometheus text format to this file every 10s.
+        :param metrics_port: Serve the metrics on http://127.0.0.1:<port>/metrics.
+        :param watchdog: Report handlers over their time budget and plugin threads that stop making progress.
+        :param watchdog_isolate: Also cancel or move aside handlers over their hard budget (see core.watchdog).
+        :param journal_dir: Record every published event in this folder (see core.event_journal).
+        :param bridge: Link the event bus with other nodes, BusBridge options such as
+                       {"node_id": "audio", "peers": ["tcp://models.lan:7400"], "export": ["RUN_LLM"], "import_": ["TTS_*"]}
+                       (see core.bus_bridge).
+        :param shared_loops: Event loops (threads) shared by the `lightweight = True` plugins (see core.shared_loop).
+        :param offload_io_workers: Threads running the handlers marked "io" (see core.offload).
+        :param offload_cpu_workers: Processes running the handlers marked "cpu".
+        """
+        self.event_bus = EventBus(workers=event_bus_workers, native_async=event_bus_native_async)
+        if metrics:
+            self.event_bus.enable_metrics()
+        self.metrics_exporter = None
+        if metrics_file or metrics_port is not None:
+            self.metrics_exporter = MetricsExporter(self.event_bus, path=metrics_file, port=metrics_port)
+        for event_type in CONTROL_EVENTS:
+            self.event_bus.set_priority(event_type, PRIORITY_HIGH)
         # Pass 'self' into the PluginManager so it can access the core/event bus
-        self.plugin_manager = PluginManager(plugin_directory, core=self, priority_plugins=priority_plugins)
+        self.plugin_manager = PluginManager(plugin_directory, core=self, priority_plugins=priority_plugins,
+                                            boot_workers=plugin_boot_workers, shared_loops=shared_loops)
         self.module_threads = {}
+        self.stream_channels = {}  # name -> StreamChannel, raw audio/byte streams shared by plugins
+        self.plugin_watcher = PluginWatcher(self.plugin_manager) if watch_plugins else None  # hot-reload on file changes
+        self.watchdog = Watchdog(self.event_bus, self.plugin_manager, isolate=watchdog_isolate) if watchdog else None
+        self.journal = EventJournal(journal_dir) if journal_dir else None
+        self.event_bus.attach_journal(self.journal)
+        self.offload_pools = OffloadPools(offload_io_workers, offload_cpu_workers)  # started on first use
+        self.event_bus.attach_offload(self.offload_pools)
+        self.bridge = BusBridge(self.event_bus, **bridge) if bridge else None
 
     def boot(self):
         """
         Discover plugins, then initialize and start each one.
         """
         logger.info("Core booting up...")
+        if self.journal is not None:
+            self.journal.start()  # before the plugins, so their boot traffic is recorded
+        if self.bridge is not None:
+            try:
+                self.bridge.start()  # before the plugins, so the remote ones see their boot events
+            except (OSError, ValueError) as e:
+                logger.error(f"Could not start the 'Bus bridge', running standalone. Error: {e}")
+                self.bridge = None
         self.plugin_manager.discover_plugins()
         logger.info("All discovered plugins have been started.")
         logger.debug(f"Loaded Plugin successfully: {self.plugin_manager.loaded_plugins}")
 
-        logger.debug(f"Start 'Event bus' thread")
+        logger.debug(f"Start 'Event bus' threads ({self.event_bus.workers} workers)")
         try:
-            event_thread = threading.Thread(target=self.event_bus.process_events,name=f"Thread-event_bus", daemon=True)
-            event_thread.start()
+            self.event_bus.start()
         except Exception as e:
-            logger.error(f"Could not start the 'Event bus' thread. Error: {e}")
+            logger.error(f"Could not start the 'Event bus' threads. Error: {e}")
 
-    def shutdown(self):
+        if self.plugin_watcher is not None:
+            self.plugin_watcher.start()
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.start()
+        if self.watchdog is not None:
+            self.watchdog.start()
+
+    def open_stream_channel(self, name: str, capacity: int = 1 << 20, topic: str = None):
         """
-        Gracefully stop and unload all plugins.
+        Get the shared memory stream channel 'name', creating it on first use.
+        Producers write frames with channel.publish(frame), consumers subscribe to channel.topic
+        and read the frames zero-copy with channel.read(descriptor).
+        """
+        channel = self.stream_channels.get(name)
+        if channel is None:
+            channel = StreamChannel(capacity=capacity, event_bus=self.event_bus, topic=topic or f"STREAM_{name}")
+            self.stream_channels[name] = channel
+            logger.info(f"Stream channel '{name}' opened ({capacity} bytes, shared memory '{channel.name}').")
+        return channel
+
+    def shutdown(self, timeout: float = 10):
+        """
+        Gracefully stop and unload all plugins, in parallel.
+        :param timeout: Global deadline in seconds, plugins still running after it are reported.
         """
         logger.info("Core, shutting down all plugins...")
-        for plugin_name in list(self.plugin_manager.loaded_plugins.keys()):
-            self.plugin_manager.unload_plugin(plugin_name)
+        if self.plugin_watcher is not None:
+            self.plugin_watcher.stop()
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.stop()
+        if self.watchdog is not None:
+            self.watchdog.stop()
+        for plugin_name in list(self.plugin_manager.lazy_plugins):  # no activations while shutting down
+            self.plugin_manager.lazy_plugins[plugin_name].unregister()
+            del self.plugin_manager.lazy_plugins[plugin_name]
+        overran = self.plugin_manager.stop_plugins(list(self.plugin_manager.loaded_plugins.keys()), timeout)
+        if overran:
+            logger.warning(f"Plugins that overran the {timeout}s shutdown deadline: {overran}")
+        self.plugin_manager.shared_loops.shutdown()
+        self.offload_pools.shutdown(timeout)  # queued calls of the stopped plugins are cancelled
         logger.info("All plugins unloaded. Shutdown complete.")
 
+        for name, channel in list(self.stream_channels.items()):
+            channel.close()
+            del self.stream_channels[name]
+
+        if self.bridge is not None:
+            self.bridge.stop()  # after the plugins, their last events still reach the other nodes
+
         logger.debug("Publishing 'TERMINATE' Event.")
         self.event_bus.publish(
             "TERMINATE",
             {"message": False}
             )
+        if self.journal is not None:
+            self.journal.close()
         
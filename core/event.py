@@ -0,0 +1,92 @@
+"""
+File Location: core/event.py
+Author: Lizza Celestia
+Version: ALizz_AI_V1_0
+Create Date: 2026-10-18
+Modified Date: 2026-10-18
+Description:
+    The envelope of an event on the EventBus: one slotted object from publish to the handlers, through the
+    queue, the dispatch, the metrics (queued time), the tracer (span) and the journal.
+    Handlers keep receiving the data, subscribe(..., pass_event=True) hands them the Event instead.
+    Topic names are interned once into small integer ids (TOPICS), shared by every bus of the process.
+"""
+import contextvars
+import sys
+import threading
+
+class TopicTable:
+    """Interns topic names into integer ids: name -> id is a dict lookup, id -> name a list index."""
+    def __init__(self):
+        self._ids = {}
+        self._names = []
+        self._lock = threading.Lock()
+
+    def intern(self, name: str) -> int:
+        topic_id = self._ids.get(name)
+        if topic_id is None:
+            with self._lock:
+                topic_id = self._ids.get(name)
+                if topic_id is None:
+                    self._names.append(sys.intern(name))
+                    topic_id = self._ids[name] = len(self._names) - 1
+        return topic_id
+
+    def name(self, topic_id: int) -> str:
+        return self._names[topic_id]
+
+    def __len__(self):
+        return len(self._names)
+
+TOPICS = TopicTable()
+
+class Event:
+    """
+    One published event.
+    - topic_id:  interned id of the event type (TOPICS.name(topic_id), or event.topic)
+    - seq:       sequence number, increasing per bus in publish order
+    - timestamp: publish time, time.time_ns()
+    - source:    publishing plugin (name of its thread without "Thread-"), or the source given to publish()
+    - data:      the payload handlers receive
+    - span:      tracing span while the bus is traced, else None
+    """
+    __slots__ = ("topic_id", "seq", "timestamp", "source", "data", "span")
+
+    def __init__(self, topic_id: int, seq: int, timestamp: int, source: str, data, span=None):
+        self.topic_id = topic_id
+        self.seq = seq
+        self.timestamp = timestamp
+        self.source = source
+        self.data = data
+        self.span = span
+
+    @property
+    def topic(self) -> str:
+        return TOPICS._names[self.topic_id]
+
+    def with_data(self, data):
+        """The same event carrying other data (a request's payload instead of the request)."""
+        return Event(self.topic_id, self.seq, self.timestamp, self.source, data, self.span)
+
+    def __repr__(self):
+        return f"Event({self.topic!r}, seq={self.seq}, source={self.source!r}, data={self.data!r})"
+
+_thread_source = threading.local()
+task_source = contextvars.ContextVar("task_source", default=None)  # plugin of a task on a shared loop
+
+def current_source() -> str:
+    """
+    Source of the events published from this thread: plugin threads are named "Thread-<plugin>",
+    on threads shared by several plugins (see share_thread_source) it is the plugin of the running task.
+    """
+    try:
+        name = _thread_source.name
+    except AttributeError:
+        name = threading.current_thread().name
+        _thread_source.name = name = name[7:] if name.startswith("Thread-") else name
+    if name is None:
+        return task_source.get() or threading.current_thread().name
+    return name
+
+def share_thread_source():
+    """The current thread runs tasks of several plugins: their events take the source from task_source."""
+    _thread_source.name = None
@@ -3,44 +3,433 @@ File Location: core/event_bus.py
 Author: Lizza Celestia
 Version: ALizz_AI_V1_0
 Create Date: 2025-02-13
-Modified Date: 2025-03-02
+Modified Date: 2026-10-18
 Description:
 """
 # import asyncio
 from collections import defaultdict
+from concurrent.futures import Future
 import asyncio
-import queue
+import fnmatch
+import itertools
+import threading
+import time
+import zlib
+from core.topic_index import TopicIndex, is_pattern
+from core.event_request import EventRequest, RequestTimeout, NoResponders
+from core.bus_metrics import BusMetrics
+from core.tracing import Tracer
+from core.event import Event, TOPICS, current_source
+from core.offload import OFFLOAD_MODES, CPU
+from core.event_queue import (EventQueue, EventQueueFull, POLICIES, BLOCK, DROP_OLDEST, DROP_NEWEST, FAIL,
+                              PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW, DEFAULT_LANES,
+                              QUEUED, COALESCED, DROPPED_OLDEST, DROPPED_NEWEST, NO_SUBSCRIBERS, FULL, DELIVERED)
 import logging
 logger = logging.getLogger(__name__)
 plugin_name = "Event_bus"
 
+class Subscription:
+    """
+    One subscriber of an event type.
+    Remembers the plugin owning the callback so async handlers can be
+    handed to that plugin's own event loop instead of a throwaway one.
+    """
+    __slots__ = ("callback", "owner", "loop", "is_async", "batch_size", "batch_timeout", "pass_event_type", "pass_event",
+                 "name", "soft_timeout", "hard_timeout", "offload", "hold")
+
+    def __init__(self, callback, loop=None, batch_size: int = 0, batch_timeout: float = 0, pass_event_type: bool = False,
+                 soft_timeout: float = None, hard_timeout: float = None, pass_event: bool = False, offload: str = None,
+                 hold=None):
+        self.callback = callback
+        self.owner = getattr(callback, "__self__", None)    # the plugin instance for bound methods
+        self.loop = loop                                    # explicit loop, overrides the owner's loop
+        self.is_async = asyncio.iscoroutinefunction(callback)
+        self.batch_size = batch_size                        # > 0: callback receives a list of events
+        self.batch_timeout = batch_timeout
+        self.pass_event_type = pass_event_type              # callback(event_type, data), for wildcard subscribers
+        self.pass_event = pass_event                        # callback receives the Event envelope instead of its data
+        self.name = getattr(callback, "__qualname__", repr(callback))
+        self.soft_timeout = soft_timeout                    # watchdog budgets, None = the watchdog's defaults
+        self.hard_timeout = hard_timeout
+        self.offload = offload                              # "io"/"cpu": sync callback runs on that pool
+        self.hold = hold                                    # predicate: subscriptions kept off its event types
+
+    def target_loop(self):
+        """Return the loop this subscriber's coroutines should run on, or None if it is not running."""
+        loop = self.loop
+        if loop is None and self.owner is not None:
+            loop = getattr(self.owner, "loop", None)
+        if loop is None or loop.is_closed() or not loop.is_running():
+            return None
+        return loop
+
+    def payload(self, event):
+        """What the callback receives for one event."""
+        return event if self.pass_event else event.data
+
+class TopicOptions:
+    """Per event type queue settings, set with subscribe() or configure_topic()."""
+    __slots__ = ("maxsize", "policy", "priority", "coalesce")
+
+    def __init__(self, maxsize: int, policy: str, priority: int = PRIORITY_NORMAL, coalesce: bool = False):
+        self.maxsize = maxsize
+        self.policy = policy
+        self.priority = priority
+        self.coalesce = coalesce    # latest-value event type: pending events are replaced, last value retained
+
 class EventBus:
-    def __init__(self):
-        self._subscribers = defaultdict(list)
-        self.event_queue = queue.Queue()
+    def __init__(self, workers: int = 1, default_maxsize: int = 1000, default_policy: str = BLOCK,
+                 lanes: int = DEFAULT_LANES, lane_weights=None, native_async: bool = False):
+        """
+        :param workers: Number of dispatch threads. Each event type is pinned to one worker
+                        (hash of the name), so events of one type stay in order while
+                        unrelated types are delivered in parallel.
+        :param default_maxsize: Pending events allowed per event type before the overflow policy applies (0 = unbounded).
+        :param default_policy: Overflow policy for event types that don't choose one (see core.event_queue).
+        :param lanes: Number of priority lanes per worker, 0 is served first (PRIORITY_HIGH).
+        :param lane_weights: Optional dispatch share per lane, keeps low lanes from starving.
+        :param native_async: asyncio mode: publish() hands events whose subscribers are all plain async
+                             handlers straight to their loops, skipping the queue and the worker thread
+                             (apublish() always does). Queue options don't apply to those event types.
+        """
+        if default_policy not in POLICIES:
+            raise ValueError(f"Unknown queue policy '{default_policy}', expected one of {POLICIES}")
+        self._subscribers = defaultdict(list)             # exact event type -> [Subscription]
+        self._pattern_subscribers = defaultdict(list)     # wildcard pattern -> [Subscription]
+        self._patterns = TopicIndex()
+        self._match_cache = {}  # event type -> every Subscription it reaches, cleared when subscriptions change
+        self._lock = threading.Lock()
+        self.default_maxsize = default_maxsize
+        self.default_policy = default_policy
+        self.native_async = native_async
+        self._topic_options = {}
+        self._drop_counts = defaultdict(lambda: defaultdict(int))
+        self._retained = {}  # last value of each coalesced event type
+        self._batch_limits = {}     # event type -> largest batch_size of its batch subscribers (filled with the cache)
+        self._batch_timeouts = {}   # event type -> longest batch_timeout of its batch subscribers
+        self.workers = max(1, int(workers))
+        self.lanes = lanes
+        self._worker_queues = [EventQueue(lanes, lane_weights) for _ in range(self.workers)]
+        self._worker_threads = []
+        self._running_workers = 0
+        self._loop_lock = threading.Lock()
+        self._fallback_loop = None  # shared loop for async handlers whose plugin loop is not running
+        self._request_ids = itertools.count(1)
+        self._seq = itertools.count(1)  # Event.seq
+        self.metrics = None  # BusMetrics while instrumentation is enabled, see enable_metrics()
+        self.watchdog = None  # Watchdog timing the handlers while it runs, see core.watchdog
+        self.tracer = None  # Tracer while events are traced, see enable_tracing()
+        self.journal = None  # EventJournal recording every published event, see attach_journal()
+        self.offload_pools = None  # OffloadPools running the io/cpu handlers, see attach_offload()
 
-    def subscribe(self, event_type: str, callback):
+    def subscribe(self, event_type: str, callback, loop=None, maxsize: int = None, policy: str = None,
+                  priority: int = None, coalesce: bool = None, batch_size: int = 0, batch_timeout: float = 0,
+                  pass_event_type: bool = False, soft_timeout: float = None, hard_timeout: float = None,
+                  pass_event: bool = False, offload: str = None, hold=None):
         """
         Subscribe a callback to a specific event type.
-        :param event_type: The event type to listen for.
+        :param event_type: The event type to listen for, or a glob pattern such as "PLUGIN_STATUS_*"
+                           matching every current and future event type of that shape.
         :param callback: An async function to be called when the event is published.
+        :param loop: Optional event loop the callback must run on. Defaults to the loop of the
+                     plugin owning the callback (plugin.loop), resolved at dispatch time.
+        :param maxsize: Optional limit of pending events for this event type (see configure_topic).
+        :param policy: Optional overflow policy for this event type (see configure_topic).
+        :param priority: Optional priority lane for this event type (see configure_topic).
+        :param coalesce: Optional latest-value mode for this event type (see configure_topic).
+        :param batch_size: If > 0 the callback is a batch subscriber: it receives a list of up to
+                           batch_size pending events in one call instead of one call per event.
+        :param batch_timeout: Seconds the dispatch worker may wait for a batch to fill up.
+                              The worker delivers nothing else meanwhile, keep it short (0 = send what is pending).
+        :param pass_event_type: Call callback(event_type, data) instead of callback(data), useful with patterns.
+        :param soft_timeout: Seconds this handler may run before the watchdog warns about it.
+        :param hard_timeout: Seconds before the watchdog reports it stuck (and isolates it, if enabled).
+        :param pass_event: Call callback(event) with the core.event.Event (seq, timestamp, source, data)
+                           instead of callback(data).
+        :param offload: "io" or "cpu" to run a blocking sync callback on the core's thread or process pool
+                        instead of the dispatch worker, defaults to the @offload(...) mark of the callback
+                        (see core.offload). Without attached pools the callback runs inline.
+        :param hold: Optional predicate on Subscription: while this callback is subscribed, the other subscriptions
+                     of the event type it accepts don't get the events, only deliver_to() reaches them
+                     (a lazy plugin's stand-in handing its buffered events over first, see core.lazy_plugin).
         """
-        self._subscribers[event_type].append(callback)
+        pattern = is_pattern(event_type)
+        if offload is None:
+            offload = getattr(callback, "offload", None)
+        if offload is not None:
+            if offload not in OFFLOAD_MODES:
+                raise ValueError(f"Unknown offload mode '{offload}', expected one of {OFFLOAD_MODES}")
+            if asyncio.iscoroutinefunction(callback):
+                logger.warning(f"[{plugin_name}] '{event_type}': async handlers run on their loop, offload ignored.")
+                offload = None
+            elif offload == CPU and hasattr(callback, "__self__"):
+                raise ValueError(f"'{event_type}': cpu handlers run in another process, subscribe a module-level function")
+        if not pattern:
+            TOPICS.intern(event_type)  # resolved once here, publishes find the id with a dict lookup
+        if maxsize is not None or policy is not None or priority is not None or coalesce is not None:
+            if pattern:
+                logger.warning(f"[{plugin_name}] Queue options are set per event type, ignored for pattern '{event_type}'.")
+            else:
+                self.configure_topic(event_type, maxsize=maxsize, policy=policy, priority=priority, coalesce=coalesce)
+        subscription = Subscription(callback, loop, batch_size, batch_timeout, pass_event_type, soft_timeout, hard_timeout,
+                                    pass_event, offload, hold)
+        with self._lock:
+            if pattern:
+                if event_type not in self._pattern_subscribers:
+                    self._patterns.add(event_type)
+                self._pattern_subscribers[event_type].append(subscription)
+            else:
+                self._subscribers[event_type].append(subscription)
+            self._invalidate_matches(event_type)
 
-    def publish(self, event_type: str, data=None):
+    def configure_topic(self, event_type: str, maxsize: int = None, policy: str = None, priority: int = None,
+                        coalesce: bool = None):
+        """
+        Set the queue limit, overflow policy, priority lane and latest-value mode of an event type.
+        :param maxsize: Pending events allowed before the policy applies, 0 for unbounded.
+        :param policy: BLOCK, DROP_OLDEST, DROP_NEWEST or FAIL (core.event_queue).
+        :param priority: Lane number, PRIORITY_HIGH (0) overtakes queued PRIORITY_NORMAL/LOW traffic.
+        :param coalesce: True for state events where only the newest value matters: a pending event is
+                         replaced by newer ones and the last value is kept for last_value().
         """
-        Publish an event to all subscribers of the event type.
+        if policy is not None and policy not in POLICIES:
+            raise ValueError(f"Unknown queue policy '{policy}', expected one of {POLICIES}")
+        if priority is not None and not 0 <= priority < self.lanes:
+            raise ValueError(f"Priority {priority} out of range, the bus has {self.lanes} lanes")
+        with self._lock:
+            options = self._topic_options.get(event_type)
+            if options is None:
+                options = self._topic_options[event_type] = TopicOptions(self.default_maxsize, self.default_policy)
+            if maxsize is not None:
+                options.maxsize = maxsize
+            if policy is not None:
+                options.policy = policy
+            if priority is not None:
+                options.priority = priority
+            if coalesce is not None:
+                options.coalesce = coalesce
+                if not coalesce:
+                    self._retained.pop(event_type, None)
+        logger.debug(f"[{plugin_name}] '{event_type}' queue: maxsize={options.maxsize}, policy={options.policy}, "
+                     f"priority={options.priority}, coalesce={options.coalesce}")
+
+    def set_priority(self, event_type: str, priority: int = PRIORITY_HIGH):
+        """Register an event type on a priority lane, by default as high priority control traffic."""
+        self.configure_topic(event_type, priority=priority)
+
+    def publish(self, event_type: str, data=None, block: bool = True, source: str = None):
+        """
+        Publish an event to all subscribers of the event type. Safe to call from any thread.
         :param event_type: The event type.
         :param data: The data to pass to the subscribers.
-        """               
-        if event_type in self._subscribers:
-            self.event_queue.put((event_type, data))
+        :param block: False returns FULL instead of waiting when a BLOCK policy queue is full.
+        :param source: Publisher recorded in the Event, defaults to the plugin owning the calling thread.
+        :return: QUEUED, DELIVERED, COALESCED, DROPPED_OLDEST, DROPPED_NEWEST, FULL or NO_SUBSCRIBERS,
+                 so producers can slow down.
+        :raises EventQueueFull: if the event type uses the FAIL policy and its queue is full.
+        """
+        options = self._topic_options.get(event_type)
+        if options is not None and options.coalesce:
+            self._retained[event_type] = data
+        event = self._envelope(event_type, data, source)
+
+        if event_type == "TERMINATE":
+            for worker_queue in self._worker_queues:  # every worker has to stop
+                worker_queue.put(event_type, event, priority=PRIORITY_HIGH)
+            return QUEUED
+
+        journal = self.journal
+        if journal is not None:
+            journal.record(event)
+
+        if self._resolve(event_type):
+            tracer = self.tracer
+            if tracer is not None:
+                span = event.span = tracer.start(event_type)
+            if self.native_async:
+                subscribers = self._direct_subscribers(event_type, options)
+                if subscribers:
+                    self._deliver_direct(event_type, subscribers, event)
+                    return DELIVERED
+            worker = self._worker_index(event_type)
+            worker_queue = self._worker_queues[worker]
+            try:
+                if options is None:
+                    outcome = worker_queue.put(event_type, event, self.default_maxsize, self.default_policy,
+                                               block=block)
+                else:
+                    outcome = worker_queue.put(event_type, event, options.maxsize, options.policy,
+                                               options.priority, options.coalesce, block)
+            except EventQueueFull:
+                self._count_drop(event_type, "rejected")
+                raise
+            metrics = self.metrics
+            if metrics is not None:
+                metrics.on_publish(event_type, 1, worker, worker_queue.qsize())
+            if tracer is not None and outcome in (QUEUED, COALESCED, DROPPED_OLDEST):
+                span.enqueued()
+            if outcome == FULL:
+                return outcome
+            if outcome != QUEUED:
+                self._count_drop(event_type, outcome)
+                if outcome != COALESCED:
+                    logger.debug(f"[{plugin_name}] Queue full for '{event_type}': {outcome}")
+            return outcome
+
+        elif options is not None and options.coalesce:
+            logger.debug(f"[{plugin_name}] No subscriber for '{event_type}', value retained: {data}")
+            return NO_SUBSCRIBERS
 
-        elif event_type == "TERMINATE":
-            self.event_queue.put((event_type, data))
-            
         else:
             logger.warning(f"[{plugin_name}] There is NO subcription for Event: {event_type}, data:{data}")
+            return NO_SUBSCRIBERS
+
+    async def apublish(self, event_type: str, data=None, source: str = None):
+        """
+        Awaitable publish for coroutines.
+        Event types whose subscribers are all plain async handlers (no batch, not coalesced) are handed
+        straight to the subscribers' loops: no queue, no worker thread, and a handler living on the
+        caller's own loop is started as a task right here. Other event types go through the queue,
+        waiting for room (BLOCK policy) without blocking the caller's loop.
+        :return: Same outcomes as publish().
+        """
+        source = source or current_source()  # before a possible hop to an executor thread
+        if event_type != "TERMINATE":
+            subscribers = self._direct_subscribers(event_type, self._topic_options.get(event_type))
+            if subscribers:
+                event = self._envelope(event_type, data, source)
+                journal = self.journal
+                if journal is not None:
+                    journal.record(event)
+                tracer = self.tracer
+                if tracer is not None:
+                    event.span = tracer.start(event_type)
+                self._deliver_direct(event_type, subscribers, event)
+                return DELIVERED
+        outcome = self.publish(event_type, data, False, source)
+        if outcome == FULL:
+            outcome = await asyncio.get_running_loop().run_in_executor(None, self.publish, event_type, data, True, source)
+        return outcome
+
+    async def stream(self, event_type: str, maxsize: int = 0):
+        """
+        Async iterator over the events of an event type (or pattern), for the caller's loop:
+            async for event_type, data in bus.stream("PLUGIN_STATUS_*"): ...
+        Subscribes on first iteration and unsubscribes when the generator is closed: leaving the loop
+        with break/return closes it on garbage collection, wrap it in contextlib.aclosing() to do it right away.
+        :param maxsize: Buffered events kept for a slow consumer (0 = unbounded), the oldest is dropped beyond it.
+        """
+        loop = asyncio.get_running_loop()
+        events = asyncio.Queue(maxsize)
+
+        def put(item):
+            if events.full():
+                events.get_nowait()
+                self._count_drop(item[0], "stream_dropped")
+            events.put_nowait(item)
+
+        def push(matched_event_type, data):
+            if _running_loop() is loop:
+                put((matched_event_type, data))
+            else:
+                loop.call_soon_threadsafe(put, (matched_event_type, data))
+        push.__qualname__ = f"EventBus.stream[{event_type}]"
+
+        self.subscribe(event_type, push, pass_event_type=True)
+        try:
+            while True:
+                yield await events.get()
+        finally:
+            self.unsubscribe(event_type, push)
+
+    def request(self, event_type: str, data=None, timeout: float = None):
+        """
+        Send an event and get the first reply: the first value other than None returned by a handler.
+        Batch subscribers don't receive requests. Never wait on the result from a sync handler running
+        on a dispatch worker, it would wait on itself.
+        :param timeout: Seconds before the future fails with RequestTimeout, None to wait for every handler
+                        (use one on event types with a drop policy, a dropped request is never answered).
+        :return: A concurrent.futures.Future holding the reply, None if every handler returned None,
+                 or NoResponders / RequestTimeout / the first handler error.
+        """
+        return self._send_request(event_type, data, timeout, gather=False)
+
+    def gather(self, event_type: str, data=None, timeout: float = 1.0):
+        """
+        Scatter-gather: send an event and collect the replies of all its handlers until the deadline.
+        :param timeout: Seconds to wait for slow handlers, None to wait for every handler.
+        :return: A concurrent.futures.Future holding {responder: reply}, the responder being the plugin
+                 owning the handler (or the handler function). Handlers that failed or were late are missing.
+        """
+        return self._send_request(event_type, data, timeout, gather=True)
+
+    async def arequest(self, event_type: str, data=None, timeout: float = None):
+        """Awaitable request()."""
+        return await asyncio.wrap_future(self.request(event_type, data, timeout))
+
+    async def agather(self, event_type: str, data=None, timeout: float = 1.0):
+        """Awaitable gather()."""
+        return await asyncio.wrap_future(self.gather(event_type, data, timeout))
+
+    def publish_many(self, event_type: str, items, source: str = None):
+        """
+        Publish several events of one type with a single queue round-trip.
+        Meant for high-rate producers (LLM tokens, audio chunks), pairs well with batch subscribers.
+        :param items: Iterable of data, each one is delivered like a publish(event_type, data).
+        :param source: Publisher recorded in the Events (see publish).
+        :return: A list with the outcome of each item (see publish).
+        :raises EventQueueFull: if the event type uses the FAIL policy and its queue is full.
+        """
+        items = list(items)
+        if not items:
+            return []
+        options = self._topic_options.get(event_type)
+        if options is not None and options.coalesce:
+            self._retained[event_type] = items[-1]
+
+        if event_type == "TERMINATE":
+            return [self.publish(event_type, data, source=source) for data in items]
+
+        topic_id, timestamp, source, seq = TOPICS.intern(event_type), time.time_ns(), source or current_source(), self._seq
+        events = [Event(topic_id, next(seq), timestamp, source, data) for data in items]
+        journal = self.journal
+        if journal is not None:
+            for event in events:
+                journal.record(event)
+
+        if self._resolve(event_type):
+            tracer = self.tracer
+            if tracer is not None:
+                for event in events:
+                    event.span = tracer.start(event_type)
+            worker = self._worker_index(event_type)
+            worker_queue = self._worker_queues[worker]
+            try:
+                if options is None:
+                    outcomes = worker_queue.put_many(event_type, events, self.default_maxsize, self.default_policy)
+                else:
+                    outcomes = worker_queue.put_many(event_type, events, options.maxsize, options.policy,
+                                                     options.priority, options.coalesce)
+            except EventQueueFull:
+                self._count_drop(event_type, "rejected")
+                raise
+            metrics = self.metrics
+            if metrics is not None:
+                metrics.on_publish(event_type, len(events), worker, worker_queue.qsize())
+            for index, outcome in enumerate(outcomes):
+                if outcome != QUEUED:
+                    self._count_drop(event_type, outcome)
+                if tracer is not None and outcome in (QUEUED, COALESCED, DROPPED_OLDEST):
+                    events[index].span.enqueued()
+            return outcomes
+
+        elif options is not None and options.coalesce:
+            logger.debug(f"[{plugin_name}] No subscriber for '{event_type}', value retained: {items[-1]}")
+            return [NO_SUBSCRIBERS] * len(items)
+
+        else:
+            logger.warning(f"[{plugin_name}] There is NO subcription for Event: {event_type}, {len(items)} items")
+            return [NO_SUBSCRIBERS] * len(items)
 
     def unsubscribe(self, event_type: str, callback):
         """
@@ -48,29 +437,500 @@ class EventBus:
         :param event_type: The event type to stop listening for.
         :param callback: The function to remove from subscribers.
         """
-        if event_type in self._subscribers:
-            try:
-                self._subscribers[event_type].remove(callback)
-                if not self._subscribers[event_type]:  # Remove the key if empty
-                    del self._subscribers[event_type]
-                logger.info(f"[{plugin_name}] Unsubscribed from '{event_type}'.")
-            except ValueError:
-                logger.warning(f"[{plugin_name}] Callback not found in '{event_type}' subscription list.")
-        else:
-            logger.warning(f"[{plugin_name}] Attempted to unsubscribe from non-existent event '{event_type}'.")
+        pattern = is_pattern(event_type)
+        registry = self._pattern_subscribers if pattern else self._subscribers
+        with self._lock:
+            if event_type in registry:
+                subscribers = registry[event_type]
+                for subscription in subscribers:
+                    if subscription.callback == callback:
+                        subscribers.remove(subscription)
+                        if not subscribers:  # Remove the key if empty
+                            del registry[event_type]
+                            if pattern:
+                                self._patterns.remove(event_type)
+                        self._invalidate_matches(event_type)
+                        logger.info(f"[{plugin_name}] Unsubscribed from '{event_type}'.")
+                        break
+                else:
+                    logger.warning(f"[{plugin_name}] Callback not found in '{event_type}' subscription list.")
+            else:
+                logger.warning(f"[{plugin_name}] Attempted to unsubscribe from non-existent event '{event_type}'.")
 
+    def start(self):
+        """Start the dispatch worker threads (no-op for workers that are still running)."""
+        with self._lock:
+            if len(self._worker_threads) != self.workers:
+                self._worker_threads = [None] * self.workers
+            for index in range(self.workers):
+                thread = self._worker_threads[index]
+                if thread is not None and thread.is_alive():
+                    continue
+                name = "Thread-event_bus" if index == 0 else f"Thread-event_bus_{index}"
+                thread = threading.Thread(target=self.process_events, args=(index,), name=name, daemon=True)
+                self._worker_threads[index] = thread
+                self._running_workers += 1
+                thread.start()
+                logger.debug(f"[{plugin_name}] Started dispatch worker '{name}'.")
 
-    def process_events(self):
-        """Continuously process events in the queue (Run in a separate thread)"""
+    def process_events(self, worker: int = 0):
+        """Continuously process events in the queue of one worker (Run in a separate thread)"""
+        worker_queue = self._worker_queues[worker]
+        current = worker_queue.owner = threading.current_thread()
         while True:
-            event_type, data = self.event_queue.get()
+            event_type, events, limit = worker_queue.get(self._batch_limits)
             if event_type == "TERMINATE":
                 break  # Stop processing on terminate signal
-            
-            for callback in self._subscribers[event_type]:
-                if asyncio.iscoroutinefunction(callback):
-                    # If the callback is async, run it in the event loop
-                    asyncio.run(callback(data))
+
+            if limit > 1:  # decided by what get() used, the limits may have been reset since
+                timeout = self._batch_timeouts.get(event_type, 0)
+                if len(events) < limit and timeout > 0:
+                    events.extend(worker_queue.take(event_type, limit - len(events), timeout))
+                self.dispatch_batch(event_type, events)
+            else:
+                self.dispatch(event_type, events[0])
+            if worker_queue.owner is not current:
+                return  # replaced by the watchdog while stuck in a handler, the new thread owns the queue
+
+        with self._lock:
+            self._running_workers -= 1
+            last_worker = self._running_workers == 0
+        if last_worker:
+            self._stop_fallback_loop()
+
+    def replace_worker(self, thread_id: int) -> bool:
+        """
+        Hand the queue of a dispatch worker stuck in a handler to a new thread.
+        The stuck thread exits once its handler returns.
+        :param thread_id: Ident of the stuck thread.
+        :return: False if the thread is not a dispatch worker.
+        """
+        with self._lock:
+            for index, thread in enumerate(self._worker_threads):
+                if thread is not None and thread.ident == thread_id:
+                    break
+            else:
+                return False
+            replacement = threading.Thread(target=self.process_events, args=(index,), name=thread.name, daemon=True)
+            self._worker_threads[index] = replacement
+            self._worker_queues[index].owner = replacement
+        replacement.start()
+        logger.warning(f"[{plugin_name}] Dispatch worker '{thread.name}' is stuck, replaced it with a new thread.")
+        return True
+
+    def queue_depths(self):
+        """Return the number of pending events per dispatch worker."""
+        return [worker_queue.qsize() for worker_queue in self._worker_queues]
+
+    def last_value(self, event_type: str, default=None):
+        """Return the retained last value of a coalesced event type, without a round-trip to its publisher."""
+        return self._retained.get(event_type, default)
+
+    def retained_values(self):
+        """Return a snapshot {event_type: last value} of all coalesced event types."""
+        return dict(self._retained)
+
+    def lane_depths(self):
+        """Return the number of pending events per priority lane, per dispatch worker."""
+        return [worker_queue.lane_sizes() for worker_queue in self._worker_queues]
+
+    def drop_counts(self):
+        """Return {event_type: {outcome: count}} for events dropped, rejected or coalesced away."""
+        with self._lock:
+            return {event_type: dict(counts) for event_type, counts in self._drop_counts.items()}
+
+    def enable_metrics(self):
+        """Start counting publishes, deliveries, queue times and handler times (see BusMetrics)."""
+        if self.metrics is None:
+            self.metrics = BusMetrics(self.workers)
+            for worker_queue in self._worker_queues:
+                worker_queue.set_metrics(self.metrics)
+        return self.metrics
+
+    def disable_metrics(self):
+        """Stop instrumenting, the hot path is back to a single None check."""
+        self.metrics = None
+        for worker_queue in self._worker_queues:
+            worker_queue.set_metrics(None)
+
+    def stats(self):
+        """Return a snapshot of the metrics as plain data, None while metrics are disabled."""
+        metrics = self.metrics
+        return metrics.snapshot(self) if metrics is not None else None
+
+    def enable_tracing(self, capacity: int = 100000):
+        """
+        Start tracing: every event gets a span, publishes made while handling an event join its trace.
+        :param capacity: Finished spans kept, the oldest are forgotten.
+        :return: The Tracer, for stage_percentiles() and export_chrome().
+        """
+        if self.tracer is None:
+            self.tracer = Tracer(capacity)
+        return self.tracer
+
+    def disable_tracing(self):
+        """Stop tracing new events and return the Tracer holding the spans recorded so far."""
+        tracer, self.tracer = self.tracer, None
+        return tracer
+
+    def attach_journal(self, journal):
+        """Record every published event (but TERMINATE) in an EventJournal, None to stop recording."""
+        self.journal = journal
+
+    def attach_offload(self, offload_pools):
+        """Run the io/cpu handlers on these OffloadPools (core.offload), None to run them inline."""
+        self.offload_pools = offload_pools
+
+    def dispatch(self, event_type: str, data=None):
+        """
+        Deliver one event to every subscriber without waiting on async handlers.
+        Coroutines are handed thread-safely to the owning plugin's loop.
+        :param data: The data, or the Event carrying it.
+        :return: A list of concurrent.futures.Future, one per subscriber, holding the
+                 handler's result or exception.
+        """
+        event = data if type(data) is Event else self._envelope(event_type, data)
+        if type(event.data) is EventRequest:
+            return self._dispatch_request(event_type, event)
+        if event.span is not None:
+            return self._dispatch_traced(event_type, event)
+        futures = []
+        for subscription in self._resolve(event_type):
+            payload = event if subscription.pass_event else event.data
+            futures.append(self._deliver(event_type, subscription, [payload] if subscription.batch_size else payload))
+        return futures
+
+    def handlers(self, event_type: str):
+        """Return the callbacks an event of this type is delivered to (exact and wildcard subscribers)."""
+        return [subscription.callback for subscription in self._resolve(event_type)]
+
+    def deliver_to(self, owner, event_type: str, data=None):
+        """
+        Deliver an event to the handlers of one plugin only, e.g. events buffered while it was loading.
+        Reaches its held subscriptions too (see subscribe(hold=)).
+        :param data: The data, or the Event carrying it.
+        :return: A list of concurrent.futures.Future, one per handler.
+        """
+        event = data if type(data) is Event else self._envelope(event_type, data)
+        with self._lock:
+            subscribers = self._collect(event_type)
+        futures = []
+        for subscription in subscribers:
+            if subscription.owner is owner:
+                payload = subscription.payload(event)
+                futures.append(self._deliver(event_type, subscription, [payload] if subscription.batch_size else payload))
+        return futures
+
+    def dispatch_batch(self, event_type: str, items):
+        """
+        Deliver several events of one type: one call per event for normal subscribers,
+        one call per list of up to batch_size events for batch subscribers.
+        :param items: The data of each event, or the Events carrying it.
+        :return: A list of concurrent.futures.Future, one per handler call.
+        """
+        subscribers = self._resolve(event_type)
+        events = [data if type(data) is Event else self._envelope(event_type, data) for data in items]
+        futures = []
+        if any(type(event.data) is EventRequest for event in events):
+            for request in [event for event in events if type(event.data) is EventRequest]:
+                futures.extend(self._dispatch_request(event_type, request))
+            events = [event for event in events if type(event.data) is not EventRequest]
+        if any(event.span is not None for event in events):
+            return futures + self._dispatch_traced_batch(event_type, subscribers, events)
+        for event in events:
+            for subscription in subscribers:
+                if not subscription.batch_size:
+                    futures.append(self._deliver(event_type, subscription, subscription.payload(event)))
+        for subscription in subscribers:
+            if subscription.batch_size:
+                payloads = [subscription.payload(event) for event in events]
+                for start in range(0, len(payloads), subscription.batch_size):
+                    futures.append(self._deliver(event_type, subscription, payloads[start:start + subscription.batch_size]))
+        return futures
+
+#####################################################
+#                  Additional Functions
+#####################################################
+    def _deliver(self, event_type: str, subscription, data, span=None):
+        """Run one handler: coroutines go to their plugin's loop, plain functions are called here."""
+        args = (event_type, data) if subscription.pass_event_type else (data,)
+        metrics = self.metrics
+        watchdog = self.watchdog
+        if subscription.is_async:
+            # If the callback is async, schedule it on the plugin's loop and move on
+            loop = subscription.target_loop() or self._get_fallback_loop()
+            coro = subscription.callback(*args)
+            if metrics is not None:
+                metrics.on_deliver(event_type)
+                coro = metrics.timed(coro, subscription.name)
+            if watchdog is not None:
+                coro = watchdog.watch(coro, event_type, subscription)
+            if span is not None:
+                coro = span.run(coro)
+            group = getattr(subscription.owner, "task_group", None)  # plugins sharing a loop (core.shared_loop)
+            try:
+                if group is not None and group.loop is loop:
+                    future = group.run_coroutine(coro)
+                else:
+                    future = asyncio.run_coroutine_threadsafe(coro, loop)
+            except RuntimeError as e:  # loop closed between the check and the call
+                coro.close()
+                future = Future()
+                future.set_exception(e)
+        elif subscription.offload is not None and self.offload_pools is not None:
+            # Blocking handler, runs on the shared io/cpu pool: the dispatch worker moves on
+            future = self._offload(event_type, subscription, args)
+        elif watchdog is not None and subscription in watchdog.isolated:
+            # Got stuck before, runs on the watchdog's pool instead of blocking a dispatch worker
+            future = watchdog.run_isolated(event_type, subscription, args)
+        else:
+            # If it's a normal function, just call it
+            future = Future()
+            start = time.perf_counter() if metrics is not None else 0.0
+            call = watchdog.begin(event_type, subscription) if watchdog is not None else None
+            try:
+                if span is None:
+                    future.set_result(subscription.callback(*args))
                 else:
-                    # If it's a normal function, just call it
-                    callback(data)
+                    future.set_result(span.call(subscription.callback, args))
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                if call is not None:
+                    watchdog.end(call)
+            if metrics is not None:
+                metrics.on_handler(event_type, subscription.name, time.perf_counter() - start)
+        future.add_done_callback(lambda f: self._log_handler_error(f, event_type, subscription.callback))
+        return future
+
+    def _offload(self, event_type: str, subscription, args):
+        """Submit a handler to its pool, the future is the pool's (handler time counts from the submission)."""
+        try:
+            future = self.offload_pools.submit(subscription.offload, subscription.callback, *args)
+        except Exception as e:  # pools shut down, process pool failing to start
+            future = Future()
+            future.set_exception(e)
+            return future
+        metrics = self.metrics
+        if metrics is not None:
+            start = time.perf_counter()
+            future.add_done_callback(lambda f: metrics.on_handler(event_type, subscription.name, time.perf_counter() - start))
+        return future
+
+    def _send_request(self, event_type: str, data, timeout, gather: bool):
+        """Queue an EventRequest in place of the data (requests are never coalesced or delivered directly)."""
+        request = EventRequest(next(self._request_ids), event_type, data, gather)
+        if not self._resolve(event_type):
+            request.expect(0)
+            return request.future
+        options = self._topic_options.get(event_type)
+        worker_queue = self._worker_queue(event_type)
+        event = self._envelope(event_type, request)
+        try:
+            if options is None:
+                outcome = worker_queue.put(event_type, event, self.default_maxsize, self.default_policy)
+            else:
+                outcome = worker_queue.put(event_type, event, options.maxsize, options.policy, options.priority)
+        except EventQueueFull as e:
+            self._count_drop(event_type, "rejected")
+            request.fail(e)
+            return request.future
+        if outcome == DROPPED_NEWEST:
+            self._count_drop(event_type, outcome)
+            request.fail(EventQueueFull(f"Request on '{event_type}' dropped, its queue is full"))
+        elif outcome != QUEUED:
+            self._count_drop(event_type, outcome)  # an older pending event (or request) made room
+        if timeout is not None and not request.future.done():
+            loop = self._get_fallback_loop()
+            loop.call_soon_threadsafe(loop.call_later, timeout, request.expire)
+        return request.future
+
+    def _dispatch_request(self, event_type: str, event):
+        """Deliver a request's data to the handlers and collect their return values as replies."""
+        request = event.data
+        subscribers = [subscription for subscription in self._resolve(event_type) if not subscription.batch_size]
+        request.expect(len(subscribers))
+        futures = []
+        for subscription in subscribers:
+            future = self._deliver(event_type, subscription,
+                                   event.with_data(request.data) if subscription.pass_event else request.data)
+            responder = subscription.owner if subscription.owner is not None else subscription.callback
+            future.add_done_callback(lambda f, r=responder: request.add_reply(r, f))
+            futures.append(future)
+        return futures
+
+    def _direct_subscribers(self, event_type: str, options):
+        """Subscribers of an event type if they can skip the queue (all plain async handlers), else None."""
+        if options is not None and options.coalesce:
+            return None
+        subscribers = self._resolve(event_type)
+        for subscription in subscribers:
+            if not subscription.is_async or subscription.batch_size:
+                return None
+        return subscribers
+
+    def _deliver_direct(self, event_type: str, subscribers, event):
+        """Start async handlers from the publishing thread, as a task when the handler lives on the caller's loop."""
+        span = event.span
+        if span is not None:
+            span.dispatching()
+        futures = []
+        running_loop = _running_loop()
+        for subscription in subscribers:
+            loop = subscription.target_loop()
+            data = event if subscription.pass_event else event.data
+            if loop is not None and loop is running_loop:
+                args = (event_type, data) if subscription.pass_event_type else (data,)
+                coro = subscription.callback(*args)
+                metrics = self.metrics
+                if metrics is not None:
+                    metrics.on_deliver(event_type)
+                    coro = metrics.timed(coro, subscription.name)
+                watchdog = self.watchdog
+                if watchdog is not None:
+                    coro = watchdog.watch(coro, event_type, subscription)
+                if span is not None:
+                    coro = span.run(coro)
+                group = getattr(subscription.owner, "task_group", None)
+                task = group.create_task(coro) if group is not None and group.loop is loop else loop.create_task(coro)
+                task.add_done_callback(lambda f, c=subscription.callback: self._log_handler_error(f, event_type, c))
+                futures.append(task)
+            else:
+                futures.append(self._deliver(event_type, subscription, data, span))
+        if span is not None:
+            span.handled(futures)
+
+    def _dispatch_traced(self, event_type: str, event):
+        """dispatch() of a traced event: handlers run with its span as the current one, the span closes after them."""
+        span = event.span
+        span.dispatching()
+        futures = []
+        for subscription in self._resolve(event_type):
+            payload = subscription.payload(event)
+            futures.append(self._deliver(event_type, subscription, [payload] if subscription.batch_size else payload, span))
+        span.handled(futures)
+        return futures
+
+    def _dispatch_traced_batch(self, event_type: str, subscribers, events):
+        """dispatch_batch() with traced events: a batch handler call runs in the span of its first event."""
+        spans = []
+        for event in events:
+            if event.span is not None:
+                event.span.dispatching()
+            spans.append((event.span, []))
+        for (span, span_futures), event in zip(spans, events):
+            for subscription in subscribers:
+                if not subscription.batch_size:
+                    span_futures.append(self._deliver(event_type, subscription, subscription.payload(event), span))
+        for subscription in subscribers:
+            if subscription.batch_size:
+                payloads = [subscription.payload(event) for event in events]
+                for start in range(0, len(payloads), subscription.batch_size):
+                    future = self._deliver(event_type, subscription, payloads[start:start + subscription.batch_size],
+                                           spans[start][0])
+                    for span, span_futures in spans[start:start + subscription.batch_size]:
+                        span_futures.append(future)
+        futures = []
+        for span, span_futures in spans:
+            if span is not None:
+                span.handled(span_futures)
+            futures.extend(span_futures)
+        return list(dict.fromkeys(futures))  # a batch call's future is shared by its events
+
+    def _envelope(self, event_type: str, data, source: str = None) -> Event:
+        return Event(TOPICS.intern(event_type), next(self._seq), time.time_ns(), source or current_source(), data)
+
+    def _resolve(self, event_type: str):
+        """Return every Subscription an event type reaches (exact and wildcard, minus the held ones), cached per event type."""
+        subscribers = self._match_cache.get(event_type)
+        if subscribers is None:
+            with self._lock:
+                subscribers = self._collect(event_type)
+                holds = [s.hold for s in subscribers if s.hold is not None]
+                if holds:
+                    subscribers = tuple(s for s in subscribers if not any(hold(s) for hold in holds))
+                batch_subscribers = [s for s in subscribers if s.batch_size]
+                if batch_subscribers:
+                    self._batch_limits[event_type] = max(s.batch_size for s in batch_subscribers)
+                    self._batch_timeouts[event_type] = max(s.batch_timeout for s in batch_subscribers)
+                if len(self._match_cache) > 4096:  # don't grow forever on generated event types
+                    self._match_cache.clear()
+                self._match_cache[event_type] = subscribers
+        return subscribers
+
+    def _collect(self, event_type: str):
+        """Every Subscription of an event type, exact and wildcard, held ones included (called with the lock held)."""
+        subscribers = tuple(self._subscribers.get(event_type, ()))
+        if self._patterns:
+            for pattern in self._patterns.match(event_type):
+                subscribers += tuple(self._pattern_subscribers[pattern])
+        return subscribers
+
+    def _invalidate_matches(self, event_type: str):
+        """
+        Forget the resolved subscribers of the topics a (un)subscribe on event_type (or pattern) reaches,
+        the other topics keep their cache and batch limits (called with the lock held).
+        """
+        if is_pattern(event_type):
+            topics = [topic for topic in set(self._match_cache) | set(self._batch_limits)
+                      if fnmatch.fnmatchcase(topic, event_type)]
+        else:
+            topics = (event_type,)
+        for topic in topics:
+            self._match_cache.pop(topic, None)
+            self._batch_limits.pop(topic, None)
+            self._batch_timeouts.pop(topic, None)
+
+    def _worker_queue(self, event_type: str):
+        """Pick the worker owning an event type (stable hash, so ordering per type is kept)."""
+        return self._worker_queues[self._worker_index(event_type)]
+
+    def _worker_index(self, event_type: str) -> int:
+        if self.workers == 1:
+            return 0
+        return zlib.crc32(event_type.encode("utf-8")) % self.workers
+
+    def _count_drop(self, event_type: str, outcome: str):
+        with self._lock:
+            self._drop_counts[event_type][outcome] += 1
+
+    def _log_handler_error(self, future, event_type, callback):
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            name = getattr(callback, "__qualname__", repr(callback))
+            logger.error(f"[{plugin_name}] Handler '{name}' failed on '{event_type}': {error}",
+                         exc_info=(type(error), error, error.__traceback__))
+
+    def _get_fallback_loop(self):
+        """Lazily start the shared loop used when a subscriber's own loop is not running."""
+        with self._loop_lock:
+            if self._fallback_loop is None or self._fallback_loop.is_closed():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=self._run_fallback_loop, args=(loop,),
+                                          name="Thread-event_bus_loop", daemon=True)
+                thread.start()
+                self._fallback_loop = loop
+            return self._fallback_loop
+
+    @staticmethod
+    def _run_fallback_loop(loop):
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    def _stop_fallback_loop(self):
+        with self._loop_lock:
+            if self._fallback_loop is not None and not self._fallback_loop.is_closed():
+                self._fallback_loop.call_soon_threadsafe(self._fallback_loop.stop)
+            self._fallback_loop = None
+
+def _running_loop():
+    """The asyncio loop running in the calling thread, None outside of one."""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
@@ -0,0 +1,313 @@
+"""
+File Location: core/event_journal.py
+Author: Lizza Celestia
+Version: ALizz_AI_V1_0
+Create Date: 2026-10-18
+Modified Date: 2026-10-18
+Description:
+    Append-only journal of the events published on an EventBus, to reproduce incidents and load-test offline.
+        journal = EventJournal("journal"); bus.attach_journal(journal); journal.start()
+        JournalReader("journal").replay(other_bus, speed=2.0, topics=["RUN_LLM"])
+    publish() only appends its Event (timestamp, topic, data) to an in-memory queue, a writer thread encodes
+    the batch and appends it to the current segment file with one write.
+    Segment files "events-<n>.journal" start with MAGIC, then one frame per record:
+        FRAME header: payload length, crc32 of the payload, kind, timestamp (ns), topic id
+        kind TOPIC: the payload is the topic name (utf-8), defines the id for the rest of the segment
+        kind EVENT: the payload is the pickled data (kind EVENT_REPR: repr() of data that can't be pickled)
+    When a segment is closed an "events-<n>.index" (JSON) is written next to it: time range, topic table,
+    events per topic and a sparse (timestamp, offset) list, so a reader skips segments and seeks inside them.
+    Readers mmap the segments, a torn frame at the end of a segment (crash while writing) ends it.
+"""
+from collections import deque, Counter
+from pathlib import Path
+import json
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+import zlib
+import logging
+logger = logging.getLogger(__name__)
+plugin_name = "Event_journal"
+
+MAGIC = b"ALZJ\x01"
+FRAME = struct.Struct("<IIBqI")     # payload length, crc32, kind, timestamp ns, topic id
+TOPIC, EVENT, EVENT_REPR = 0, 1, 2
+SEGMENT_GLOB = "events-*.journal"
+
+class EventJournal:
+    """Writes the events of a bus to segmented append-only files (attach with bus.attach_journal)."""
+    def __init__(self, directory: str = "journal", segment_bytes: int = 64 * 1024 * 1024, flush_interval: float = 0.2,
+                 batch_size: int = 1000, max_pending: int = 100000, index_interval: float = 1.0,
+                 max_segments: int = None, fsync: bool = False):
+        """
+        :param directory: Folder of the segment and index files.
+        :param segment_bytes: Start a new segment once the current one is this big.
+        :param flush_interval: Seconds between writes, the writer also wakes up after batch_size events.
+        :param max_pending: Events waiting for the writer, events beyond it are dropped and counted.
+        :param index_interval: Seconds between two entries of a segment's sparse index.
+        :param max_segments: Delete the oldest segments beyond this number (None keeps everything).
+        :param fsync: fsync after each write (slower, survives a power loss).
+        """
+        self.directory = Path(directory)
+        self.segment_bytes = segment_bytes
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.index_interval = index_interval
+        self.max_segments = max_segments
+        self.fsync = fsync
+        self.written = 0
+        self.dropped = 0
+        self._pending = deque()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._file = None
+        self._segment = None
+        self._index = None
+
+    def record(self, event):
+        """Queue one published core.event.Event (called by the bus, any thread). The payload is encoded by the writer."""
+        pending = self._pending
+        if len(pending) >= self.max_pending:
+            self.dropped += 1
+            return
+        pending.append(event)
+        if len(pending) >= self.batch_size:
+            self._wake.set()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._stop.clear()
+        self._open_segment()
+        self._thread = threading.Thread(target=self._write_loop, name="Thread-event_journal", daemon=True)
+        self._thread.start()
+        logger.info(f"[{plugin_name}] Recording events to '{self._segment}'.")
+
+    def close(self):
+        """Write what is pending, close the segment and write its index."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(10)
+            self._thread = None
+        self._close_segment()
+
+    def stats(self) -> dict:
+        return {"segment": str(self._segment), "written": self.written, "pending": len(self._pending),
+                "dropped": self.dropped}
+
+#####################################################
+#                  Writer thread
+#####################################################
+    def _write_loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._flush()
+        self._flush()
+
+    def _flush(self):
+        pending = self._pending
+        if not pending:
+            return
+        buffer = bytearray()
+        index = self._index
+        offset = self._file.tell()
+        count = 0
+        try:
+            while pending:
+                event = pending.popleft()
+                timestamp, event_type, data = event.timestamp, event.topic, event.data
+                topic_id = index["topics"].get(event_type)
+                if topic_id is None:
+                    topic_id = index["topics"][event_type] = len(index["topics"])
+                    name = event_type.encode("utf-8")
+                    buffer += FRAME.pack(len(name), zlib.crc32(name), TOPIC, timestamp, topic_id) + name
+                try:
+                    payload, kind = pickle.dumps(data, pickle.HIGHEST_PROTOCOL), EVENT
+                except Exception:
+                    payload, kind = repr(data).encode("utf-8", "replace"), EVENT_REPR
+                if index["first"] is None:
+                    index["first"] = timestamp
+                if not index["sparse"] or timestamp - index["sparse"][-1][0] >= self.index_interval * 1e9:
+                    index["sparse"].append([timestamp, offset + len(buffer)])
+                index["last"] = timestamp
+                index["counts"][event_type] += 1
+                buffer += FRAME.pack(len(payload), zlib.crc32(payload), kind, timestamp, topic_id) + payload
+                count += 1
+                if offset + len(buffer) >= self.segment_bytes:
+                    break
+            self._file.write(buffer)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self.written += count
+        except OSError as e:
+            logger.error(f"[{plugin_name}] Could not write to '{self._segment}': {e}")
+            return
+        if self._file.tell() >= self.segment_bytes:
+            self._close_segment()
+            self._open_segment()
+            if pending:
+                self._flush()
+
+#####################################################
+#                  Additional Functions
+#####################################################
+    def _open_segment(self):
+        numbers = [_segment_number(path) for path in self.directory.glob(SEGMENT_GLOB)]
+        self._segment = self.directory / f"events-{max(numbers, default=0) + 1:08d}.journal"
+        self._file = open(self._segment, "wb")
+        self._file.write(MAGIC)
+        self._index = {"first": None, "last": None, "topics": {}, "counts": Counter(), "sparse": []}
+        if self.max_segments:
+            segments = sorted(self.directory.glob(SEGMENT_GLOB), key=_segment_number)
+            for old in segments[:-self.max_segments]:
+                old.unlink(missing_ok=True)
+                old.with_suffix(".index").unlink(missing_ok=True)
+
+    def _close_segment(self):
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        self._index["size"] = self._segment.stat().st_size
+        self._segment.with_suffix(".index").write_text(json.dumps(self._index), encoding="utf-8")
+
+class JournalReader:
+    """Reads and replays the segments of an EventJournal directory."""
+    def __init__(self, directory: str = "journal"):
+        self.directory = Path(directory)
+
+    def segments(self):
+        """[(segment path, index)] oldest first, the index is rebuilt by scanning when it is missing (active segment)."""
+        result = []
+        for path in sorted(self.directory.glob(SEGMENT_GLOB), key=_segment_number):
+            index_path = path.with_suffix(".index")
+            index = None
+            if index_path.exists():
+                try:
+                    index = json.loads(index_path.read_text(encoding="utf-8"))
+                except ValueError:
+                    logger.warning(f"[{plugin_name}] Unreadable index '{index_path}', scanning the segment.")
+            result.append((path, index if index is not None else _scan_index(path)))
+        return result
+
+    def read(self, topics=None, start: float = None, end: float = None):
+        """
+        Yield (timestamp, event_type, data) in recorded order.
+        :param topics: Only these event types (iterable), all of them when None.
+        :param start: Only events at or after this time (seconds since the epoch, like time.time()).
+        :param end: Only events before this time.
+        """
+        topics = set(topics) if topics is not None else None
+        start_ns = int(start * 1e9) if start is not None else None
+        end_ns = int(end * 1e9) if end is not None else None
+        for path, index in self.segments():
+            if index["first"] is None:
+                continue
+            if (start_ns is not None and index["last"] < start_ns) or (end_ns is not None and index["first"] >= end_ns):
+                continue
+            if topics is not None and not topics.intersection(index["counts"]):
+                continue
+            offset = len(MAGIC)
+            if start_ns is not None:  # last sparse entry before the start
+                for timestamp, position in index["sparse"]:
+                    if timestamp > start_ns:
+                        break
+                    offset = position
+            names = {topic_id: name for name, topic_id in index["topics"].items()}
+            wanted = None if topics is None else {index["topics"][name] for name in topics if name in index["topics"]}
+            for timestamp, topic_id, kind, payload in _frames(path, offset, names):
+                if end_ns is not None and timestamp >= end_ns:
+                    break
+                if (start_ns is not None and timestamp < start_ns) or (wanted is not None and topic_id not in wanted):
+                    continue
+                data = pickle.loads(payload) if kind == EVENT else payload.tobytes().decode("utf-8")
+                yield timestamp / 1e9, names[topic_id], data
+
+    def replay(self, event_bus, speed: float = 1.0, topics=None, start: float = None, end: float = None,
+               stop_event: threading.Event = None) -> int:
+        """
+        Publish the recorded events into a bus.
+        :param speed: 1.0 = recorded pace, 10.0 = ten times faster, None or 0 = as fast as possible.
+        :param stop_event: Set it to end the replay early.
+        :return: Number of events published.
+        """
+        count = 0
+        first = None
+        began = time.monotonic()
+        for timestamp, event_type, data in self.read(topics, start, end):
+            if stop_event is not None and stop_event.is_set():
+                break
+            if speed:
+                if first is None:
+                    first = timestamp
+                delay = (timestamp - first) / speed - (time.monotonic() - began)
+                if delay > 0:
+                    if stop_event is not None:
+                        if stop_event.wait(delay):
+                            break
+                    else:
+                        time.sleep(delay)
+            event_bus.publish(event_type, data)
+            count += 1
+        logger.info(f"[{plugin_name}] Replayed {count} events in {time.monotonic() - began:.3f}s "
+                    f"({'max speed' if not speed else f'{speed}x'}).")
+        return count
+
+def _segment_number(path: Path) -> int:
+    try:
+        return int(path.stem.split("-")[1])
+    except (IndexError, ValueError):
+        return 0
+
+def _frames(path: Path, offset: int, names: dict):
+    """Yield (timestamp, topic id, kind, payload memoryview) of the events from offset, TOPIC frames update names."""
+    with open(path, "rb") as segment_file:
+        if os.fstat(segment_file.fileno()).st_size <= len(MAGIC):
+            return
+        with mmap.mmap(segment_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if mapped[:len(MAGIC)] != MAGIC:
+                logger.warning(f"[{plugin_name}] '{path}' is not a journal segment, skipped.")
+                return
+            view = memoryview(mapped)
+            try:
+                size = len(mapped)
+                while offset + FRAME.size <= size:
+                    length, crc, kind, timestamp, topic_id = FRAME.unpack_from(mapped, offset)
+                    body = offset + FRAME.size
+                    payload = view[body:body + length]
+                    if body + length > size or zlib.crc32(payload) != crc:
+                        logger.warning(f"[{plugin_name}] Torn frame at {offset} in '{path}', rest of the segment ignored.")
+                        payload.release()
+                        break
+                    offset = body + length
+                    if kind == TOPIC:
+                        names[topic_id] = payload.tobytes().decode("utf-8")
+                        payload.release()
+                        continue
+                    try:
+                        yield timestamp, topic_id, kind, payload
+                    finally:
+                        payload.release()
+            finally:
+                view.release()
+
+def _scan_index(path: Path) -> dict:
+    """Index of a segment without one (still being written, or the writer crashed)."""
+    names = {}
+    index = {"first": None, "last": None, "topics": {}, "counts": Counter(), "sparse": []}
+    for timestamp, topic_id, _, _ in _frames(path, len(MAGIC), names):
+        if index["first"] is None:
+            index["first"] = timestamp
+        index["last"] = timestamp
+        index["counts"][names[topic_id]] += 1
+    index["topics"] = {name: topic_id for topic_id, name in names.items()}
+    return index
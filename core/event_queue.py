@@ -0,0 +1,235 @@
+"""
+File Location: core/event_queue.py
+Author: Lizza Celestia
+Version: ALizz_AI_V1_0
+Create Date: 2026-10-18
+Modified Date: 2026-10-18
+Description:
+    Bounded queue used by each EventBus dispatch worker.
+    Every event type gets its own FIFO with its own limit and overflow policy,
+    event types with pending events take turns inside their priority lane.
+"""
+from collections import deque
+import threading
+import time
+
+# Overflow policies, chosen per event type when subscribing
+BLOCK       = "block"           # wait in publish() until there is room
+DROP_OLDEST = "drop_oldest"     # discard the oldest pending event of the type
+DROP_NEWEST = "drop_newest"     # discard the event being published
+FAIL        = "fail"            # raise EventQueueFull in publish()
+POLICIES = (BLOCK, DROP_OLDEST, DROP_NEWEST, FAIL)
+
+# Priority lanes, lower number = served first
+PRIORITY_HIGH   = 0             # control traffic: TERMINATE, STOP_*, MUTE_TTS, ...
+PRIORITY_NORMAL = 1
+PRIORITY_LOW    = 2
+DEFAULT_LANES   = 3
+
+# Outcomes returned by EventBus.publish()
+QUEUED          = "queued"
+DROPPED_OLDEST  = "dropped_oldest"
+DROPPED_NEWEST  = "dropped_newest"
+COALESCED       = "coalesced"       # replaced a pending event of a latest-value event type
+FULL            = "full"            # BLOCK policy, queue full and the publisher asked not to wait
+DELIVERED       = "delivered"       # handed straight to the subscribers' loops (asyncio fast path)
+NO_SUBSCRIBERS  = "no_subscribers"
+
+class EventQueueFull(Exception):
+    """Raised by publish() when an event type using the FAIL policy is at its limit."""
+
+class EventQueue:
+    """
+    Thread-safe queue of core.event.Event items for one dispatch worker, kept per event type.
+    - _pending holds a FIFO deque per event type
+    - _lanes holds, per priority lane, the event types that have pending events, in
+      round robin order: get() takes the next event of the first type and puts the
+      type back at the end if it still has events, so one chatty type can't hog a lane
+    Lanes are served by smooth weighted round robin: a higher lane overtakes queued
+    lower traffic right away, but a busy higher lane can't starve the lower ones.
+    """
+    def __init__(self, lanes: int = DEFAULT_LANES, weights=None):
+        """
+        :param lanes: Number of priority lanes (0 is the highest).
+        :param weights: Share of dispatches per lane while all are busy, default 4**(lanes-1-lane).
+        """
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._pending = {}
+        self._lanes = [deque() for _ in range(lanes)]
+        self._lane_of = {}                  # event type -> lane it is scheduled in
+        self._lane_sizes = [0] * lanes      # pending events per lane
+        self._weights = list(weights) if weights else [4 ** (lanes - 1 - lane) for lane in range(lanes)]
+        if len(self._weights) != lanes or min(self._weights) <= 0:
+            raise ValueError(f"Expected {lanes} positive lane weights, got {self._weights}")
+        self._credits = [0] * lanes
+        self._size = 0
+        self.owner = None  # the worker thread draining this queue
+        self.metrics = None     # BusMetrics while instrumentation is on, queued time = dequeue - Event.timestamp
+
+    def put(self, event_type: str, data=None, maxsize: int = 0, policy: str = BLOCK, priority: int = PRIORITY_NORMAL,
+            coalesce: bool = False, block: bool = True):
+        """
+        Queue an event, applying the overflow policy when the event type already has maxsize pending.
+        :param maxsize: Limit of pending events for this event type, 0 for no limit.
+        :param priority: Lane of the event, clamped to the available lanes.
+        :param coalesce: Replace the pending event of this type in place instead of queuing another one.
+        :param block: With the BLOCK policy, False returns FULL instead of waiting for room.
+        :return: QUEUED, COALESCED, DROPPED_OLDEST, DROPPED_NEWEST or FULL
+        """
+        with self._lock:
+            outcome = self._put(event_type, data, maxsize, policy, priority, coalesce, block)
+            self._not_empty.notify()
+            return outcome
+
+    def put_many(self, event_type: str, items, maxsize: int = 0, policy: str = BLOCK, priority: int = PRIORITY_NORMAL,
+                 coalesce: bool = False):
+        """
+        Queue several events of one type under a single lock round-trip.
+        :return: A list with the outcome of each item (see put).
+        """
+        outcomes = []
+        with self._lock:
+            try:
+                for data in items:
+                    outcomes.append(self._put(event_type, data, maxsize, policy, priority, coalesce))
+            finally:
+                self._not_empty.notify()
+        return outcomes
+
+    def get(self, batch_limits=None):
+        """
+        Block until an event is pending and return it as (event_type, [event, ...], limit).
+        :param batch_limits: Optional {event_type: n}, return up to n pending events of that type at once.
+        :return: limit is the batch limit used for that event type (1 = single event), read once here
+                 so the caller doesn't look it up again after the limits changed.
+        """
+        with self._lock:
+            while not self._size:
+                self._not_empty.wait()
+            lane = self._next_lane()
+            event_type = self._lanes[lane].popleft()
+            limit = batch_limits.get(event_type, 1) if batch_limits else 1
+            items = self._take(event_type, limit)
+            if event_type in self._pending:
+                self._lanes[lane].append(event_type)  # more pending, back of the line
+            else:
+                del self._lane_of[event_type]
+            self._lane_sizes[lane] -= len(items)
+            return event_type, items, limit
+
+    def take(self, event_type: str, limit: int, timeout: float = 0):
+        """
+        Take up to limit more pending events of one type, waiting up to timeout seconds for them to arrive.
+        Used by the worker to fill a batch after get().
+        """
+        deadline = time.monotonic() + timeout
+        items = []
+        with self._lock:
+            while True:
+                if event_type in self._pending:
+                    lane = self._lane_of[event_type]
+                    taken = self._take(event_type, limit - len(items))
+                    self._lane_sizes[lane] -= len(taken)
+                    items.extend(taken)
+                    if event_type not in self._pending:
+                        self._lanes[lane].remove(event_type)
+                        del self._lane_of[event_type]
+                remaining = deadline - time.monotonic()
+                if len(items) >= limit or remaining <= 0:
+                    return items
+                self._not_empty.wait(remaining)
+
+    def pending(self, event_type: str) -> int:
+        """Number of queued events of one event type."""
+        with self._lock:
+            return len(self._pending.get(event_type, ()))
+
+    def set_metrics(self, metrics):
+        """Start (BusMetrics) or stop (None) timing how long events stay queued."""
+        with self._lock:
+            self.metrics = metrics
+
+    def qsize(self) -> int:
+        return self._size
+
+    def lane_sizes(self):
+        """Number of queued events per priority lane."""
+        with self._lock:
+            return list(self._lane_sizes)
+
+#####################################################
+#                  Additional Functions
+#####################################################
+    def _put(self, event_type, data, maxsize, policy, priority, coalesce, block=True):
+        """Queue one event (called with the lock held)."""
+        pending = self._pending.get(event_type)
+
+        if pending:
+            if coalesce:
+                pending[-1] = data  # keeps its place in the lane, only the value changes
+                return COALESCED
+
+            if maxsize and len(pending) >= maxsize:
+                if policy == DROP_OLDEST:
+                    pending.popleft()
+                    pending.append(data)
+                    return DROPPED_OLDEST
+                if policy == DROP_NEWEST:
+                    return DROPPED_NEWEST
+                if policy == FAIL:
+                    raise EventQueueFull(f"Event queue for '{event_type}' is full ({maxsize} pending)")
+                if not block:
+                    return FULL
+                if threading.current_thread() is self.owner:
+                    # The worker publishing to its own full queue would wait on itself forever
+                    return DROPPED_NEWEST
+                self._not_empty.notify()  # events put earlier in this round-trip must be visible while waiting
+                while pending and len(pending) >= maxsize:
+                    self._not_full.wait()
+                    pending = self._pending.get(event_type)  # the deque is dropped once it is empty
+
+        if not pending:
+            pending = self._pending[event_type] = deque()
+            lane = self._lane_of[event_type] = min(max(priority, 0), len(self._lanes) - 1)
+            self._lanes[lane].append(event_type)
+        else:
+            lane = self._lane_of[event_type]
+        pending.append(data)
+        self._lane_sizes[lane] += 1
+        self._size += 1
+        return QUEUED
+
+    def _take(self, event_type, limit):
+        """Pop up to limit events of one type (called with the lock held, type must be pending)."""
+        pending = self._pending[event_type]
+        if limit <= 1 or len(pending) == 1:
+            items = [pending.popleft()]
+        else:
+            items = [pending.popleft() for _ in range(min(limit, len(pending)))]
+        if not pending:
+            del self._pending[event_type]
+        self._size -= len(items)
+        self._not_full.notify_all()
+        metrics = self.metrics
+        if metrics is not None:
+            now = time.time_ns()
+            for event in items:
+                metrics.on_dequeue(event_type, (now - event.timestamp) / 1e9)
+        return items
+
+    def _next_lane(self) -> int:
+        """Smooth weighted round robin over the non-empty lanes (called with the lock held)."""
+        best = None
+        total = 0
+        for lane, order in enumerate(self._lanes):
+            if not order:
+                self._credits[lane] = 0
+                continue
+            self._credits[lane] += self._weights[lane]
+            total += self._weights[lane]
+            if best is None or self._credits[lane] > self._credits[best]:
+                best = lane
+        self._credits[best] -= total
+        return best
@@ -0,0 +1,107 @@
+"""
+File Location: core/event_request.py
+Author: Lizza Celestia
+Version: ALizz_AI_V1_0
+Create Date: 2026-10-18
+Modified Date: 2026-10-18
+Description:
+    Request/reply on top of the event bus.
+    EventBus.request() and EventBus.gather() queue an EventRequest instead of the raw data.
+    The dispatch worker hands the data to the handlers as usual and the handlers' return
+    values are the replies, collected here into one concurrent.futures.Future:
+        request: the first reply that is not None (RequestTimeout after the deadline)
+        gather:  {responder: reply} of every handler that answered before the deadline
+    A responder is the plugin instance owning the handler (or the handler itself for plain functions).
+"""
+from concurrent.futures import Future
+import threading
+import logging
+logger = logging.getLogger(__name__)
+plugin_name = "Event_bus"
+
+class RequestTimeout(TimeoutError):
+    """Set on a request's future when no handler replied before its timeout."""
+
+class NoResponders(LookupError):
+    """Set on a request's future when no handler is subscribed to the event type."""
+
+class EventRequest:
+    """One pending request, travels through the worker queue in place of the event data."""
+    __slots__ = ("request_id", "event_type", "data", "future", "gather", "_expected", "_finished",
+                 "_replies", "_errors", "_lock")
+
+    def __init__(self, request_id: int, event_type: str, data=None, gather: bool = False):
+        self.request_id = request_id
+        self.event_type = event_type
+        self.data = data
+        self.future = Future()
+        self.gather = gather
+        self._expected = None       # number of handlers the request was delivered to
+        self._finished = 0
+        self._replies = {}
+        self._errors = []
+        self._lock = threading.Lock()
+
+    def expect(self, count: int):
+        """Set the number of handlers that will answer (called by the worker before delivering)."""
+        with self._lock:
+            self._expected = count
+            if count == 0:
+                if self.gather:
+                    self._resolve(self._replies)
+                else:
+                    self._fail(NoResponders(f"No handler answers '{self.event_type}'"))
+
+    def add_reply(self, responder, handler_future):
+        """Done callback of one handler's future."""
+        with self._lock:
+            self._finished += 1
+            if self.future.done():
+                return
+            if handler_future.cancelled():
+                pass
+            elif handler_future.exception() is not None:
+                self._errors.append(handler_future.exception())
+            else:
+                reply = handler_future.result()
+                if self.gather:
+                    self._replies[responder] = reply
+                elif reply is not None:
+                    self._resolve(reply)
+                    return
+            if self._expected is not None and self._finished >= self._expected:
+                if self.gather:
+                    self._resolve(self._replies)
+                elif self._errors:
+                    self._fail(self._errors[0])
+                else:
+                    self._resolve(None)  # every handler ran, none had anything to say
+
+    def expire(self):
+        """Deadline reached: gather returns what it has, request fails with RequestTimeout."""
+        with self._lock:
+            if self.future.done():
+                return
+            if self.gather:
+                missing = (self._expected or 0) - self._finished
+                logger.debug(f"[{plugin_name}] Request {self.request_id} on '{self.event_type}' "
+                             f"gathered {len(self._replies)} replies, {missing} handlers did not answer in time.")
+                self._resolve(dict(self._replies))
+            else:
+                self._fail(RequestTimeout(f"No reply to '{self.event_type}' (request {self.request_id})"))
+
+    def fail(self, error: BaseException):
+        """Fail the request before it reached the handlers (queue full, dropped...)."""
+        with self._lock:
+            self._fail(error)
+
+#####################################################
+#                  Additional Functions
+#####################################################
+    def _resolve(self, result):
+        if not self.future.done():
+            self.future.set_result(result)
+
+    def _fail(self, error):
+        if not self.future.done():
+            self.future.set_exception(error)
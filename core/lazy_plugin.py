@@ -0,0 +1,158 @@
+"""
+File Location: core/lazy_plugin.py
+Author: Lizza Celestia
+Version: ALizz_AI_V1_0
+Create Date: 2026-10-18
+Modified Date: 2026-10-18
+Description:
+    Lazy plugins, declared in their module with:
+        lazy = True
+        idle_timeout = 600      # optional, seconds without events before the plugin is unloaded again
+    The PluginManager doesn't import them at boot. A stand-in subscribes to the topics of the plugin's
+    subscriptions_list (read from its source) and loads the plugin on the first event, which is
+    buffered and delivered to the plugin's handlers once its event loop runs, ahead of any later event:
+    until the buffer is handed over, the stand-in holds the plugin's subscriptions on those topics
+    (EventBus.subscribe(hold=)) and later events join the buffer, no dispatch worker waits for the plugin.
+"""
+from collections import deque
+import threading
+import time
+import logging
+logger = logging.getLogger(__name__)
+plugin_name = "PluginManager"
+
+START_TIMEOUT = 10  # seconds the loading plugin gets to report running before the buffer is delivered anyway
+
+class LazyPlugin:
+    """Stand-in of a lazy plugin on the event bus, activates it on demand."""
+    def __init__(self, name: str, manifest: dict, plugin_manager):
+        self.name = name
+        self.plugin_manager = plugin_manager
+        self.module_path = plugin_manager.module_path(name)
+        self.event_types = [event_type for event_type in (manifest.get("subscriptions_list") or ())
+                            if not event_type.startswith(("PLUGIN_STOP_", "STOP_"))]  # nothing to stop while dormant
+        self.idle_timeout = manifest.get("idle_timeout") or 0
+        self.buffer = deque(maxlen=manifest.get("lazy_buffer", 100))
+        self.last_used = time.monotonic()
+        self.activations = 0
+        self._activating = False    # loading, or handing the buffer over
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        return self.name in self.plugin_manager.loaded_plugins
+
+    def register(self):
+        """Subscribe the stand-in to the plugin's topics."""
+        event_bus = self.plugin_manager.core.event_bus
+        for event_type in self.event_types:
+            event_bus.subscribe(event_type, self.on_event, pass_event_type=True, pass_event=True)
+        logger.info(f"[{plugin_name}] Plugin '{self.name}' is lazy, it loads on the first of: {self.event_types}")
+
+    def unregister(self):
+        event_bus = self.plugin_manager.core.event_bus
+        for event_type in self.event_types:
+            event_bus.unsubscribe(event_type, self.on_event)
+
+    def on_event(self, event_type: str, event):
+        """
+        Stays subscribed while the plugin runs to track activity for the idle timeout.
+        While the plugin is dormant (or loading) the event is buffered (its Event, seq and source kept)
+        and loading starts.
+        """
+        self.last_used = time.monotonic()
+        with self._lock:
+            if self.active and not self._activating:
+                return  # its own handlers get the event
+            self.buffer.append((event_type, event))
+            if self._activating:
+                return
+            self._activating = True
+        self._hold()
+        threading.Thread(target=self._activate, name=f"Thread-activate_{self.name}", daemon=True).start()
+
+    def idle_for(self) -> float:
+        return time.monotonic() - self.last_used
+
+#####################################################
+#                  Additional Functions
+#####################################################
+    def _activate(self):
+        """Load the plugin, wait for its loop, then hand it the buffered events (runs in its own thread)."""
+        start = time.perf_counter()
+        logger.info(f"[{plugin_name}] Activating lazy plugin '{self.name}' ({self.buffer[0][0]})...")
+        self.plugin_manager._load_plugin(self.name)
+        plugin = self.plugin_manager.loaded_plugins.get(self.name)
+        if plugin is not None:
+            self._wait_running(plugin)
+        delivered = 0
+        try:
+            while True:  # events arriving meanwhile join the buffer, hand it over until it stays empty
+                with self._lock:
+                    events = list(self.buffer)
+                    self.buffer.clear()
+                    if not events:
+                        self._activating = False  # from now on the plugin's handlers get the events
+                        break
+                if plugin is None:
+                    logger.error(f"[{plugin_name}] Lazy plugin '{self.name}' failed to load, dropped {len(events)} events.")
+                    continue
+                for event_type, event in events:
+                    self._deliver(plugin, event_type, event)
+                delivered += len(events)
+        finally:
+            with self._lock:
+                self._activating = False
+            self._release()
+        if plugin is None:
+            return
+        self.activations += 1
+        self.last_used = time.monotonic()
+        logger.info(f"[{plugin_name}] Lazy plugin '{self.name}' activated in {time.perf_counter() - start:.3f}s, "
+                    f"delivered {delivered} buffered events.")
+
+    def _on_held_event(self, event_type: str, event):
+        """Gets the plugin's events while its subscriptions are held, they join the buffer behind the older ones."""
+        self.last_used = time.monotonic()
+        with self._lock:
+            if self._activating:
+                self.buffer.append((event_type, event))
+                return
+        plugin = self.plugin_manager.loaded_plugins.get(self.name)  # handed over since the bus picked this handler
+        if plugin is not None:
+            self._deliver(plugin, event_type, event)
+
+    def _hold(self):
+        """Keep the plugin's subscriptions (and on_event) off its topics until the buffer is handed over."""
+        event_bus = self.plugin_manager.core.event_bus
+        for event_type in self.event_types:
+            event_bus.subscribe(event_type, self._on_held_event, pass_event_type=True, pass_event=True, hold=self._holds)
+
+    def _release(self):
+        event_bus = self.plugin_manager.core.event_bus
+        for event_type in self.event_types:
+            event_bus.unsubscribe(event_type, self._on_held_event)
+
+    def _holds(self, subscription) -> bool:
+        """True for the subscriptions _on_held_event stands in for: the plugin's handlers and on_event."""
+        if subscription.callback == self.on_event or type(subscription.owner).__module__ == self.module_path:
+            return True
+        return subscription.name.startswith(f"Process-{self.name}.")  # PluginProcess forwarder
+
+    def _deliver(self, plugin, event_type: str, event):
+        if hasattr(plugin, "deliver"):  # PluginProcess
+            plugin.deliver(event_type, event.data, event.source)
+        else:
+            self.plugin_manager.core.event_bus.deliver_to(plugin, event_type, event)
+
+    @staticmethod
+    def _wait_running(plugin, timeout: float = START_TIMEOUT):
+        """Wait until the plugin's loop (or process) is up, so buffered async events run on it."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if plugin.loop is not None and plugin.loop.is_running():
+                return
+            if plugin.loop is None and plugin.status:  # process plugins report through status
+                return
+            time.sleep(0.01)
+        logger.warning(f"[{plugin_name}] Plugin did not report running within {timeout}s, delivering anyway.")
@@ -3,20 +3,44 @@ File Location: core/logging_setup.py
 Author: Lizza Celestia
 Version: ALizz_AI_V0_9
 Created Date: 2025-02-12
-Modified Date: 2025-02-14
+Modified Date: 2026-10-18
 Description:
+    Logging for the whole application. Loggers only put records on a bounded queue,
+    a background QueueListener thread formats them and does the console and file I/O.
+    The session log file rotates by size (or time) and rotated files are gzipped.
 """
 # core/logging_setup.py
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+from collections import Counter
+import atexit
+import gzip
 import logging
+import queue
+import shutil
 import sys
 import os
+import threading
 from datetime import datetime
 
-def setup_logging(log_level=logging.INFO):
+_listener = None
+_queue_handler = None
+
+def setup_logging(log_level=logging.INFO, plugin_levels=None, max_bytes: int = 10 * 1024 * 1024,
+                  backup_count: int = 5, rotate_when: str = None, compress: bool = True, queue_size: int = 10000):
     """
     Configures the Python logging module for the entire application.
     Creates a new log file each time the script is run, stored in 'logs/'.
+    :param log_level: Level of the root logger, i.e. of every plugin without an override.
+    :param plugin_levels: {plugin folder name or logger name: level}, e.g. {"sample": logging.DEBUG}.
+    :param max_bytes: Rotate the log file at this size (ignored when rotate_when is set).
+    :param backup_count: Number of rotated files kept.
+    :param rotate_when: Time based rotation instead ("midnight", "H", ... see TimedRotatingFileHandler).
+    :param compress: Gzip rotated files.
+    :param queue_size: Records waiting for the writer thread, records beyond it are dropped and counted.
     """
+    global _listener, _queue_handler
+    stop_logging()  # setting up again replaces the previous pipeline
+
     # 1. Ensure the logs directory exists
     os.makedirs("logs", exist_ok=True)
 
@@ -28,6 +52,8 @@ def setup_logging(log_level=logging.INFO):
     # 3. Get the root logger and set the log level
     logger = logging.getLogger()
     logger.setLevel(log_level)
+    for name, level in (plugin_levels or {}).items():
+        set_plugin_level(name, level)
 
     # 4. Define a log format
     formatter = logging.Formatter(
@@ -38,14 +64,97 @@ def setup_logging(log_level=logging.INFO):
     # 5. Console handler (prints to stdout)
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
 
-    # 6. File handler (writes to a new file in logs/)
-    file_handler = logging.FileHandler(log_path, encoding='utf-8')
+    # 6. File handler (writes to a new file in logs/, rotated and compressed)
+    if rotate_when:
+        file_handler = TimedRotatingFileHandler(log_path, when=rotate_when, backupCount=backup_count, encoding='utf-8')
+    else:
+        file_handler = RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+    if compress:
+        file_handler.namer = lambda name: name + ".gz"
+        file_handler.rotator = _gzip_rotator
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
 
-    # 7. Log a startup message
+    # 7. Loggers only enqueue, the listener thread writes
+    _queue_handler = _CountingQueueHandler(queue.Queue(queue_size))
+    logger.addHandler(_queue_handler)
+    _listener = QueueListener(_queue_handler.queue, console_handler, file_handler, respect_handler_level=True)
+    _listener.start()
+    _listener._thread.name = "Thread-logging"
+
+    # 8. Log a startup message
     logger.info("Logging initialized at level %s", logging.getLevelName(log_level))
     logger.info("All logs for this session will be stored in: %s", log_path)
 
+def set_plugin_level(name: str, level):
+    """
+    Override the log level of one plugin ("sample") or any logger ("core.event_bus"),
+    e.g. DEBUG on the plugin being worked on while the rest stays at INFO.
+    """
+    logger_name = name if "." in name else f"plugins.{name}"
+    logging.getLogger(logger_name).setLevel(level)
+
+def logging_stats() -> dict:
+    """Log volume since setup: records per level and per source, records dropped on a full queue."""
+    if _queue_handler is None:
+        return {}
+    return _queue_handler.stats()
+
+def stop_logging():
+    """Flush the queue and stop the writer thread (also run at exit)."""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+atexit.register(stop_logging)
+
+#####################################################
+#                  Additional Functions
+#####################################################
+class _CountingQueueHandler(QueueHandler):
+    """QueueHandler that doesn't block the logging thread: counts records and drops them when the queue is full."""
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self._lock = threading.Lock()
+        self._levels = Counter()
+        self._sources = Counter()
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Same process: the listener gets the record itself, only the message is merged now (args may change later)
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record):
+        source = ".".join(record.name.split(".")[:2])  # plugins.sample, core.event_bus, ...
+        try:
+            if record.levelno >= logging.ERROR:
+                self.queue.put(record, timeout=1)  # errors are worth a short wait
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return
+        with self._lock:
+            self._levels[record.levelname] += 1
+            self._sources[source] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"records": sum(self._levels.values()), "dropped": self.dropped, "queued": self.queue.qsize(),
+                    "by_level": dict(self._levels), "by_source": dict(self._sources.most_common())}
+
+def _gzip_rotator(source: str, destination: str):
+    """Rotate by compressing the full log file, runs on the writer thread."""
+    with open(source, "rb") as log_file, gzip.open(destination, "wb") as compressed:
+        shutil.copyfileobj(log_file, compressed)
+    os.remove(source)
@@ -0,0 +1,157 @@
+"""
+File Location: core/offload.py
+Author: Lizza Celestia
+Version: ALizz_AI_V1_0
+Create Date: 2026-10-18
+Modified Date: 2026-10-18
+Description:
+    Runs heavy sync handlers off the bus dispatch workers, on pools shared by the whole core:
+        - "io":  a ThreadPoolExecutor, for handlers waiting on files, sockets or devices
+        - "cpu": a ProcessPoolExecutor, for pure Python number crunching (tokenizing, resampling, embeddings)
+    A handler opts in with the decorator or the subscribe option:
+        @offload("cpu")
+        def embed(data): ...
+        core.event_bus.subscribe("TEXT_INPUT", embed)            # or subscribe(..., offload="io")
+    The dispatch worker submits the call and moves on. The handler's result is the pool's Future:
+    dispatch() returns it, request()/gather() reply with it.
+    cpu handlers run in another process: they must be module-level functions and their data picklable.
+    The pools are created on first use, capped by Core(offload_io_workers=, offload_cpu_workers=)
+    and shut down by Core.shutdown. The next call after a shutdown (Core.boot again) starts them anew.
+"""
+from concurrent.futures import BrokenExecutor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+import multiprocessing
+import os
+import threading
+import time
+import logging
+logger = logging.getLogger(__name__)
+plugin_name = "Offload"
+
+IO = "io"
+CPU = "cpu"
+OFFLOAD_MODES = (IO, CPU)
+
+def offload(mode: str):
+    """
+    Decorator marking a sync handler to run on the io or cpu pool, subscribe() picks it up.
+    :param mode: "io" (thread pool) or "cpu" (process pool).
+    """
+    if mode not in OFFLOAD_MODES:
+        raise ValueError(f"Unknown offload mode '{mode}', expected one of {OFFLOAD_MODES}")
+
+    def mark(handler):
+        handler.offload = mode
+        return handler
+    return mark
+
+class OffloadPool:
+    """
+    One lazily created executor and its accounting: calls waiting for a worker (queued), calls running,
+    and the busy share of its workers since it started (utilization).
+    """
+    def __init__(self, mode: str, workers: int):
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.executor = None
+        self.in_flight = set()      # submitted calls not finished yet
+        self.completed = 0
+        self.failed = 0
+        self.started = None
+        self._busy = 0.0            # worker-seconds spent running calls
+        self._changed = 0.0
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args) -> Future:
+        with self._lock:
+            if self.executor is None:
+                self._start()
+            try:
+                future = self.executor.submit(fn, *args)
+            except BrokenExecutor:  # a worker process died, start a fresh pool
+                logger.warning(f"[{plugin_name}] The '{self.mode}' pool is broken, starting a new one.")
+                self._start()
+                future = self.executor.submit(fn, *args)
+            self._account()
+            self.in_flight.add(future)
+        future.add_done_callback(self._done)
+        return future
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._account()
+            in_flight = len(self.in_flight)
+            running = min(in_flight, self.workers)
+            uptime = time.monotonic() - self.started if self.started is not None else 0.0
+            return {"started": self.executor is not None, "workers": self.workers, "queued": in_flight - running,
+                    "running": running, "completed": self.completed, "failed": self.failed,
+                    "utilization": self._busy / (self.workers * uptime) if uptime else 0.0}
+
+    def shutdown(self, timeout: float = 10) -> int:
+        """
+        Cancel the queued calls and wait for the running ones. The pool is started again on the next submit.
+        :return: Calls still running after the timeout.
+        """
+        with self._lock:
+            executor, self.executor = self.executor, None
+            in_flight = list(self.in_flight)
+        if executor is None:
+            return 0
+        executor.shutdown(wait=False, cancel_futures=True)
+        running = [future for future in in_flight if not future.cancelled()]  # cancelled ones never notify wait()
+        _, pending = wait(running, timeout=timeout)
+        if not pending:
+            executor.shutdown(wait=True)  # idle now, joins its threads/processes (and management thread)
+        return len(pending)
+
+#####################################################
+#                  Additional Functions
+#####################################################
+    def _start(self):
+        if self.mode == CPU:  # spawn, like the process plugins: forking a threaded process is unsafe
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"Thread-offload_{self.mode}")
+        if self.started is None:
+            self.started = self._changed = time.monotonic()
+
+    def _account(self):
+        """Add the busy time since the last change of in_flight (called under the lock, before changing it)."""
+        now = time.monotonic()
+        self._busy += min(len(self.in_flight), self.workers) * (now - self._changed)
+        self._changed = now
+
+    def _done(self, future: Future):
+        with self._lock:
+            self._account()
+            self.in_flight.discard(future)
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+class OffloadPools:
+    """The io and cpu pools of a core."""
+    def __init__(self, io_workers: int = None, cpu_workers: int = None):
+        """
+        :param io_workers: Threads of the io pool (default: CPUs + 4, at most 32).
+        :param cpu_workers: Processes of the cpu pool (default: CPUs - 1, at least 1).
+        """
+        cpus = os.cpu_count() or 1
+        self.pools = {IO: OffloadPool(IO, io_workers or min(32, cpus + 4)),
+                      CPU: OffloadPool(CPU, cpu_workers or max(1, cpus - 1))}
+
+    def submit(self, mode: str, fn, *args) -> Future:
+        """Run fn(*args) on the io or cpu pool, starting it on first use."""
+        return self.pools[mode].submit(fn, *args)
+
+    def stats(self) -> dict:
+        """{mode: {"started", "workers", "queued", "running", "completed", "failed", "utilization"}}"""
+        return {mode: pool.stats() for mode, pool in self.pools.items()}
+
+    def shutdown(self, timeout: float = 10):
+        """Shut both pools down, queued calls are cancelled, running ones get `timeout` seconds."""
+        deadline = time.monotonic() + timeout
+        for mode, pool in self.pools.items():
+            still_running = pool.shutdown(max(0.0, deadline - time.monotonic()))
+            if still_running:
+                logger.warning(f"[{plugin_name}] {still_running} '{mode}' handlers still running after the shutdown deadline.")
@@ -3,7 +3,7 @@ File Location: core/plugin_manager.py
 Author: Lizza Celestia
 Version: ALizz_AI_V1_0
 Create Date: 2025-02-12
-Modified Date: 2025-03-02
+Modified Date: 2026-10-18
 Description:
 """
 # core/plugin_manager.py
@@ -12,87 +12,90 @@ import sys
 import time
 import threading
 import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Union
 from core.base_plugin import BasePlugin
+from core.event_bus import PRIORITY_HIGH
+from core.plugin_manifest import read_manifest
+from core.boot_graph import build_boot_graph, critical_path, format_boot_report
+from core.lazy_plugin import LazyPlugin
+from core.plugin_process import PluginProcess
+from core.shared_loop import SharedLoopExecutor, PluginTasks
 
 import logging
 logger = logging.getLogger(__name__)
 
 class PluginManager:
-    def __init__(self, plugin_directory: str, core=None, priority_plugins=[]):
+    def __init__(self, plugin_directory: str, core=None, priority_plugins=[], boot_workers: int = 4,
+                 shared_loops: int = 1):
         self.plugin_directory = Path(plugin_directory)
-        self.loaded_plugins: Dict[str, BasePlugin] = {}
+        self.package = self.plugin_directory.name  # plugins are imported as <package>.<name>.<name>_plugin
+        package_parent = str(self.plugin_directory.resolve().parent)
+        if package_parent not in sys.path:  # a plugin folder outside the project (benchmarks, tests)
+            sys.path.append(package_parent)
+        self.loaded_plugins: Dict[str, Union[BasePlugin, PluginProcess]] = {}
         self.core = core  # <-- must be set. acces for the event_bus which will be send to each plugin on init
         self.module_threads = {}
         self.priority_plugins = priority_plugins
-
-    def priority_loading(self):
-        logger.debug(f"[PluginManager]: Scanning directory: {self.plugin_directory}")
-        for item in self.plugin_directory.iterdir():
-            try:
-                if item.name in self.priority_plugins:
-                    logger.debug(f"Checking: {item} (Is dir? {item.is_dir()})")
-                    if item.is_dir() and (item / "__init__.py").exists():
-                        logger.debug(f"Found priority plugin candidate: {item.name}")
-                        self._load_plugin(item.name)
-                    else:
-                        logger.error(f"Priority Plugin: {item.name} (not a plugin or missing __init__.py)")
-                else:
-                    logger.debug(f"Skipping: {item.name} (not in priority list) {self.priority_plugins}")
-            
-            except Exception as e:
-                logging.error(f"'Error discovering' plugin '{item}': {e}")
-
+        self.boot_workers = max(1, boot_workers)   # plugins loading at the same time
+        self.boot_report = {}                       # timings of the last boot, see _boot_plugins
+        self.lazy_plugins: Dict[str, LazyPlugin] = {}   # plugins loaded on their first event
+        self.stop_acks: Dict[str, Future] = {}      # resolved (with the time) when a plugin's thread has exited
+        self.shared_loops = SharedLoopExecutor(shared_loops)  # loops running the `lightweight = True` plugins
+        self._idle_monitor = None
 
     def discover_plugins(self):
         """
         Scan the plugin folder and load active plugins, plugins with existing __init__.py
+        Plugins load in parallel, each one once the plugins it depends on are loaded
+        (priority plugins first, see core/boot_graph.py).
         """
         if not self.plugin_directory.exists():
             logger.error(f"[PluginManager] Plugin directory '{self.plugin_directory}' does not exist!")
             return
-    # start by loading priority plugins first
-        if self.priority_plugins:
-            logger.debug(f"[PluginManager]: Scanning for priority plugins: {self.priority_plugins}")
-            self.priority_loading()
-        else:
-            logger.debug(f"[PluginManager]: Priority list is empty, starting normal loading...")
-            
-    # load the rest of the plugins
+
         logger.debug(f"[PluginManager]: 'Scanning directory: {self.plugin_directory}'")
+        candidates = []
         for item in self.plugin_directory.iterdir():
             try:
                 logger.debug(f"Checking: {item} (Is dir? {item.is_dir()})")
 
                 if item.is_dir() and (item / "__init__.py").exists():       # check if the plugin is active
-                    if item.name in self.loaded_plugins:                    # if the plugin is already loaded, ignore an go to next
+                    if item.name in self.loaded_plugins or item.name in self.lazy_plugins:  # already loaded (or lazy), go to next
                         logger.debug(f"[PluginManager] Plugin '{item.name}' is already loaded. Skipping.") 
                         continue
                     logger.info(f"[PluginManager] Found plugin candidate: '{item.name}'")      
-                    self._load_plugin(item.name)
-                    
+                    candidates.append(item.name)
+
+                elif item.name in self.priority_plugins:
+                    logger.error(f"Priority Plugin: {item.name} (not a plugin or missing __init__.py)")
                 else:
                     logger.debug(f"[PluginManager] Skipping '{item.name}' (Not a plugin or missing __init__.py)")
             except Exception as e:
                 logging.error(f"'Error discovering' plugin '{item}': {e}")
 
+        self._boot_plugins(candidates)
+
     def rediscover_plugins(self):
         """
         Rescan the plugin folder and load new active plugins and unload deactivate plugins
         """
         logger.debug(f"[PluginManager]: Scanning directory: {self.plugin_directory}")
+        new_plugins = []
         for item in self.plugin_directory.iterdir():
             try:
                 logger.debug(f"Checking: {item} (Is dir? {item.is_dir()})")
                 if item.is_dir() and (item / "__init__.py").exists():       # check if the plugin is active
-                    if item.name in self.loaded_plugins:                    # if the plugin is already loaded, ignore an go to next
+                    if item.name in self.loaded_plugins or item.name in self.lazy_plugins:  # already loaded (or lazy), go to next
                         logger.debug(f"Plugin '{item.name}' is already loaded") 
                         continue
                     logger.debug(f"Loading newly activated plugin: '{item.name}'")        
-                    self._load_plugin(item.name)
+                    new_plugins.append(item.name)
 
                 elif item.is_dir() and not (item / "__init__.py").exists(): # if the plugin is inactive
+                    if item.name in self.lazy_plugins:
+                        self.unregister_lazy_plugin(item.name)
                     if item.name in self.loaded_plugins:                    # check if the plugin was loaded
                         logger.debug(f"Unloading deactivated plugin: '{item.name}'")
                         self.unload_plugin(item.name)                       # if so unloaded
@@ -102,23 +105,110 @@ class PluginManager:
             except Exception as e:
                 logging.error(f"'Error discovering' plugin '{item}': {e}")
 
+        if new_plugins:
+            self._boot_plugins(new_plugins)
+
+    def _boot_plugins(self, plugin_names):
+        """
+        Load plugins on a pool of boot_workers threads, each one as soon as its dependencies are loaded.
+        A dependency that fails to load doesn't hold its dependents back, they are started anyway.
+        Ends with a timing report (start, duration, critical path), kept in self.boot_report.
+        """
+        manifests = {name: read_manifest(self.plugin_directory, name) for name in plugin_names}
+        for name in [name for name, manifest in manifests.items() if manifest.get("lazy")]:
+            self._register_lazy_plugin(name, manifests.pop(name))
+        graph = build_boot_graph(manifests, self.priority_plugins, loaded=self.loaded_plugins)
+        waiting = {name: set(dependencies) for name, dependencies in graph.items()}
+        timings = {}
+        boot_start = time.perf_counter()
+
+        def load(name):
+            start = time.perf_counter() - boot_start
+            self._load_plugin(name)
+            return start, time.perf_counter() - boot_start
+
+        with ThreadPoolExecutor(max_workers=self.boot_workers, thread_name_prefix="Thread-plugin_boot") as pool:
+            running = {}
+            while waiting or running:
+                for name in sorted(name for name, dependencies in waiting.items() if not dependencies):
+                    del waiting[name]
+                    running[pool.submit(load, name)] = name
+                if not running:
+                    logger.error(f"[PluginManager] Could not order plugins {sorted(waiting)}, loading them anyway.")
+                    for name in sorted(waiting):
+                        running[pool.submit(load, name)] = name
+                    waiting.clear()
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    timings[name] = future.result()
+                    if name not in self.loaded_plugins:
+                        logger.warning(f"[PluginManager] '{name}' failed to load, starting the plugins waiting for it anyway.")
+                    for dependencies in waiting.values():
+                        dependencies.discard(name)
+
+        total = time.perf_counter() - boot_start
+        self.boot_report = {"total": total, "graph": graph, "timings": timings,
+                            "critical_path": critical_path(graph, timings)}
+        if timings:
+            logger.info(format_boot_report(graph, timings, total))
+
+
+    def _register_lazy_plugin(self, plugin_name: str, manifest: dict):
+        """Subscribe a stand-in for a `lazy = True` plugin instead of loading it (see core/lazy_plugin.py)."""
+        lazy_plugin = LazyPlugin(plugin_name, manifest, self)
+        if not lazy_plugin.event_types:
+            logger.warning(f"[PluginManager] Lazy plugin '{plugin_name}' has no literal subscriptions_list, loading it now.")
+            self._load_plugin(plugin_name)
+            return
+        self._configure_plugin_events(plugin_name)
+        lazy_plugin.register()
+        self.lazy_plugins[plugin_name] = lazy_plugin
+        if lazy_plugin.idle_timeout and self._idle_monitor is None:
+            self._idle_monitor = threading.Thread(target=self._unload_idle_plugins, name="Thread-plugin_idle", daemon=True)
+            self._idle_monitor.start()
+
+    def unregister_lazy_plugin(self, plugin_name: str):
+        """Forget a lazy plugin: unload it if it is active and stop activating it on events."""
+        lazy_plugin = self.lazy_plugins.pop(plugin_name, None)
+        if lazy_plugin is not None:
+            lazy_plugin.unregister()
+            if plugin_name in self.loaded_plugins:
+                self.unload_plugin(plugin_name)
+
+    def _unload_idle_plugins(self):
+        """Unload active lazy plugins that got no event for their idle_timeout, the next event loads them again."""
+        while True:
+            timeouts = [lazy.idle_timeout for lazy in list(self.lazy_plugins.values()) if lazy.idle_timeout]
+            time.sleep(min(max(min(timeouts, default=5) / 4, 0.5), 5))
+            for name, lazy_plugin in list(self.lazy_plugins.items()):
+                if lazy_plugin.idle_timeout and lazy_plugin.active and lazy_plugin.idle_for() > lazy_plugin.idle_timeout:
+                    logger.info(f"[PluginManager] Lazy plugin '{name}' idle for {lazy_plugin.idle_for():.0f}s, unloading it.")
+                    self.unload_plugin(name)
 
     def _load_plugin(self, plugin_name: str):
         """
         Dynamically loads a plugin based on naming conventions:
         - The plugin’s code is in plugins/<plugin_name>/<plugin_name>_plugin.py
         - The main plugin class is <PluginName>Plugin, e.g. "EchoPlugin" for "echo".
-        - start a thread for the plugin 
+        - start a thread for the plugin (a task on a shared loop for `lightweight = True` plugins)
         """
         try:
-            module_path = f"plugins.{plugin_name}.{plugin_name}_plugin"
+            module_path = self.module_path(plugin_name)
+            class_name = f"{plugin_name.capitalize()}Plugin"
+            manifest = read_manifest(self.plugin_directory, plugin_name)
+
+        # Step 0: Plugins flagged with `run_in_process = True` get their own process instead of a thread
+            if manifest.get("run_in_process"):
+                self._load_plugin_process(plugin_name, module_path, class_name)
+                return
+
             logger.debug(f"'Loading' plugin module: {module_path}")
         # Step 1: Import the plugin module dynamically
             module = importlib.import_module(module_path)
             logger.debug(f"[PluginManager] Module '{module_path}' imported successfully.")
 
         # Step 2: Construct the expected plugin class name based on the plugin folder name
-            class_name = f"{plugin_name.capitalize()}Plugin"
             if not hasattr(module, class_name):
                 logger.error(f"[PluginManager] Plugin class '{class_name}' not found in module '{module_path}'.")
                 return
@@ -126,6 +216,7 @@ class PluginManager:
             logger.debug(f"[PluginManager] Found plugin class '{class_name}'.")
             
         # Step 3: Instantiate the plugin
+            self._configure_plugin_events(plugin_name)
             plugin_instance = plugin_class(self.core)
             if not isinstance(plugin_instance, BasePlugin):
                 logger.warning(f"[PluginManager] Plugin '{plugin_name}' does not implement BasePlugin. Skipping.")
@@ -134,9 +225,17 @@ class PluginManager:
             self.loaded_plugins[plugin_name] = plugin_instance
             logger.info(f"[PluginManager] Plugin '{plugin_name}' loaded successfully.")
 
-        # Step 4: Start the plugin in a separate thread
+        # Step 4: Start the plugin in a separate thread, lightweight plugins share a loop
+            if manifest.get("lightweight"):
+                group = self.shared_loops.start_plugin(plugin_name, plugin_instance)
+                self.module_threads[plugin_name] = group
+                self.stop_acks[plugin_name] = group.stopped
+                return
+
             logger.debug(f"[PluginManager] Initializing plugin event loop for '{plugin_name}'...")
-            module_thread = threading.Thread(target=plugin_instance.init_event_loop, name=f"Thread-{plugin_name}")
+            self.stop_acks[plugin_name] = Future()
+            module_thread = threading.Thread(target=self._run_plugin, args=(plugin_name, plugin_instance),
+                                             name=f"Thread-{plugin_name}")
             self.module_threads[plugin_name] = module_thread
             module_thread.start()
             logger.info(f"[PluginManager] Plugin '{plugin_name}' thread started successfully.")
@@ -144,6 +243,36 @@ class PluginManager:
         except Exception as e:
             logger.error(f"'Failed to load' plugin {plugin_name}: {e}", exc_info=True)
 
+    def _run_plugin(self, plugin_name: str, plugin_instance):
+        """Plugin thread: run its event loop, then acknowledge the stop whatever way the loop ended."""
+        try:
+            plugin_instance.init_event_loop()
+        except asyncio.CancelledError:
+            logger.debug(f"[PluginManager] Plugin '{plugin_name}' tasks were cancelled on stop.")
+        except Exception as e:
+            logger.error(f"[PluginManager] Plugin '{plugin_name}' event loop crashed: {e}", exc_info=True)
+        finally:
+            ack = self.stop_acks.get(plugin_name)
+            if ack is not None and not ack.done():
+                ack.set_result(time.monotonic())
+
+    def _load_plugin_process(self, plugin_name: str, module_path: str, class_name: str):
+        """Start a plugin in a child process, bridged to the event bus (see core/plugin_process.py)."""
+        logger.debug(f"[PluginManager] Plugin '{plugin_name}' runs in its own process.")
+        self._configure_plugin_events(plugin_name)
+        plugin_process = PluginProcess(plugin_name, module_path, class_name, self.core)
+        plugin_process.start()
+        self.loaded_plugins[plugin_name] = plugin_process
+        self.module_threads[plugin_name] = plugin_process
+        self.stop_acks[plugin_name] = plugin_process.stopped
+        logger.info(f"[PluginManager] Plugin '{plugin_name}' loaded successfully.")
+
+    def _configure_plugin_events(self, plugin_name: str):
+        """Its stop events are control traffic and skip the data backlog, its status is a latest-value event type."""
+        self.core.event_bus.set_priority(f"PLUGIN_STOP_{plugin_name}", PRIORITY_HIGH)
+        self.core.event_bus.set_priority(f"STOP_{plugin_name}", PRIORITY_HIGH)
+        self.core.event_bus.configure_topic(f"PLUGIN_STATUS_{plugin_name.upper()}", coalesce=True)
+
     def reload_plugin(self, plugin_name: str):
         """
         Reloads a plugin by unloading and then reloading it.
@@ -155,19 +284,29 @@ class PluginManager:
     
         if plugin_name in self.loaded_plugins:
             try:
-            # Step 1: Unload the existing plugin
-                self.unload_plugin(plugin_name)
+            # Step 1: Unload the existing plugin, and let the bus dispatch its PLUGIN_STOP event first:
+            #         the new instance subscribes to the same event and would stop right away
+                stop_event = f"PLUGIN_STOP_{plugin_name}"
+                stop_dispatched = threading.Event()
+                plugin_instance = self.loaded_plugins[plugin_name]
+                if not (isinstance(plugin_instance, PluginProcess) or hasattr(plugin_instance, "handle_stop_event")):
+                    stop_dispatched.set()  # no stop event is published for it
+                on_stop = lambda data: stop_dispatched.set()
+                self.core.event_bus.subscribe(stop_event, on_stop)
+                try:
+                    self.unload_plugin(plugin_name)
+                    if not stop_dispatched.wait(5):
+                        logger.warning(f"[PluginManager] '{stop_event}' still pending, reloading '{plugin_name}' anyway.")
+                finally:
+                    self.core.event_bus.unsubscribe(stop_event, on_stop)
 
             # Step 2: Ensure the module is removed from sys.modules
-                module_path = f"plugins.{plugin_name}.{plugin_name}_plugin"
+                module_path = self.module_path(plugin_name)
                 if module_path in sys.modules:
                     logger.debug(f"[PluginManager] Removing module '{module_path}' from sys.modules...")
                     del sys.modules[module_path]
 
-            # Step 3: Wait briefly to allow cleanup
-                time.sleep(1)
-
-            # Step 4: Reload the plugin
+            # Step 3: Reload the plugin (unload returned once the old one acknowledged its stop)
                 self._load_plugin(plugin_name)
 
                 self.print_active_threads()  # Debugging: Check active threads before reloading
@@ -177,67 +316,152 @@ class PluginManager:
         else:
             logging.warning(f"Can't 'Reload' Plugin: '{plugin_name}', it is not in 'loaded_plugins'")
 
-    def unload_plugin(self, plugin_name: str):
+    def unload_plugin(self, plugin_name: str, timeout: float = 10) -> bool:
         """
-        Unloads a plugin if it is loaded: stops the event loop,
-        ensures the thread exits, and removes it from memory.
+        Unloads a plugin if it is loaded: asks it to stop, waits for its acknowledgement
+        (its thread or process exiting), and removes it from memory.
+        :param timeout: Seconds the plugin gets to stop, its tasks are cancelled after half of it.
+        :return: True if the plugin stopped in time.
         """
-        if plugin_name in self.loaded_plugins:
-            try:
-                logger.info(f"[PluginManager] Unloading plugin '{plugin_name}'...")
+        if plugin_name not in self.loaded_plugins:
+            logging.warning(f"Can't 'Unload' Plugin: '{plugin_name}', it is not in 'loaded_plugins")
+            return False
+        return not self.stop_plugins([plugin_name], timeout)
 
-                plugin_instance = self.loaded_plugins[plugin_name]
+    def stop_plugins(self, plugin_names, timeout: float = 10):
+        """
+        Stop and unload several plugins in parallel under one global deadline.
+        - Step 1: every plugin is asked to stop at once (PLUGIN_STOP_<name> and its stop_event)
+        - Step 2: half of the timeout later, plugins that did not acknowledge get their tasks cancelled
+                  (process plugins are terminated)
+        - Step 3: at the deadline, all of them are removed, the ones still running are reported
+        :return: The names of the plugins that overran the deadline.
+        """
+        start = time.monotonic()
+        deadline = start + timeout
+        acks = {}
+        for plugin_name in plugin_names:
+            if plugin_name in self.loaded_plugins:
+                try:
+                    acks[plugin_name] = self._request_stop(plugin_name)
+                except Exception as e:
+                    logging.error(f"'Error stopping' module {plugin_name}: {e}")
+        if not acks:
+            return []
 
-            # Step 1: Send STOP event to plugin
-                if hasattr(plugin_instance, "handle_stop_event"):
-                    logger.debug(f"[{plugin_name}] Sending STOP signal before unloading...")
-                    # asyncio.run(plugin_instance.handle_stop_event({}))
-                    logger.debug(f"[{plugin_name}] Publishing 'PLUGIN_STOP_{plugin_name}' event.")
-                    self.core.event_bus.publish(f"PLUGIN_STOP_{plugin_name}",{"bool": True})
-                    plugin_instance.stop_event.set()
-
-                time.sleep(0.5)  # Allow time for the plugin to stop
-
-            # Step 2: Unsubscribe from all event handlers before unloading
-                if hasattr(plugin_instance, "subscriptions_list"):
-                    for event, handler in plugin_instance.subscriptions_list.items():
-                        event_handler = getattr(plugin_instance, handler, None)
-                        if event_handler:
-                            self.core.event_bus.unsubscribe(event, event_handler)
-                            
-            # Step 3: Stop the plugin's event loop if it's running
-                if plugin_instance.loop and plugin_instance.loop.is_running():
-                    logger.debug(f"[PluginManager] Stopping event loop of {plugin_name}...")
-                    plugin_instance.loop.call_soon_threadsafe(plugin_instance.loop.stop)
-
-            # Step 4: Wait for the thread to exit properly
-                module_thread = self.module_threads.get(plugin_name)
-                if module_thread and module_thread.is_alive():
-                    logger.debug(f"[PluginManager] Waiting for {plugin_name} thread to terminate...")
-                    module_thread.join(timeout=10)  # Give the thread time to exit
-                    if module_thread.is_alive():
-                        logger.warning(f"[PluginManager] Warning: {plugin_name} Thread did not terminate properly!")
-
-            # Step 5: Remove the plugin from internal dictionaries
-                del self.loaded_plugins[plugin_name]
-                del self.module_threads[plugin_name]
-
-            # Step 6: Remove the module from sys.modules
-                module_path = f"plugins.{plugin_name}.{plugin_name}_plugin"
-                if module_path in sys.modules:
-                    logger.debug(f"[PluginManager] Removing module {plugin_name} from sys.modules...")
-                    del sys.modules[module_path]
+        _, pending = wait(acks.values(), timeout=timeout / 2)
+        if pending:
+            for plugin_name, ack in acks.items():
+                if not ack.done():
+                    logger.debug(f"[PluginManager] '{plugin_name}' did not stop yet, cancelling its tasks...")
+                    self._cancel_plugin(plugin_name)
+            wait(pending, timeout=max(0, deadline - time.monotonic()))
 
-                logger.info(f"[PluginManager] Plugin '{plugin_name}' unloaded successfully.")
-                
+        overran = []
+        for plugin_name, ack in acks.items():
+            if ack.done():
+                logger.debug(f"[PluginManager] '{plugin_name}' stopped in {ack.result() - start:.3f}s.")
+            else:
+                overran.append(plugin_name)
+            try:
+                self._remove_plugin(plugin_name)
             except Exception as e:
                 logging.error(f"'Error unloading' module {plugin_name}: {e}")
+        if overran:
+            logger.warning(f"[PluginManager] Plugins still running after the {timeout}s deadline: {overran}")
+        logger.debug(f"[PluginManager] Stopped {len(acks)} plugins in {time.monotonic() - start:.3f}s.")
+        return overran
+
+    def _request_stop(self, plugin_name: str) -> Future:
+        """Ask a plugin to stop, return the future acknowledging it."""
+        logger.info(f"[PluginManager] Unloading plugin '{plugin_name}'...")
+        plugin_instance = self.loaded_plugins[plugin_name]
+        ack = self.stop_acks.get(plugin_name)
+        if ack is None:  # never started
+            ack = self.stop_acks[plugin_name] = Future()
+            ack.set_result(time.monotonic())
+
+        # Process plugins: the child stops itself, the bridge drops its subscriptions
+        if isinstance(plugin_instance, PluginProcess):
+            logger.debug(f"[{plugin_name}] Publishing 'PLUGIN_STOP_{plugin_name}' event.")
+            self.core.event_bus.publish(f"PLUGIN_STOP_{plugin_name}",{"bool": True})
+            plugin_instance.request_stop()
+            return ack
+
+        if hasattr(plugin_instance, "handle_stop_event"):
+            logger.debug(f"[{plugin_name}] Publishing 'PLUGIN_STOP_{plugin_name}' event.")
+            self.core.event_bus.publish(f"PLUGIN_STOP_{plugin_name}",{"bool": True})
+        loop = plugin_instance.loop
+        if loop is not None and loop.is_running():
+            try:
+                loop.call_soon_threadsafe(plugin_instance.stop_event.set)  # asyncio.Event is not thread-safe
+            except RuntimeError:  # loop closed in between
+                plugin_instance.stop_event.set()
         else:
-            logging.warning(f"Can't 'Unload' Plugin: '{plugin_name}', it is not in 'loaded_plugins")
+            plugin_instance.stop_event.set()
+        return ack
+
+    def _cancel_plugin(self, plugin_name: str):
+        """Plugin ignored its stop request: cancel the tasks of its loop (terminate a process)."""
+        plugin_instance = self.loaded_plugins.get(plugin_name)
+        if isinstance(plugin_instance, PluginProcess):
+            plugin_instance.process.terminate()
+            return
+        module_thread = self.module_threads.get(plugin_name)
+        if isinstance(module_thread, PluginTasks):  # only its own tasks, the loop is shared
+            module_thread.cancel()
+            return
+        loop = getattr(plugin_instance, "loop", None)
+        if loop is not None and loop.is_running():
+            try:
+                loop.call_soon_threadsafe(_cancel_tasks, loop)
+            except RuntimeError:
+                pass
+
+    def _remove_plugin(self, plugin_name: str):
+        """Drop a stopped (or overrunning) plugin: its subscriptions, references and module."""
+        plugin_instance = self.loaded_plugins.pop(plugin_name, None)
+        if plugin_instance is None:  # removed meanwhile by another unload
+            return
+        if isinstance(plugin_instance, PluginProcess):
+            plugin_instance.close()
+        elif hasattr(plugin_instance, "subscriptions_list"):
+            for event, handler in plugin_instance.subscriptions_list.items():
+                event_handler = getattr(plugin_instance, handler, None)
+                if event_handler:
+                    self.core.event_bus.unsubscribe(event, event_handler)
+
+        module_thread = self.module_threads.get(plugin_name)
+        if module_thread is not None and module_thread.is_alive():
+            logger.warning(f"[PluginManager] Warning: {plugin_name} Thread did not terminate properly!")
+
+        self.module_threads.pop(plugin_name, None)
+        self.stop_acks.pop(plugin_name, None)
+
+        package = f"{self.package}.{plugin_name}"
+        for module_path in [name for name in sys.modules if name.startswith(package + ".")]:  # helpers too
+            logger.debug(f"[PluginManager] Removing module {module_path} from sys.modules...")
+            del sys.modules[module_path]
+
+        logger.info(f"[PluginManager] Plugin '{plugin_name}' unloaded successfully.")
+
+    def module_path(self, plugin_name: str) -> str:
+        """Import path of a plugin's main module."""
+        return f"{self.package}.{plugin_name}.{plugin_name}_plugin"
 
     def print_active_threads(self):
         """Prints all currently active threads in the application."""
         logger.info("=== Active Threads ===")
         for thread in threading.enumerate():
             logger.info(f"Thread Name: {thread.name}, Alive: {thread.is_alive()}, Daemon: {thread.daemon}")
+        for plugin_name, module_thread in self.module_threads.items():
+            if isinstance(module_thread, PluginProcess):
+                logger.info(f"Process Name: {module_thread.name}, PID: {module_thread.pid}, Alive: {module_thread.is_alive()}")
+        for loop_name, plugins in self.shared_loops.mapping().items():
+            logger.info(f"Shared loop: {loop_name}, Plugins: {plugins}")
         logger.info("======================")
+
+def _cancel_tasks(loop):
+    """Cancel every task of a plugin's loop (runs in that loop), its run_until_complete then returns."""
+    for task in asyncio.all_tasks(loop):
+        task.cancel()
@@ -0,0 +1,62 @@
+"""
+File Location: core/plugin_manifest.py
+Author: Lizza Celestia
+Version: ALizz_AI_V1_0
+Create Date: 2026-10-18
+Modified Date: 2026-10-18
+Description:
+    Reads the settings a plugin declares in its module without importing it.
+    Only literal top-level assignments are picked up, e.g. in <name>_plugin.py:
+        run_in_process = True
+        depends_on = ["audio"]
+        publishing_list = {"PLUGIN_STATUS_SAMPLE": "bool: {bool}"}
+    plus the literal `self.subscriptions_list = {...}` set in the plugin class.
+"""
+from pathlib import Path
+import ast
+import logging
+logger = logging.getLogger(__name__)
+
+def plugin_module_file(plugin_directory, plugin_name: str) -> Path:
+    """Path of plugins/<plugin_name>/<plugin_name>_plugin.py"""
+    return Path(plugin_directory) / plugin_name / f"{plugin_name}_plugin.py"
+
+def read_manifest(plugin_directory, plugin_name: str) -> dict:
+    """
+    Return {name: value} for every top-level `name = <literal>` in the plugin module,
+    and "subscriptions_list" if the plugin assigns a literal self.subscriptions_list.
+    Missing or unparsable modules give an empty manifest (the import will report the real error).
+    """
+    module_file = plugin_module_file(plugin_directory, plugin_name)
+    try:
+        tree = ast.parse(module_file.read_text(encoding="utf-8"), filename=str(module_file))
+    except (OSError, SyntaxError, ValueError) as e:
+        logger.debug(f"[PluginManager] No manifest for '{plugin_name}': {e}")
+        return {}
+
+    manifest = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            targets, value = node.targets, node.value
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            targets, value = [node.target], node.value
+        else:
+            continue
+        try:
+            literal = ast.literal_eval(value)
+        except (ValueError, TypeError, SyntaxError):
+            continue
+        for target in targets:
+            if isinstance(target, ast.Name):
+                manifest[target.id] = literal
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign) and any(isinstance(target, ast.Attribute) and target.attr == "subscriptions_list"
+                                                for target in node.targets):
+            try:
+                subscriptions = ast.literal_eval(node.value)
+            except (ValueError, TypeError, SyntaxError):
+                continue
+            if subscriptions or "subscriptions_list" not in manifest:  # skip `= {}` placeholders
+                manifest["subscriptions_list"] = subscriptions
+    return manifest
@@ -0,0 +1,290 @@
+"""
+File Location: core/plugin_process.py
+Author: Lizza Celestia
+Version: ALizz_AI_V1_0
+Create Date: 2026-10-18
+Modified Date: 2026-10-18
+Description:
+    Runs a plugin in its own process, for plugins declaring `run_in_process = True` in their module.
+    PluginProcess stays in the core and bridges the child to the core EventBus over a Pipe:
+        child -> core: ("subscribe", event_type, options), ("unsubscribe", event_type),
+                       ("configure", event_type, options), ("publish", event_type, data, source),
+                       ("publish_many", event_type, items, source), ("log", record), ("status", bool)
+        core -> child: ("event", event_type, data, source), ("stop",)
+    The source of an event (core.event.Event.source) crosses the pipe, a child publish defaults to the plugin.
+    Inside the child the plugin gets a core stand-in whose event_bus speaks this protocol,
+    so plugin code does not change. A crashing child only takes its own plugin down.
+"""
+from concurrent.futures import Future
+import multiprocessing
+import importlib
+import threading
+import time
+import logging
+from core.event_bus import EventBus, QUEUED
+from core.offload import OffloadPools
+from core.topic_index import is_pattern
+logger = logging.getLogger(__name__)
+
+_QUEUE_OPTIONS = ("maxsize", "policy", "priority", "coalesce")     # applied by the core bus, the others by the child bus
+
+class PluginProcess:
+    """
+    Core side of a plugin running in a child process.
+    Quacks like the plugin thread for module_threads (name, is_alive, join) and like
+    the plugin for loaded_plugins (status, loop).
+    """
+    def __init__(self, plugin_name: str, module_path: str, class_name: str, core):
+        self.plugin_name = plugin_name
+        self.module_path = module_path
+        self.class_name = class_name
+        self.core = core
+        self.name = f"Process-{plugin_name}"
+        self.status = False
+        self.loop = None            # the plugin's loop lives in the child
+        self.process = None
+        self._conn = None
+        self._bridge = None
+        self._forwarders = {}       # event_type -> callback subscribed on the core bus
+        self._send_lock = threading.Lock()
+        self._stopping = False
+        self.stopped = Future()     # resolved (with the time) once the child has closed its end of the pipe
+
+    def start(self):
+        """Spawn the child process and the bridge thread relaying its messages."""
+        context = multiprocessing.get_context("spawn")
+        self._conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_child_main,
+            args=(child_conn, self.module_path, self.class_name, self.plugin_name, logging.getLogger().level),
+            name=self.name, daemon=True)
+        self.process.start()
+        child_conn.close()
+        self._bridge = threading.Thread(target=self._bridge_loop, name=f"Thread-{self.plugin_name}", daemon=True)
+        self._bridge.start()
+        logger.info(f"[PluginManager] Plugin '{self.plugin_name}' process started (pid {self.process.pid}).")
+
+    def stop(self, timeout: float = 10):
+        """Ask the child to stop, wait for it, kill it if it doesn't exit in time."""
+        self.request_stop()
+        self.join(timeout)
+        if self.process.is_alive():
+            logger.warning(f"[PluginManager] Plugin process '{self.plugin_name}' did not stop in {timeout}s, terminating it.")
+            self.process.terminate()
+        self.close()
+
+    def request_stop(self):
+        """Ask the child to stop without waiting, self.stopped acknowledges it."""
+        self._stopping = True
+        self._send(("stop",))
+
+    def close(self):
+        """Reap the stopped (or terminated) child and drop its subscriptions."""
+        if self.process is not None:
+            self.process.join(1)
+        if self._bridge is not None:
+            self._bridge.join(1)
+        self._drop_forwarders()
+
+    def deliver(self, event_type: str, data=None, source: str = None):
+        """Send an event to the plugin's own handlers only (events buffered while it was starting)."""
+        self._send(("event", event_type, data, source))
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def join(self, timeout: float = None):
+        if self.process is not None:
+            self.process.join(timeout)
+
+    @property
+    def pid(self):
+        return self.process.pid if self.process is not None else None
+
+#####################################################
+#                  Bridge
+#####################################################
+    def _bridge_loop(self):
+        """Relay the child's messages to the core until its end of the pipe closes."""
+        event_bus = self.core.event_bus
+        while True:
+            try:
+                message = self._conn.recv()
+            except (EOFError, OSError):
+                break
+            except Exception as e:
+                logger.error(f"[{self.plugin_name}] Could not read a message from the plugin process: {e}")
+                continue
+            kind = message[0]
+            if kind == "publish":
+                event_bus.publish(message[1], message[2], source=message[3] or self.plugin_name)
+            elif kind == "publish_many":
+                event_bus.publish_many(message[1], message[2], message[3] or self.plugin_name)
+            elif kind == "subscribe":
+                self._add_forwarder(message[1], message[2])
+            elif kind == "unsubscribe":
+                forwarder = self._forwarders.pop(message[1], None)
+                if forwarder is not None:
+                    event_bus.unsubscribe(message[1], forwarder)
+            elif kind == "configure":
+                event_bus.configure_topic(message[1], **message[2])
+            elif kind == "log":
+                record = logging.makeLogRecord(message[1])
+                logging.getLogger(record.name).handle(record)
+            elif kind == "status":
+                self.status = message[1]
+
+        self.status = False
+        self._drop_forwarders()
+        self._conn.close()
+        if not self.stopped.done():
+            self.stopped.set_result(time.monotonic())
+        if not self._stopping:
+            self.process.join(1)
+            logger.error(f"[PluginManager] Plugin process '{self.plugin_name}' exited unexpectedly "
+                         f"(exit code {self.process.exitcode}). The core keeps running, 'reload' restarts it.")
+            event_bus.publish(f"PLUGIN_STATUS_{self.plugin_name.upper()}", {"bool": False})
+
+    def _add_forwarder(self, event_type: str, options: dict):
+        if event_type in self._forwarders:
+            return
+        def forward(matched_event_type, event):
+            self._send(("event", matched_event_type, event.data, event.source))
+        forward.__qualname__ = f"{self.name}.forward[{event_type}]"
+        self._forwarders[event_type] = forward
+        self.core.event_bus.subscribe(event_type, forward, pass_event_type=True, pass_event=True, **options)
+
+    def _drop_forwarders(self):
+        for event_type, forwarder in list(self._forwarders.items()):
+            self.core.event_bus.unsubscribe(event_type, forwarder)
+        self._forwarders.clear()
+
+    def _send(self, message):
+        with self._send_lock:
+            try:
+                self._conn.send(message)
+            except (BrokenPipeError, EOFError, OSError):
+                logger.debug(f"[{self.plugin_name}] Plugin process is gone, dropped {message[0]} message.")
+            except Exception as e:  # unpicklable event data
+                logger.error(f"[{self.plugin_name}] Could not send {message[:2]} to the plugin process: {e}")
+
+#####################################################
+#                  Child process side
+#####################################################
+class _ChildEventBus(EventBus):
+    """EventBus inside the plugin process: publishes go to the core, events from the core are dispatched locally."""
+    def __init__(self, send):
+        super().__init__(workers=1)
+        self._send = send
+
+    def subscribe(self, event_type: str, callback, loop=None, **options):
+        first = event_type not in self._registry(event_type)
+        super().subscribe(event_type, callback, loop, **{k: v for k, v in options.items() if k not in _QUEUE_OPTIONS})
+        if first:
+            self._send(("subscribe", event_type,
+                        {k: v for k, v in options.items() if k in _QUEUE_OPTIONS and v is not None}))
+
+    def unsubscribe(self, event_type: str, callback):
+        super().unsubscribe(event_type, callback)
+        if event_type not in self._registry(event_type):
+            self._send(("unsubscribe", event_type))
+
+    def configure_topic(self, event_type: str, **options):
+        self._send(("configure", event_type, {k: v for k, v in options.items() if v is not None}))
+
+    def publish(self, event_type: str, data=None, block: bool = True, source: str = None):
+        self._send(("publish", event_type, data, source))
+        return QUEUED  # the outcome is only known in the core
+
+    async def apublish(self, event_type: str, data=None, source: str = None):
+        return self.publish(event_type, data, source=source)
+
+    def publish_many(self, event_type: str, items, source: str = None):
+        items = list(items)
+        self._send(("publish_many", event_type, items, source))
+        return [QUEUED] * len(items)
+
+    def _registry(self, event_type: str):
+        return self._pattern_subscribers if is_pattern(event_type) else self._subscribers
+
+    def deliver(self, event_type: str, data=None, source: str = None):
+        """Queue an event received from the core for the local subscribers."""
+        EventBus.publish(self, event_type, data, source=source)
+
+class _ChildCore:
+    """What a plugin sees as `core` inside its process."""
+    def __init__(self, event_bus):
+        self.event_bus = event_bus
+
+class _PipeLogHandler(logging.Handler):
+    """Sends log records to the core, so they end up in the core's console and log file."""
+    def __init__(self, send):
+        super().__init__()
+        self._send = send
+
+    def emit(self, record):
+        try:
+            record.msg = record.getMessage()
+            record.args = None
+            if record.exc_info:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+                record.exc_info = None
+            self._send(("log", record.__dict__.copy()))
+        except Exception:
+            self.handleError(record)
+
+def _child_main(conn, module_path: str, class_name: str, plugin_name: str, log_level: int):
+    """Entry point of the plugin process."""
+    send_lock = threading.Lock()
+    def send(message):
+        with send_lock:
+            try:
+                conn.send(message)
+            except (BrokenPipeError, EOFError, OSError):
+                pass
+
+    root = logging.getLogger()
+    root.handlers[:] = [_PipeLogHandler(send)]
+    root.setLevel(log_level)
+
+    event_bus = _ChildEventBus(send)
+    event_bus.attach_offload(OffloadPools())  # offload="io"/"cpu" handlers keep the child's dispatch worker free
+    try:
+        module = importlib.import_module(module_path)
+        plugin = getattr(module, class_name)(_ChildCore(event_bus))
+    except Exception as e:
+        logger.error(f"[{plugin_name}] 'Failed to load' plugin in its process: {e}", exc_info=True)
+        conn.close()
+        raise SystemExit(1)
+
+    reader = threading.Thread(target=_child_reader, args=(conn, event_bus, plugin), name="Thread-core_bridge", daemon=True)
+    reader.start()
+    event_bus.start()
+    send(("status", True))
+    try:
+        plugin.init_event_loop()
+    finally:
+        send(("status", False))
+        EventBus.publish(event_bus, "TERMINATE")
+        event_bus.offload_pools.shutdown(5)  # within the core's stop timeout
+        conn.close()
+
+def _child_reader(conn, event_bus, plugin):
+    """Feed events from the core to the local bus, stop the plugin on request or when the core goes away."""
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+        if message[0] == "event":
+            event_bus.deliver(message[1], message[2], message[3])
+        elif message[0] == "stop":
+            _request_stop(plugin)
+    _request_stop(plugin)
+
+def _request_stop(plugin):
+    loop = plugin.loop
+    if loop is not None and loop.is_running():
+        loop.call_soon_threadsafe(plugin.stop_event.set)
+    else:
+        plugin.stop_event.set()
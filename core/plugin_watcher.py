@@ -0,0 +1,284 @@
+"""
+File Location: core/plugin_watcher.py
+Author: Lizza Celestia
+Version: ALizz_AI_V1_0
+Create Date: 2026-10-18
+Modified Date: 2026-10-18
+Description:
+    Watches the plugin folder and applies changes without the 'scan' or 'reload' commands:
+        - a plugin's .py files changed         -> reload_plugin
+        - __init__.py added (plugin activated) -> loaded
+        - __init__.py or the folder removed    -> unload_plugin
+    Uses inotify (through ctypes) on Linux and falls back to polling an mtime/inode cache elsewhere.
+    Bursts of writes (editors saving several files) are debounced into one action per plugin.
+"""
+from pathlib import Path
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+import logging
+logger = logging.getLogger(__name__)
+plugin_name = "PluginWatcher"
+
+# inotify(7) flags
+_IN_MODIFY      = 0x00000002
+_IN_ATTRIB      = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM  = 0x00000040
+_IN_MOVED_TO    = 0x00000080
+_IN_CREATE      = 0x00000100
+_IN_DELETE      = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_IGNORED     = 0x00008000
+_IN_ISDIR       = 0x40000000
+_WATCH_MASK = (_IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO
+               | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF)
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, name length
+
+class PluginWatcher:
+    """
+    Background thread turning file changes in the plugin folder into PluginManager actions.
+    The cache holds, per plugin, (active, {relative .py path: (mtime_ns, inode, size)}),
+    so only plugins whose files really changed are touched.
+    """
+    def __init__(self, plugin_manager, interval: float = 1.0, debounce: float = 0.3, use_inotify: bool = True):
+        """
+        :param interval: Seconds between scans when polling.
+        :param debounce: Quiet time in seconds after the last change before acting.
+        :param use_inotify: Try inotify first (Linux), polling otherwise.
+        """
+        self.plugin_manager = plugin_manager
+        self.plugin_directory = Path(plugin_manager.plugin_directory)
+        self.interval = interval
+        self.debounce = debounce
+        self.use_inotify = use_inotify
+        self.backend = None
+        self._cache = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self._inotify_fd = None
+        self._watches = {}  # inotify wd -> plugin name (None for the plugin folder itself)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._cache = {name: self._snapshot(name) for name in self._plugin_folders()}
+        self.backend = "inotify" if self.use_inotify and self._init_inotify() else "polling"
+        self._thread = threading.Thread(target=self._watch_loop, name="Thread-plugin_watcher", daemon=True)
+        self._thread.start()
+        logger.info(f"[{plugin_name}] Watching '{self.plugin_directory}' for plugin changes ({self.backend}).")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(2)
+            self._thread = None
+        if self._inotify_fd is not None:
+            os.close(self._inotify_fd)
+            self._inotify_fd = None
+            self._watches.clear()
+
+#####################################################
+#                  Watch loop
+#####################################################
+    def _watch_loop(self):
+        while not self._stop.is_set():
+            try:
+                changed = self._wait_inotify() if self.backend == "inotify" else self._wait_polling()
+                if changed:
+                    self._apply(changed)
+            except Exception as e:
+                logger.error(f"[{plugin_name}] Error while watching plugins: {e}", exc_info=True)
+                self._stop.wait(self.interval)
+
+    def _wait_polling(self):
+        """Rescan the stat cache, then wait for the burst of changes to settle."""
+        if self._stop.wait(self.interval):
+            return {}
+        changed = {name for name in set(self._plugin_folders()) | set(self._cache)
+                   if self._snapshot(name) != self._cache.get(name)}
+        if not changed:
+            return {}
+        detected = time.monotonic()
+        previous = {name: self._snapshot(name) for name in changed}
+        while not self._stop.wait(self.debounce):  # settled once a rescan finds nothing new
+            changed |= {name for name in self._plugin_folders()
+                        if name not in changed and self._snapshot(name) != self._cache.get(name)}
+            current = {name: self._snapshot(name) for name in changed}
+            if current == previous:
+                break
+            previous = current
+        return {name: detected for name in changed}
+
+    def _wait_inotify(self):
+        """Block on the inotify fd, then keep reading until the folder has been quiet for `debounce`."""
+        changed = {}
+        timeout = 0.5  # wake up regularly to notice stop()
+        while not self._stop.is_set():
+            readable, _, _ = select.select([self._inotify_fd], [], [], timeout)
+            if not readable:
+                if changed:
+                    return changed
+                continue
+            now = time.monotonic()
+            for name in self._read_inotify():
+                changed[name] = now  # last event, the write it reports is the one the latency is measured on
+            if changed:
+                timeout = self.debounce
+        return {}
+
+#####################################################
+#                  Actions
+#####################################################
+    def _apply(self, changed: dict):
+        """Reload, load or unload the plugins whose cached state differs from the disk."""
+        manager = self.plugin_manager
+        for name, detected in sorted(changed.items()):
+            old = self._cache.get(name)
+            new = self._snapshot(name)
+            if new == old:
+                continue
+            self._cache[name] = new
+            if new is None:
+                self._cache.pop(name, None)
+            latency = _write_to_detect(old, new, detected)
+            start = time.perf_counter()
+
+            if new is None or not new[0]:
+                if name in manager.lazy_plugins:
+                    manager.unregister_lazy_plugin(name)
+                    action = "unregistered"
+                elif name in manager.loaded_plugins:
+                    manager.unload_plugin(name)
+                    action = "unloaded"
+                else:
+                    continue
+            elif name in manager.lazy_plugins:
+                manager.unregister_lazy_plugin(name)  # its manifest may have changed
+                manager._boot_plugins([name])
+                action = "re-registered"
+            elif name in manager.loaded_plugins:
+                manager.reload_plugin(name)
+                action = "reloaded"
+            else:
+                manager._boot_plugins([name])
+                action = "loaded"
+
+            waited = time.monotonic() - detected
+            latency_text = f"{latency:.3f}s after the write" if latency is not None else "on removal"
+            logger.info(f"[{plugin_name}] Plugin '{name}' changed: detected {latency_text}, debounced {waited:.3f}s, "
+                        f"{action} in {time.perf_counter() - start:.3f}s.")
+
+    def _plugin_folders(self):
+        try:
+            return [entry.name for entry in os.scandir(self.plugin_directory)
+                    if entry.is_dir() and not entry.name.startswith(("__", "."))]
+        except OSError:
+            return []
+
+    def _snapshot(self, name: str):
+        """(active, {relative .py path: (mtime_ns, inode, size)}) of one plugin folder, None if it is gone."""
+        folder = self.plugin_directory / name
+        files = {}
+        pending = [folder]
+        while pending:
+            directory = pending.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                if directory == folder:
+                    return None
+                continue
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name != "__pycache__":
+                        pending.append(entry.path)
+                elif entry.name.endswith(".py"):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    files[os.path.relpath(entry.path, folder)] = (stat.st_mtime_ns, stat.st_ino, stat.st_size)
+        return "__init__.py" in files, files
+
+#####################################################
+#                  Additional Functions
+#####################################################
+    def _init_inotify(self) -> bool:
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            self._add_watch_fn = libc.inotify_add_watch
+        except (OSError, AttributeError, TypeError):
+            logger.debug(f"[{plugin_name}] inotify is not available, polling every {self.interval}s.")
+            return False
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            logger.warning(f"[{plugin_name}] inotify_init1 failed ({os.strerror(ctypes.get_errno())}), polling instead.")
+            return False
+        self._inotify_fd = fd
+        self._add_watch(self.plugin_directory, None)
+        for name in self._plugin_folders():
+            self._watch_plugin(name)
+        return True
+
+    def _watch_plugin(self, name: str):
+        for directory, subdirectories, _ in os.walk(self.plugin_directory / name):
+            subdirectories[:] = [d for d in subdirectories if d != "__pycache__"]
+            self._add_watch(Path(directory), name)
+
+    def _add_watch(self, path: Path, name):
+        wd = self._add_watch_fn(self._inotify_fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            logger.warning(f"[{plugin_name}] Could not watch '{path}': {os.strerror(ctypes.get_errno())}")
+        else:
+            self._watches[wd] = name
+
+    def _read_inotify(self):
+        """Plugin names touched by the pending inotify events."""
+        try:
+            buffer = os.read(self._inotify_fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        names = set()
+        offset = 0
+        while offset + _EVENT.size <= len(buffer):
+            wd, mask, _, length = _EVENT.unpack_from(buffer, offset)
+            entry = buffer[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0").decode(errors="replace")
+            offset += _EVENT.size + length
+            if mask & _IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            if wd not in self._watches:
+                continue
+            name = self._watches[wd]
+            if name is None:  # something in the plugin folder itself
+                if not entry or entry.startswith(("__", ".")):
+                    continue
+                name = entry
+                if mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+                    self._watch_plugin(name)
+            elif mask & _IN_ISDIR:
+                if mask & (_IN_CREATE | _IN_MOVED_TO) and entry != "__pycache__":
+                    self._watch_plugin(name)  # new subpackage, watch it too
+                    names.add(name)
+                continue
+            elif not entry.endswith(".py") and not mask & _IN_DELETE_SELF:
+                continue
+            names.add(name)
+        return names
+
+def _write_to_detect(old, new, detected: float):
+    """Seconds between the newest changed file's mtime and its detection (monotonic), None when nothing was written."""
+    if new is None:
+        return None
+    old_files = old[1] if old is not None else {}
+    mtimes = [stat[0] for path, stat in new[1].items() if old_files.get(path) != stat]
+    if not mtimes:
+        return None
+    detected_wall = time.time() - (time.monotonic() - detected)
+    return max(0.0, detected_wall - max(mtimes) / 1e9)
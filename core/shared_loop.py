@@ -0,0 +1,176 @@
+"""
+File Location: core/shared_loop.py
+Author: Lizza Celestia
+Version: ALizz_AI_V1_0
+Create Date: 2026-10-18
+Modified Date: 2026-10-18
+Description:
+    Runs lightweight plugins as tasks on a few shared event loops instead of one thread and one loop each.
+    A plugin opts in with a module option (read without importing it, see core/plugin_manifest.py):
+        lightweight = True
+    Its run() becomes a task of a shared loop and plugin.loop is that loop, so its async handlers, stop_event
+    and call_soon_threadsafe keep working. Every plugin gets a task group (PluginTasks): run(), the tasks it
+    starts and the tasks of its async handlers. Unload and reload cancel that group only.
+    The plugin's own init_event_loop() is not called, cleanup belongs in run().
+    Plugins with blocking code (time.sleep, blocking I/O, heavy CPU) keep their dedicated thread:
+    on a shared loop they would stall every plugin of that loop.
+"""
+from concurrent.futures import Future
+from typing import Dict
+import asyncio
+import contextvars
+import threading
+import time
+from core.event import task_source, share_thread_source
+import logging
+logger = logging.getLogger(__name__)
+plugin_name = "Shared_loop"
+
+_task_group = contextvars.ContextVar("task_group", default=None)
+
+class PluginTasks:
+    """
+    The task group of one plugin on a shared loop.
+    Stands in for the plugin's thread in PluginManager.module_threads (name, ident, is_alive()).
+    """
+    def __init__(self, plugin_name: str, shared_loop):
+        self.plugin_name = plugin_name
+        self.shared_loop = shared_loop
+        self.loop = shared_loop.loop
+        self.name = shared_loop.name
+        self.tasks = set()              # pending tasks of the plugin, only touched on the loop
+        self.stopped = Future()         # resolved (with the time) once run() has returned
+        self.context = contextvars.copy_context()
+        self.context.run(_task_group.set, self)
+        self.context.run(task_source.set, plugin_name)  # its events keep the plugin as source
+
+    @property
+    def ident(self):
+        return self.shared_loop.thread.ident
+
+    def is_alive(self) -> bool:
+        return not self.stopped.done()
+
+    def run_coroutine(self, coro) -> Future:
+        """asyncio.run_coroutine_threadsafe() as a task of this group (from any thread)."""
+        return self.context.copy().run(asyncio.run_coroutine_threadsafe, coro, self.loop)
+
+    def create_task(self, coro) -> asyncio.Task:
+        """loop.create_task() as a task of this group (on the loop)."""
+        return self.context.copy().run(self.loop.create_task, coro)
+
+    def cancel(self):
+        """Cancel every task of the plugin (thread-safe)."""
+        try:
+            self.loop.call_soon_threadsafe(self._cancel)
+        except RuntimeError:  # loop closed
+            pass
+
+    def _cancel(self, keep=None):
+        for task in list(self.tasks):
+            if task is not keep:
+                task.cancel()
+
+    def _track(self, task):
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+class SharedLoop:
+    """One event loop on one thread, running the task groups of several plugins."""
+    def __init__(self, index: int):
+        self.name = f"Thread-shared_loop_{index}"
+        self.groups: Dict[str, PluginTasks] = {}
+        self.loop = asyncio.new_event_loop()
+        self.loop.set_task_factory(_task_factory)
+        self.thread = threading.Thread(target=self._run_forever, name=self.name, daemon=True)
+        self.thread.start()
+
+    def start_plugin(self, plugin_name: str, plugin_instance) -> PluginTasks:
+        """Start plugin_instance.run() as the first task of a new group."""
+        group = PluginTasks(plugin_name, self)
+        self.groups[plugin_name] = group
+        plugin_instance.loop = self.loop
+        plugin_instance.task_group = group  # the event bus runs its async handlers in the group
+        group.context.copy().run(self.loop.call_soon_threadsafe, self._start, group, plugin_instance)
+        return group
+
+    def stop(self, timeout: float = 5):
+        try:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        except RuntimeError:  # already closed
+            return
+        self.thread.join(timeout)
+
+#####################################################
+#                  Additional Functions
+#####################################################
+    def _start(self, group: PluginTasks, plugin_instance):
+        self.loop.create_task(self._run_plugin(group, plugin_instance))  # inherits the group's context
+
+    async def _run_plugin(self, group: PluginTasks, plugin_instance):
+        """The plugin's main task: run(), then cancel what it left behind and acknowledge the stop."""
+        try:
+            await plugin_instance.run()
+        except asyncio.CancelledError:
+            logger.debug(f"[{plugin_name}] Plugin '{group.plugin_name}' tasks were cancelled on stop.")
+        except Exception as e:
+            logger.error(f"[{plugin_name}] Plugin '{group.plugin_name}' crashed: {e}", exc_info=True)
+        finally:
+            plugin_instance.status = False
+            group._cancel(keep=asyncio.current_task())
+            if self.groups.get(group.plugin_name) is group:
+                del self.groups[group.plugin_name]
+            group.stopped.set_result(time.monotonic())
+
+    def _run_forever(self):
+        asyncio.set_event_loop(self.loop)
+        share_thread_source()
+        try:
+            self.loop.run_forever()
+            pending = asyncio.all_tasks(self.loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        finally:
+            self.loop.close()
+
+class SharedLoopExecutor:
+    """
+    Up to `loops` shared loops, started on first use. A new plugin goes to an idle loop while the
+    limit allows one more, else to the loop running the fewest plugins.
+    """
+    def __init__(self, loops: int = 1):
+        self.max_loops = max(1, loops)
+        self.loops = []
+        self._lock = threading.Lock()
+
+    def start_plugin(self, name: str, plugin_instance) -> PluginTasks:
+        with self._lock:
+            if len(self.loops) < self.max_loops and all(shared_loop.groups for shared_loop in self.loops):
+                self.loops.append(SharedLoop(len(self.loops)))
+            shared_loop = min(self.loops, key=lambda candidate: len(candidate.groups))
+            group = shared_loop.start_plugin(name, plugin_instance)
+        logger.info(f"[{plugin_name}] Plugin '{name}' runs on '{shared_loop.name}'.")
+        return group
+
+    def mapping(self) -> dict:
+        """{loop thread name: {plugin: pending tasks}}"""
+        return {shared_loop.name: {name: len(group.tasks) for name, group in list(shared_loop.groups.items())}
+                for shared_loop in list(self.loops)}
+
+    def shutdown(self, timeout: float = 5):
+        """Stop the loops, the tasks still on them are cancelled."""
+        with self._lock:
+            loops, self.loops = self.loops, []
+        for shared_loop in loops:
+            shared_loop.stop(timeout)
+
+def _task_factory(loop, coro, **kwargs):
+    """Task factory of the shared loops: tasks join the group of the context they are created in."""
+    task = asyncio.Task(coro, loop=loop, **kwargs)
+    context = kwargs.get("context")
+    group = context.get(_task_group) if context is not None else _task_group.get()
+    if group is not None:
+        group._track(task)
+    return task
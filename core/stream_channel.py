@@ -0,0 +1,185 @@
+"""
+File Location: core/stream_channel.py
+Author: Lizza Celestia
+Version: ALizz_AI_V1_0
+Create Date: 2026-10-18
+Modified Date: 2026-10-18
+Description:
+    Shared memory ring buffer for raw audio (or any byte stream) between plugins.
+    The producer writes frames into a preallocated multiprocessing.shared_memory block
+    and only publishes a small descriptor on the event bus:
+        {"channel": name, "offset": absolute stream offset, "length": bytes, "seq": frame number}
+    Consumers read the frame as a memoryview (or NumPy array) straight out of the block, no copies.
+    The block can be attached by name from another process, one writer per channel.
+"""
+from multiprocessing import shared_memory
+import struct
+import threading
+import logging
+logger = logging.getLogger(__name__)
+plugin_name = "Stream_channel"
+
+try:
+    import numpy as np
+except ImportError:  # NumPy views are optional, memoryviews always work
+    np = None
+
+# Header at the start of the block: reserved head, committed head, last seq, capacity (all uint64)
+_HEADER = struct.Struct("<QQQQ")
+_HEADER_SIZE = 64  # keep the data region cache line aligned
+
+class StreamChannel:
+    """
+    Ring buffer of frames in shared memory.
+    Offsets are absolute byte positions in the stream (position in the ring = offset % capacity),
+    so a reader can tell whether the writer has lapped a frame: it is overwritten once the
+    writer's reserved head is more than `capacity` bytes past the frame's offset.
+    The writer moves the reserved head before copying, so checking a frame after reading it
+    (is_valid) tells whether the data seen was intact.
+    """
+    def __init__(self, name: str = None, capacity: int = 1 << 20, create: bool = True, event_bus=None, topic: str = None):
+        """
+        :param name: Shared memory name, random if None (only when creating).
+        :param capacity: Size of the data region in bytes, the largest frame that fits.
+        :param create: Create the block (writer side) or attach to an existing one.
+        :param event_bus: Optional bus used by publish() to send descriptors.
+        :param topic: Event type of the descriptors, default "STREAM_<name>".
+        """
+        if create:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=_HEADER_SIZE + capacity)
+            _HEADER.pack_into(self._shm.buf, 0, 0, 0, 0, capacity)
+        else:
+            self._shm = _attach(name)
+            capacity = _HEADER.unpack_from(self._shm.buf, 0)[3]
+        self.name = self._shm.name
+        self.capacity = capacity
+        self.owner = create
+        self.event_bus = event_bus
+        self.topic = topic or f"STREAM_{self.name}"
+        self._data = self._shm.buf[_HEADER_SIZE:_HEADER_SIZE + capacity]
+        self._write_lock = threading.Lock()
+        # reader side statistics
+        self.overruns = 0   # frames overwritten before (or while) they were read
+        self.gaps = 0       # descriptors never seen (sequence number jumped)
+        self._last_read_seq = None
+
+    @classmethod
+    def attach(cls, name: str, event_bus=None, topic: str = None):
+        """Open an existing channel by name, e.g. in a consumer process."""
+        return cls(name=name, create=False, event_bus=event_bus, topic=topic)
+
+#####################################################
+#                  Writer side
+#####################################################
+    def write(self, frame) -> dict:
+        """
+        Copy one frame (bytes-like) into the ring.
+        :return: The frame descriptor {"channel", "offset", "length", "seq"}.
+        """
+        view = memoryview(frame).cast("B")
+        length = view.nbytes
+        if length > self.capacity:
+            raise ValueError(f"Frame of {length} bytes does not fit channel '{self.name}' ({self.capacity} bytes)")
+        with self._write_lock:
+            reserved, _, seq, _ = _HEADER.unpack_from(self._shm.buf, 0)
+            offset = reserved
+            start = offset % self.capacity
+            if start + length > self.capacity:  # frames never wrap, skip the tail of the ring
+                offset += self.capacity - start
+                start = 0
+            seq += 1
+            self._set_head(0, offset + length)          # readers of what gets overwritten now see an overrun
+            self._data[start:start + length] = view
+            _HEADER.pack_into(self._shm.buf, 0, offset + length, offset + length, seq, self.capacity)
+        return {"channel": self.name, "offset": offset, "length": length, "seq": seq}
+
+    def publish(self, frame) -> dict:
+        """Write a frame and publish its descriptor on the event bus, returns the descriptor."""
+        descriptor = self.write(frame)
+        if self.event_bus is not None:
+            self.event_bus.publish(self.topic, descriptor)
+        return descriptor
+
+#####################################################
+#                  Reader side
+#####################################################
+    def read(self, descriptor: dict):
+        """
+        Return a zero-copy memoryview of a frame, or None (counted in overruns) if it was overwritten.
+        The writer may lap the frame while it is being used: call is_valid() afterwards when that matters.
+        """
+        seq = descriptor["seq"]
+        if self._last_read_seq is not None and seq > self._last_read_seq + 1:
+            self.gaps += seq - self._last_read_seq - 1
+        self._last_read_seq = seq if self._last_read_seq is None else max(seq, self._last_read_seq)
+
+        if not self.is_valid(descriptor):
+            self.overruns += 1
+            logger.debug(f"[{plugin_name}] Overrun on '{self.name}': frame {seq} was overwritten")
+            return None
+        start = descriptor["offset"] % self.capacity
+        return self._data[start:start + descriptor["length"]]
+
+    def read_array(self, descriptor: dict, dtype="int16"):
+        """Return a zero-copy NumPy array of a frame (requires numpy), or None after an overrun."""
+        if np is None:
+            raise RuntimeError("read_array() needs numpy, use read() for a memoryview")
+        view = self.read(descriptor)
+        if view is None:
+            return None
+        return np.frombuffer(view, dtype=dtype)
+
+    def read_copy(self, descriptor: dict):
+        """Return the frame as bytes, or None if it was overwritten before or during the copy."""
+        view = self.read(descriptor)
+        if view is None:
+            return None
+        data = bytes(view)
+        view.release()
+        if not self.is_valid(descriptor):
+            self.overruns += 1
+            return None
+        return data
+
+    def is_valid(self, descriptor: dict) -> bool:
+        """True while the frame has not been (partly) overwritten by the writer."""
+        reserved = _HEADER.unpack_from(self._shm.buf, 0)[0]
+        return reserved - descriptor["offset"] <= self.capacity
+
+    def stats(self) -> dict:
+        """Channel counters: head position, last sequence number, overruns and gaps seen by this reader."""
+        reserved, committed, seq, _ = _HEADER.unpack_from(self._shm.buf, 0)
+        return {"channel": self.name, "capacity": self.capacity, "head": committed, "seq": seq,
+                "overruns": self.overruns, "gaps": self.gaps}
+
+#####################################################
+#                  Additional Functions
+#####################################################
+    def _set_head(self, index: int, value: int):
+        struct.pack_into("<Q", self._shm.buf, index * 8, value)
+
+    def close(self):
+        """Release the mapping, the creator also removes the shared memory block."""
+        try:
+            try:
+                self._data.release()  # BufferError while a reader still holds a view of it
+                self._shm.close()
+            except BufferError as e:
+                logger.warning(f"[{plugin_name}] Channel '{self.name}' still in use, its mapping stays open: {e}")
+        finally:
+            if self.owner:  # the block goes away once every mapping is closed
+                try:
+                    self._shm.unlink()
+                except FileNotFoundError:
+                    pass
+
+def _attach(name: str):
+    """
+    Open an existing block without letting this process unlink it on exit, only the creator does.
+    Python 3.13+ has track=False, before that processes started by the core share its resource
+    tracker, so the block is only cleaned up once with the core.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, create=False, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name, create=False)
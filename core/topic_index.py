@@ -0,0 +1,76 @@
+"""
+File Location: core/topic_index.py
+Author: Lizza Celestia
+Version: ALizz_AI_V1_0
+Create Date: 2026-10-18
+Modified Date: 2026-10-18
+Description:
+    Index of wildcard subscriptions ("PLUGIN_STATUS_*", "STOP_?TS", "*_[AB]").
+    Prefix patterns (a single trailing *) live in a character trie, so matching a topic
+    costs one walk over its characters however many patterns there are.
+    Other glob patterns are compiled once with fnmatch rules.
+"""
+import fnmatch
+import re
+
+_WILDCARDS = ("*", "?", "[")
+_END = ""  # trie key holding the patterns ending at a node (never a topic character)
+
+def is_pattern(event_type: str) -> bool:
+    """True if the event type contains glob wildcards."""
+    return any(wildcard in event_type for wildcard in _WILDCARDS)
+
+class TopicIndex:
+    def __init__(self):
+        self._trie = {}
+        self._globs = {}    # pattern -> compiled regex
+
+    def add(self, pattern: str):
+        prefix = pattern[:-1]
+        if pattern.endswith("*") and not is_pattern(prefix):
+            node = self._trie
+            for char in prefix:
+                node = node.setdefault(char, {})
+            node.setdefault(_END, set()).add(pattern)
+        else:
+            self._globs[pattern] = re.compile(fnmatch.translate(pattern))
+
+    def remove(self, pattern: str):
+        prefix = pattern[:-1]
+        if pattern.endswith("*") and not is_pattern(prefix):
+            path = [self._trie]
+            for char in prefix:
+                node = path[-1].get(char)
+                if node is None:
+                    return
+                path.append(node)
+            path[-1].get(_END, set()).discard(pattern)
+            if not path[-1].get(_END, True):
+                del path[-1][_END]
+            # prune the branch that no pattern uses anymore
+            for char, (parent, node) in zip(reversed(prefix), zip(reversed(path[:-1]), reversed(path[1:]))):
+                if node:
+                    break
+                del parent[char]
+        else:
+            self._globs.pop(pattern, None)
+
+    def match(self, topic: str):
+        """Return the patterns matching a topic."""
+        matches = []
+        node = self._trie
+        if _END in node:
+            matches.extend(node[_END])
+        for char in topic:
+            node = node.get(char)
+            if node is None:
+                break
+            if _END in node:
+                matches.extend(node[_END])
+        for pattern, regex in self._globs.items():
+            if regex.match(topic):
+                matches.append(pattern)
+        return matches
+
+    def __bool__(self):
+        return bool(self._trie) or bool(self._globs)
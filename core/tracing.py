@@ -0,0 +1,187 @@
+"""
+File Location: core/tracing.py
+Author: Lizza Celestia
+Version: ALizz_AI_V1_0
+Create Date: 2026-10-18
+Modified Date: 2026-10-18
+Description:
+    End-to-end event tracing, switched on and off at runtime with bus.enable_tracing() / bus.disable_tracing().
+    Every published event gets a span. A publish made while a handler runs (sync or async) joins the
+    trace of the event being handled, so a chain such as STT transcript -> RUN_LLM -> TTS is one trace.
+    The current span is carried in a contextvar, set around sync handlers and inside the task of async ones.
+    Each span records: publish -> enqueue -> dispatch start -> dispatch end (all its handlers finished).
+    Tracer.export_chrome() writes the spans as Chrome trace JSON (chrome://tracing, ui.perfetto.dev),
+    Tracer.stage_percentiles() gives the latency of each stage.
+"""
+from collections import deque
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+import logging
+logger = logging.getLogger(__name__)
+plugin_name = "Event_bus"
+
+_current_span = contextvars.ContextVar("alizz_current_span", default=None)
+
+STAGES = ("publish", "queued", "handling", "total")     # publish->enqueue, enqueue->start, start->end, publish->end
+
+def current_span():
+    """The span of the event being handled in this thread / task, None outside handlers."""
+    return _current_span.get()
+
+class Span:
+    __slots__ = ("tracer", "trace_id", "span_id", "parent_id", "event_type", "publisher", "dispatcher",
+                 "publish", "enqueue", "dispatch_start", "dispatch_end", "_pending")
+
+    def __init__(self, tracer, event_type: str, parent):
+        self.tracer = tracer
+        self.span_id = next(tracer._ids)
+        self.trace_id = parent.trace_id if parent is not None else self.span_id
+        self.parent_id = parent.span_id if parent is not None else None
+        self.event_type = event_type
+        self.publisher = threading.current_thread().name
+        self.dispatcher = None
+        self.publish = time.perf_counter()
+        self.enqueue = None
+        self.dispatch_start = None
+        self.dispatch_end = None
+        self._pending = 0
+
+    def enqueued(self):
+        if self.dispatch_start is None:  # a worker may already have picked it up
+            self.enqueue = time.perf_counter()
+
+    def dispatching(self):
+        self.dispatch_start = time.perf_counter()
+        if self.enqueue is None:  # handed straight to the handlers
+            self.enqueue = self.dispatch_start
+        self.dispatcher = threading.current_thread().name
+
+    def handled(self, futures):
+        """Close the span once every handler future is done."""
+        if not futures:
+            self._finish()
+            return
+        with self.tracer._lock:
+            self._pending += len(futures)
+        for future in futures:
+            future.add_done_callback(self._handler_done)
+
+    def call(self, callback, args):
+        """Run a sync handler with this span as the current one."""
+        token = _current_span.set(self)
+        try:
+            return callback(*args)
+        finally:
+            _current_span.reset(token)
+
+    async def run(self, coro):
+        """Run an async handler's coroutine with this span as the current one (the task has its own context)."""
+        _current_span.set(self)
+        return await coro
+
+    def _handler_done(self, _future):
+        with self.tracer._lock:
+            self._pending -= 1
+            if self._pending:
+                return
+        self._finish()
+
+    def _finish(self):
+        self.dispatch_end = time.perf_counter()
+        self.tracer.spans.append(self)
+
+    def stages(self) -> dict:
+        return {"publish": self.enqueue - self.publish, "queued": max(0.0, self.dispatch_start - self.enqueue),
+                "handling": self.dispatch_end - self.dispatch_start, "total": self.dispatch_end - self.publish}
+
+class Tracer:
+    """Creates the spans of one EventBus and keeps the finished ones (the newest `capacity`)."""
+    def __init__(self, capacity: int = 100000):
+        self.spans = deque(maxlen=capacity)
+        self.origin = time.perf_counter()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def start(self, event_type: str) -> Span:
+        """Span of an event being published, child of the event being handled if any."""
+        return Span(self, event_type, _current_span.get())
+
+    def traces(self) -> dict:
+        """{trace_id: [spans in publish order]} of the finished spans."""
+        traces = {}
+        for span in sorted(list(self.spans), key=lambda span: span.publish):
+            traces.setdefault(span.trace_id, []).append(span)
+        return traces
+
+    def stage_percentiles(self, event_type: str = None, percentiles=(0.5, 0.9, 0.99)) -> dict:
+        """
+        Latency of each stage, in seconds.
+        :param event_type: Only spans of this event type, all of them when None.
+        :return: {stage: {"count": n, "p50": s, "p90": s, "p99": s, "max": s}}, with the stages of STAGES
+                 and "trace": first publish to last handler of traces started by event_type (or any event).
+        """
+        spans = [span for span in list(self.spans) if event_type is None or span.event_type == event_type]
+        values = {stage: [] for stage in STAGES}
+        for span in spans:
+            for stage, seconds in span.stages().items():
+                values[stage].append(seconds)
+        values["trace"] = [max(span.dispatch_end for span in chain) - chain[0].publish
+                           for chain in self.traces().values() if event_type is None or chain[0].event_type == event_type]
+        return {stage: _percentiles(sorted(seconds), percentiles) for stage, seconds in values.items()}
+
+    def chrome_trace(self) -> dict:
+        """
+        The finished spans in Chrome trace event format: one slice per span on the thread that handled it
+        ("queued" slices on a separate track), flow arrows from the publish to the dispatch.
+        """
+        pid = os.getpid()
+        threads = {"queue": 0}
+        events = []
+
+        def tid(name):
+            if name not in threads:
+                threads[name] = len(threads)
+            return threads[name]
+
+        for span in sorted(list(self.spans), key=lambda span: span.publish):
+            start, enqueue, end = _us(self, span.dispatch_start), _us(self, span.enqueue), _us(self, span.dispatch_end)
+            args = {"trace_id": span.trace_id, "span_id": span.span_id, "parent_id": span.parent_id,
+                    "publisher": span.publisher}
+            events.append({"name": span.event_type, "cat": "handling", "ph": "X", "ts": start, "dur": end - start,
+                           "pid": pid, "tid": tid(span.dispatcher), "args": args})
+            if start > enqueue:
+                events.append({"name": span.event_type, "cat": "queued", "ph": "X", "ts": enqueue,
+                               "dur": start - enqueue, "pid": pid, "tid": 0, "args": args})
+            events.append({"name": "publish", "cat": "flow", "ph": "s", "id": span.span_id,
+                           "ts": _us(self, span.publish), "pid": pid, "tid": tid(span.publisher)})
+            events.append({"name": "publish", "cat": "flow", "ph": "f", "bp": "e", "id": span.span_id,
+                           "ts": start, "pid": pid, "tid": tid(span.dispatcher)})
+        for name, thread_id in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id, "args": {"name": name}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome(self, path: str) -> int:
+        """Write chrome_trace() to a JSON file, return the number of spans written."""
+        count = len(self.spans)
+        with open(path, "w", encoding="utf-8") as trace_file:
+            json.dump(self.chrome_trace(), trace_file)
+        logger.info(f"[{plugin_name}] Wrote {count} spans to '{path}' (open it in chrome://tracing or ui.perfetto.dev).")
+        return count
+
+#####################################################
+#                  Additional Functions
+#####################################################
+def _us(tracer, timestamp: float) -> float:
+    return round((timestamp - tracer.origin) * 1e6, 1)
+
+def _percentiles(values, percentiles) -> dict:
+    summary = {"count": len(values)}
+    for fraction in percentiles:
+        key = f"p{fraction * 100:g}"
+        summary[key] = values[min(len(values) - 1, int(fraction * len(values)))] if values else 0.0
+    summary["max"] = values[-1] if values else 0.0
+    return summary
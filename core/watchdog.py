@@ -0,0 +1,242 @@
+"""
+File Location: core/watchdog.py
+Author: Lizza Celestia
+Version: ALizz_AI_V1_0
+Create Date: 2026-10-18
+Modified Date: 2026-10-18
+Description:
+    Watchdog thread for the event bus and the plugin threads.
+    Handlers get a soft and a hard time budget (defaults here, per handler with
+    subscribe(..., soft_timeout=, hard_timeout=)):
+        - over the soft budget: warning with the plugin, the event type and the running time
+        - over the hard budget: error with the stack of the stuck thread (sys._current_frames)
+          and, with isolate=True, the handler is isolated: async handlers are cancelled, a sync
+          handler blocking a dispatch worker gets its worker replaced by a fresh thread and its
+          next events run on a separate pool, so the rest of the bus keeps flowing
+    Plugin threads are pinged through their event loop: a loop that doesn't answer within
+    stall_timeout is reported the same way, with the stack of the plugin thread.
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import sys
+import threading
+import time
+import traceback
+import logging
+logger = logging.getLogger(__name__)
+plugin_name = "Watchdog"
+
+class HandlerCall:
+    """One running handler call, registered while it runs."""
+    __slots__ = ("event_type", "subscription", "thread_id", "task", "loop", "start", "level")
+
+    def __init__(self, event_type: str, subscription, task=None, loop=None):
+        self.event_type = event_type
+        self.subscription = subscription
+        self.thread_id = threading.get_ident()
+        self.task = task            # asyncio task of an async handler
+        self.loop = loop
+        self.start = time.monotonic()
+        self.level = 0              # 1 once reported over the soft budget, 2 over the hard one
+
+class Watchdog:
+    def __init__(self, event_bus, plugin_manager=None, soft_timeout: float = 1.0, hard_timeout: float = 10.0,
+                 stall_timeout: float = 10.0, interval: float = 0.25, isolate: bool = False, isolation_workers: int = 4):
+        """
+        :param soft_timeout: Seconds a handler may run before a warning (per handler: subscribe(soft_timeout=)).
+        :param hard_timeout: Seconds before it is reported as stuck, with its stack (subscribe(hard_timeout=)).
+        :param stall_timeout: Seconds a plugin's event loop may leave a ping unanswered.
+        :param interval: Seconds between checks.
+        :param isolate: Cancel / move aside handlers over their hard budget instead of only reporting them.
+        :param isolation_workers: Threads running the isolated sync handlers.
+        """
+        self.event_bus = event_bus
+        self.plugin_manager = plugin_manager
+        self.soft_timeout = soft_timeout
+        self.hard_timeout = hard_timeout
+        self.stall_timeout = stall_timeout
+        self.interval = interval
+        self.isolate = isolate
+        self.isolation_workers = isolation_workers
+        self.isolated = set()               # Subscriptions running on the isolation pool
+        self.reports = deque(maxlen=50)     # latest (time, kind, plugin, what, seconds)
+        self._calls = {}                    # HandlerCall -> None, while the handler runs
+        self._pings = {}                    # plugin name -> [sent, answered] monotonic times
+        self._stalled = set()
+        self._pool = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Attach to the event bus and start checking."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self.event_bus.watchdog = self
+        self._thread = threading.Thread(target=self._watch_loop, name="Thread-watchdog", daemon=True)
+        self._thread.start()
+        logger.info(f"[{plugin_name}] Watching handlers (soft {self.soft_timeout}s, hard {self.hard_timeout}s, "
+                    f"isolate: {self.isolate}) and plugin threads (stall {self.stall_timeout}s).")
+
+    def stop(self):
+        if self.event_bus.watchdog is self:
+            self.event_bus.watchdog = None
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(2)
+            self._thread = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+#####################################################
+#                  Hooks called by the bus
+#####################################################
+    def begin(self, event_type: str, subscription) -> HandlerCall:
+        """Register a sync handler call running in the current thread."""
+        call = HandlerCall(event_type, subscription)
+        self._calls[call] = None
+        return call
+
+    def end(self, call: HandlerCall):
+        self._calls.pop(call, None)
+        if call.level:
+            logger.info(f"[{plugin_name}] {_describe(call)} returned after {time.monotonic() - call.start:.3f}s.")
+
+    async def watch(self, coro, event_type: str, subscription):
+        """Wrap an async handler's coroutine so its running time is watched (and it can be cancelled)."""
+        call = HandlerCall(event_type, subscription, asyncio.current_task(), asyncio.get_running_loop())
+        self._calls[call] = None
+        try:
+            return await coro
+        finally:
+            self.end(call)
+
+    def run_isolated(self, event_type: str, subscription, args):
+        """Run an isolated sync handler on the isolation pool, off the dispatch workers."""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(self.isolation_workers, thread_name_prefix="Thread-watchdog_isolated")
+        return self._pool.submit(self._run_isolated, event_type, subscription, args)
+
+    def running(self):
+        """The handler calls running right now, longest first: [(seconds, description)]."""
+        now = time.monotonic()
+        calls = sorted(list(self._calls), key=lambda call: call.start)
+        return [(now - call.start, _describe(call)) for call in calls]
+
+#####################################################
+#                  Watch loop
+#####################################################
+    def _watch_loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self._check_handlers()
+                if self.plugin_manager is not None:
+                    self._check_plugins()
+            except Exception as e:
+                logger.error(f"[{plugin_name}] Watchdog check failed: {e}", exc_info=True)
+
+    def _check_handlers(self):
+        now = time.monotonic()
+        for call in list(self._calls):
+            elapsed = now - call.start
+            subscription = call.subscription
+            soft = subscription.soft_timeout if subscription.soft_timeout is not None else self.soft_timeout
+            hard = subscription.hard_timeout if subscription.hard_timeout is not None else self.hard_timeout
+            if call.level < 2 and hard and elapsed > hard:
+                call.level = 2
+                self._report("stuck", call, elapsed)
+                logger.error(f"[{plugin_name}] {_describe(call)} is stuck, running for {elapsed:.1f}s "
+                             f"(hard budget {hard}s).\n{self._stack(call)}")
+                if self.isolate:
+                    self._isolate(call)
+            elif call.level < 1 and soft and elapsed > soft:
+                call.level = 1
+                self._report("slow", call, elapsed)
+                logger.warning(f"[{plugin_name}] {_describe(call)} is slow, running for {elapsed:.1f}s "
+                               f"(soft budget {soft}s).")
+
+    def _check_plugins(self):
+        """Ping every plugin loop, report the ones whose previous ping is still unanswered after stall_timeout."""
+        now = time.monotonic()
+        manager = self.plugin_manager
+        for name in list(self._pings):
+            if name not in manager.loaded_plugins:
+                del self._pings[name]
+                self._stalled.discard(name)
+        for name, plugin in list(manager.loaded_plugins.items()):
+            loop = plugin.loop
+            if loop is None or loop.is_closed() or not loop.is_running():  # process plugins, loops starting/stopping
+                self._pings.pop(name, None)
+                continue
+            ping = self._pings.get(name)
+            if ping is None or ping[1] >= ping[0]:  # answered, send the next one
+                ping = self._pings[name] = [now, ping[1] if ping else 0.0]
+                try:
+                    loop.call_soon_threadsafe(_answer, ping)
+                except RuntimeError:  # closed meanwhile
+                    continue
+                if name in self._stalled:
+                    self._stalled.discard(name)
+                    logger.info(f"[{plugin_name}] Plugin '{name}' is making progress again.")
+            elif now - ping[0] > self.stall_timeout and name not in self._stalled:
+                self._stalled.add(name)
+                thread = manager.module_threads.get(name)
+                stack = _thread_stack(thread.ident) if thread is not None else "  (no thread)"
+                self.reports.append((time.time(), "stalled", name, "event loop", now - ping[0]))
+                logger.error(f"[{plugin_name}] Plugin '{name}' made no progress for {now - ping[0]:.1f}s, "
+                             f"its event loop is blocked.\n{stack}")
+
+#####################################################
+#                  Additional Functions
+#####################################################
+    def _isolate(self, call: HandlerCall):
+        if call.task is not None:
+            call.loop.call_soon_threadsafe(call.task.cancel)
+            logger.warning(f"[{plugin_name}] Cancelled {_describe(call)}.")
+            return
+        self.isolated.add(call.subscription)
+        replaced = self.event_bus.replace_worker(call.thread_id)
+        logger.warning(f"[{plugin_name}] Isolated {_describe(call)}: its next events run on the isolation pool"
+                       f"{', its dispatch worker was replaced' if replaced else ''}.")
+
+    def _run_isolated(self, event_type, subscription, args):
+        call = self.begin(event_type, subscription)
+        try:
+            return subscription.callback(*args)
+        finally:
+            self.end(call)
+
+    def _report(self, kind: str, call: HandlerCall, elapsed: float):
+        self.reports.append((time.time(), kind, _plugin_of(call.subscription), call.event_type, elapsed))
+
+    @staticmethod
+    def _stack(call: HandlerCall) -> str:
+        """Stack of a stuck call: the coroutine's await chain for async handlers, plus the thread's stack."""
+        text = ""
+        if call.task is not None:
+            frames = call.task.get_stack()
+            if frames:
+                text = "  Coroutine stack:\n" + "".join(traceback.format_list(
+                    traceback.StackSummary.extract((frame, frame.f_lineno) for frame in frames)))
+        return text + _thread_stack(call.thread_id)
+
+def _answer(ping):
+    ping[1] = time.monotonic()
+
+def _thread_stack(thread_id) -> str:
+    frame = sys._current_frames().get(thread_id)
+    if frame is None:
+        return "  (thread has exited)"
+    return "  Thread stack (most recent call last):\n" + "".join(traceback.format_stack(frame))
+
+def _plugin_of(subscription) -> str:
+    """Plugin folder name of a handler ('<package>.<name>.<name>_plugin'), its module otherwise."""
+    owner = subscription.owner
+    module = type(owner).__module__ if owner is not None else getattr(subscription.callback, "__module__", "") or ""
+    parts = module.split(".")
+    return parts[-2] if len(parts) >= 3 and parts[-1] == f"{parts[-2]}_plugin" else module
+
+def _describe(call: HandlerCall) -> str:
+    return f"Handler '{call.subscription.name}' of '{_plugin_of(call.subscription)}' on '{call.event_type}'"
@@ -3,7 +3,7 @@ File Location: main.py
 Author: Lizza Celestia
 Version: ALizz_AI_V1_0
 Created Date: 2025-02-12
-Modified Date: 2025-03-02
+Modified Date: 2026-10-18
 Description:
 
 """
@@ -11,14 +11,14 @@ Description:
 import time
 import asyncio
 from core.core import Core
-from core.logging_setup import setup_logging
+from core.logging_setup import setup_logging, logging_stats
 import logging
 import sys
 import os
 
 async def main():
-    # Set up logging at DEBUG/INFO/WARNING level, optionally specifying a file
-    setup_logging(log_level=logging.DEBUG)
+    # Set up logging at DEBUG/INFO/WARNING level, DEBUG for single plugins with plugin_levels={"sample": logging.DEBUG}
+    setup_logging(log_level=logging.INFO)
     logger = logging.getLogger(__name__)
     logger.info("ALizz Booting up...")
 
@@ -31,7 +31,7 @@ async def main():
 
     logger.debug(f"priority CTRL plugins found: {priority_plugins}")
 
-    core = Core(plugin_directory=plugins_dir, priority_plugins=priority_plugins)
+    core = Core(plugin_directory=plugins_dir, priority_plugins=priority_plugins, watch_plugins=True, watchdog=True)
     # Start the system
     core.boot()
     # logger.debug(f"Loaded Plugin successfully: {core.plugin_manager.loaded_plugins}")
@@ -48,6 +48,14 @@ async def main():
         cms_list = {"exit"      : "shut down core script", 
                     "restart"   : "Relaunch the core script, shuting down and rebooting",
                     "threads"   : "Show active threads",
+                    "logs"      : "Show log volume and dropped log records",
+                    "stats"     : "Show event bus metrics (rates, queue times, slowest handlers)",
+                    "metrics"   : "Turn event bus metrics on/off",
+                    "watchdog"  : "Show running handlers and the latest slow/stuck reports",
+                    "trace"     : "Start tracing events / stop and export the trace (chrome://tracing)",
+                    "journal"   : "Show the event journal (recorded events, current segment)",
+                    "bridge"    : "Show the links to other nodes (bus bridge)",
+                    "pools"     : "Show the io/cpu offload pools (queue length, utilization)",
                     "="        : "========= Pliugins Management =========",
                     "active"    : "show loaded plugins",
                     "stop"      : "Stop an active plugin",
@@ -79,18 +87,119 @@ async def main():
             elif cmd == "active":
                 print(f"Active plugins:")
                 for plugin_name in core.plugin_manager.loaded_plugins:
-                    print(f"> {plugin_name}")
+                    status = core.event_bus.last_value(f"PLUGIN_STATUS_{plugin_name.upper()}", "unknown")
+                    print(f"> {plugin_name} (status: {status})")
+                for plugin_name, lazy_plugin in core.plugin_manager.lazy_plugins.items():
+                    if not lazy_plugin.active:
+                        print(f"> {plugin_name} (lazy, loads on: {', '.join(lazy_plugin.event_types)})")
 
             elif cmd == "status":
-                logger.info(f"'Manually publishing STATUS_CHECK event.'")
-                core.event_bus.publish("STATUS_CHECK",{"bool": True})
+                logger.info(f"'Manually requesting STATUS_CHECK from all plugins.'")
+                replies = core.event_bus.gather("STATUS_CHECK", {"bool": True}, timeout=1).result()
+                print(f"Plugins status:")
+                for plugin_name, plugin in core.plugin_manager.loaded_plugins.items():
+                    status = replies.get(plugin)
+                    if status is None:  # no reply in time, fall back to its last published status
+                        status = core.event_bus.last_value(f"PLUGIN_STATUS_{plugin_name.upper()}", "no reply")
+                    print(f"> {plugin_name}: {status}")
 
             elif cmd == "threads":
                 logger.info(f"'Manually checking active threads'")
-                for threads in core.plugin_manager.module_threads:
-                    print(f"> {threads}")
+                for threads, module_thread in list(core.plugin_manager.module_threads.items()):
+                    print(f"> {threads}: {module_thread.name}")
+                for loop_name, plugins in core.plugin_manager.shared_loops.mapping().items():
+                    tasks = ", ".join(f"{name} ({count} tasks)" for name, count in plugins.items())
+                    print(f"Shared loop {loop_name}: {tasks or 'no plugins'}")
+                print(f"Event bus queue depth per worker: {core.event_bus.queue_depths()}")
                 core.plugin_manager.print_active_threads()
 
+            elif cmd == "logs":
+                stats = logging_stats()
+                print(f"Log records: {stats.get('records')} (dropped: {stats.get('dropped')}, waiting: {stats.get('queued')})")
+                print(f"> per level: {stats.get('by_level')}")
+                for source, count in stats.get("by_source", {}).items():
+                    print(f"> {source}: {count}")
+
+            elif cmd == "stats":
+                stats = core.event_bus.stats()
+                if stats is None:
+                    print("Event bus metrics are off, turn them on with 'metrics'.")
+                    continue
+                print(f"Event bus, {stats['uptime']:.0f}s of metrics, queue depth {stats['queue_depth']} "
+                      f"(peak {stats['peak_queue_depth']})")
+                for event_type, topic in stats["topics"].items():
+                    queued = topic["queued"] or {}
+                    print(f"> {event_type}: published {topic['published']} ({topic['rate']:.1f}/s), "
+                          f"delivered {topic['delivered']}, queued p50 {queued.get('p50', 0) * 1000:.1f}ms "
+                          f"p99 {queued.get('p99', 0) * 1000:.1f}ms, dropped {stats['dropped'].get(event_type, {})}")
+                slowest = sorted(stats["handlers"].items(), key=lambda item: item[1]["p99"], reverse=True)[:10]
+                for handler, timing in slowest:
+                    print(f"> {handler}: {timing['count']} calls, avg {timing['avg'] * 1000:.2f}ms, "
+                          f"p99 {timing['p99'] * 1000:.1f}ms, max {timing['max'] * 1000:.1f}ms")
+
+            elif cmd == "metrics":
+                if core.event_bus.metrics is None:
+                    core.event_bus.enable_metrics()
+                    print("Event bus metrics on.")
+                else:
+                    core.event_bus.disable_metrics()
+                    print("Event bus metrics off.")
+
+            elif cmd == "watchdog":
+                if core.watchdog is None:
+                    print("The watchdog is off, start the core with Core(watchdog=True).")
+                    continue
+                print("Running handlers:")
+                for seconds, handler in core.watchdog.running():
+                    print(f"> {seconds:7.3f}s {handler}")
+                print("Latest reports:")
+                for when, kind, plugin, event_type, seconds in core.watchdog.reports:
+                    print(f"> {time.strftime('%H:%M:%S', time.localtime(when))} {kind:<8} {plugin} on '{event_type}' "
+                          f"after {seconds:.1f}s")
+
+            elif cmd == "trace":
+                if core.event_bus.tracer is None:
+                    core.event_bus.enable_tracing()
+                    print("Tracing events, run 'trace' again to stop and export.")
+                    continue
+                tracer = core.event_bus.disable_tracing()
+                trace_path = os.path.join("logs", f"trace_{time.strftime('%Y-%m-%d_%H-%M-%S')}.json")
+                tracer.export_chrome(trace_path)
+                print(f"Trace written to {trace_path}, latency per stage (ms):")
+                for stage, summary in tracer.stage_percentiles().items():
+                    print(f"> {stage:<9} {summary['count']:6} spans  p50 {summary['p50'] * 1000:8.2f}  "
+                          f"p90 {summary['p90'] * 1000:8.2f}  p99 {summary['p99'] * 1000:8.2f}")
+
+            elif cmd == "journal":
+                if core.journal is None:
+                    print("The event journal is off, start the core with Core(journal_dir=\"journal\").")
+                    continue
+                stats = core.journal.stats()
+                print(f"Event journal: {stats['written']} events written to {stats['segment']} "
+                      f"(waiting: {stats['pending']}, dropped: {stats['dropped']})")
+
+            elif cmd == "bridge":
+                if core.bridge is None:
+                    print("The bus bridge is off, start the core with Core(bridge={\"node_id\": ..., \"peers\": [...]}).")
+                    continue
+                stats = core.bridge.stats()
+                print(f"Node '{stats['node']}' (listen: {stats['listen']}): {stats['exported']} events exported, "
+                      f"{stats['imported']} imported, dropped {stats['loops']} loops, {stats['duplicates']} duplicates "
+                      f"and {stats['filtered']} filtered")
+                for link in stats["links"]:
+                    state = "up" if link["connected"] else "down"
+                    print(f"> {link['peer']:<28} node {str(link['node']):<16} {state:<5} sent {link['sent']:8}  "
+                          f"received {link['received']:8}  pending {link['pending']:6}  dropped {link['dropped']:6}  "
+                          f"reconnects {link['reconnects']}")
+
+            elif cmd == "pools":
+                for mode, stats in core.offload_pools.stats().items():
+                    if not stats["started"]:
+                        print(f"> {mode}: not started ({stats['workers']} workers)")
+                        continue
+                    print(f"> {mode}: {stats['workers']} workers, {stats['running']} running, {stats['queued']} queued, "
+                          f"utilization {stats['utilization']:.1%}, completed {stats['completed']}, failed {stats['failed']}")
+
             elif cmd == "reload":
                 print(f"Available plugins:")
                 plugins = list(core.plugin_manager.loaded_plugins)  # Convert to list for indexing
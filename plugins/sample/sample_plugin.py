@@ -3,7 +3,7 @@ File Location: plugins/sample/sample_plugin.py
 Author: Lizza Celestia
 Version: ALizz_AI_V1_0
 Created Date: 2025-02-12
-Modified Date: 2025-03-02
+Modified Date: 2026-10-18
 Description:
 
 """
@@ -93,7 +93,10 @@ class SamplePlugin(BasePlugin):
                     logger.info(f"[{plugin_name}] {self.count} sample data is running...")
                     self.count = count + 1
             logger.info(f"[{plugin_name}] is running sample.")
-            await asyncio.sleep(5)  # Simulate async work
+            try:
+                await asyncio.wait_for(self.stop_event.wait(), timeout=5)  # Simulate async work, wakes up on stop
+            except asyncio.TimeoutError:
+                pass
 
 
     #####################################################
@@ -118,6 +121,7 @@ class SamplePlugin(BasePlugin):
             logger.debug(f"[{plugin_name}] Asked for Status check.")
             logger.debug(f"[{plugin_name}] Publishing 'PLUGIN_STATUS_SAMPLE' event. {self.status}")
             self.core.event_bus.publish("PLUGIN_STATUS_SAMPLE",{"bool": self.status})
+            return {"bool": self.status}  # reply to core.event_bus.request()/gather()
 
         except Exception as e:
             logger.error(f"[{plugin_name}] Error: {e}")